@@ -0,0 +1,282 @@
+"""Offline benchmark: no camera and no network required.
+
+Uses ``SyntheticCamera`` (synthetic frames or a recorded video) in place of
+``CameraHandler`` and writes a JSON report that can be compared between
+versions::
+
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --video sala.mp4 --clients 1 4 16 --out new.json --compare bench.json
+
+``--detector null`` replaces YOLO with an empty detector to measure the
+pipeline overhead alone (also used automatically when the model cannot be
+loaded offline).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from src.camera import SyntheticCamera
+from src.inference import InferenceEngine
+from src.inference.engine import Detections
+from src.processing import DetectionPipeline, MotionGate
+from src.streaming import StreamHubs
+
+
+class NullEngine:
+    """Detector vazio: mede o custo do pipeline sem o modelo."""
+
+    backend = "null"
+
+    def preprocess(self, frame):
+        return frame
+
+    def infer_prepared(self, items):
+        return [Detections([], frame.shape) for frame in items]
+
+    def infer_batch(self, frames):
+        return self.infer_prepared(frames)
+
+
+def rss_bytes() -> int:
+    """Memória residente do processo (Linux)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_engine(args):
+    if args.detector == "null":
+        return NullEngine()
+    engine = InferenceEngine(args.model, backend=args.detector, imgsz=args.imgsz,
+                             threads=args.threads, cache_dir=args.cache_dir)
+    try:
+        return engine.load()
+    except Exception as e:
+        print(f"[bench] modelo indisponível ({e}); usando detector nulo", file=sys.stderr)
+        return NullEngine()
+
+
+def bench_inference(engine, camera, *, batches=(1, 4), seconds=3.0) -> dict:
+    """FPS de inferência para cada tamanho de lote."""
+    frame = camera.render(0)
+    out = {}
+    for batch in batches:
+        frames = [frame] * batch
+        engine.infer_batch(frames)  # aquecimento
+        n, t0 = 0, time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            engine.infer_batch(frames)
+            n += batch
+        elapsed = time.perf_counter() - t0
+        out[f"batch_{batch}"] = {"fps": round(n / elapsed, 2), "ms_per_frame": round(elapsed / n * 1000, 3)}
+    return out
+
+
+class CountingMonitor:
+    """``PresenceMonitor`` mínimo: só conta os frames que chegaram ao fim."""
+
+    last_person_ts = None
+
+    def __init__(self):
+        self.detections = 0
+
+    def check_camera(self, frame, health=None):
+        pass
+
+    def handle_detections(self, results):
+        self.detections += 1
+
+
+class BenchSlot:
+    """Câmera sintética no formato de ``CameraSlot`` (``id`` e ``camera``)."""
+
+    def __init__(self, camera):
+        self.id = camera.name
+        self.camera = camera
+
+
+def bench_pipeline(engine, args, *, cameras=1, motion=False) -> dict:
+    """Latência captura → detecção com ``cameras`` fontes sintéticas."""
+    slots = [
+        BenchSlot(SyntheticCamera(args.video, width=args.width, height=args.height,
+                                  fps=args.fps, seed=i, name=f"bench{i}"))
+        for i in range(cameras)
+    ]
+    monitors = {s.id: CountingMonitor() for s in slots}
+    gates = {s.id: MotionGate() for s in slots} if motion else {}
+    pipeline = DetectionPipeline(slots, engine, monitors, gates=gates)
+
+    def processed():
+        return sum(m.detections for m in monitors.values())
+
+    for s in slots:
+        s.camera.start()
+    pipeline.start()
+    # A janela medida é só esta: frames concluídos durante o stop() não contam
+    n0, t0 = processed(), time.perf_counter()
+    time.sleep(args.seconds)
+    n1, elapsed = processed(), time.perf_counter() - t0
+    pipeline.stop()
+    for s in slots:
+        s.camera.stop()
+
+    stats = pipeline.stats()
+    return {
+        "cameras": cameras,
+        "motion_gate": motion,
+        "detections_per_s": round((n1 - n0) / elapsed, 2),
+        "end_to_end_ms": stats["end_to_end_ms"],
+        "stages": {name: {k: st[k] for k in ("fps", "latency_ms", "dropped")}
+                   for name, st in stats["stages"].items()},
+    }
+
+
+def bench_mjpeg(args, clients: int) -> dict:
+    """Vazão de codificação MJPEG e memória com ``clients`` clientes simultâneos.
+
+    Os clientes consomem ``StreamHubs.aframes`` num event loop, o mesmo
+    caminho assíncrono servido por ``/api/stream``.
+    """
+    camera = SyntheticCamera(args.video, width=args.width, height=args.height, fps=args.fps)
+    streams = StreamHubs(camera)
+    camera.start()
+    streams.start()
+
+    received = [0] * clients
+    sent_bytes = [0] * clients
+    window = {}
+
+    async def client(i, deadline):
+        gen = streams.aframes()
+        try:
+            async for chunk in gen:
+                if time.perf_counter() >= deadline:
+                    break
+                received[i] += 1
+                sent_bytes[i] += len(chunk)
+        finally:
+            await gen.aclose()
+
+    async def run():
+        rss_before = rss_bytes()
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        seq0 = streams.default._seq
+        deadline = t0 + args.seconds
+        tasks = [asyncio.create_task(client(i, deadline)) for i in range(clients)]
+        await asyncio.sleep(args.seconds)
+        window.update(
+            elapsed=time.perf_counter() - t0,
+            cpu=time.process_time() - cpu0,
+            encoded=streams.default._seq - seq0,
+            rss=max(rss_bytes() - rss_before, 0),
+        )
+        await asyncio.wait(tasks, timeout=2)
+
+    try:
+        asyncio.run(run())
+    finally:
+        streams.stop()
+        camera.stop()
+
+    elapsed = window["elapsed"]
+    return {
+        "clients": clients,
+        "encoded_fps": round(window["encoded"] / elapsed, 2),
+        "delivered_fps_per_client": round(sum(received) / clients / elapsed, 2),
+        "egress_kbps": round(sum(sent_bytes) * 8 / 1000 / elapsed, 1),
+        "cpu_percent": round(window["cpu"] / elapsed * 100, 1),
+        "rss_per_client_kb": round(window["rss"] / clients / 1024, 1),
+    }
+
+
+def compare(new: dict, old: dict, path=()) -> list:
+    """Diferença relativa entre métricas numéricas de dois relatórios."""
+    lines = []
+    for key, value in new.items():
+        if key not in old:
+            continue
+        here = path + (key,)
+        if isinstance(value, dict) and isinstance(old[key], dict):
+            lines += compare(value, old[key], here)
+        elif isinstance(value, (int, float)) and isinstance(old[key], (int, float)) and old[key]:
+            delta = (value - old[key]) / abs(old[key]) * 100
+            if abs(delta) >= 5:
+                lines.append(f"{'.'.join(here)}: {old[key]} -> {value} ({delta:+.1f}%)")
+    return lines
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--video", help="vídeo gravado (padrão: frames sintéticos)")
+    p.add_argument("--width", type=int, default=640)
+    p.add_argument("--height", type=int, default=480)
+    p.add_argument("--fps", type=float, default=25.0, help="taxa da fonte")
+    p.add_argument("--seconds", type=float, default=5.0, help="duração de cada medição")
+    p.add_argument("--detector", default="null", choices=("null", "torch", "onnx", "openvino"))
+    p.add_argument("--model", default="yolo11n.pt")
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--threads", type=int, default=None)
+    p.add_argument("--cache-dir", default="models")
+    p.add_argument("--cameras", type=int, nargs="+", default=[1, 4])
+    p.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    p.add_argument("--out", default="bench.json")
+    p.add_argument("--compare", help="relatório anterior para comparação")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    engine = load_engine(args)
+    probe = SyntheticCamera(width=args.width, height=args.height)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "detector": engine.backend,
+            "source": args.video or "synthetic",
+            "resolution": [args.width, args.height],
+            "seconds": args.seconds,
+        },
+        "inference": bench_inference(engine, probe, seconds=args.seconds),
+        "pipeline": {
+            f"cameras_{n}{'_motion' if motion else ''}": bench_pipeline(engine, args, cameras=n, motion=motion)
+            for n in args.cameras for motion in (False, True)
+        },
+        "mjpeg": {f"clients_{n}": bench_mjpeg(args, n) for n in args.clients},
+    }
+
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"[bench] relatório salvo em {args.out}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            old = json.load(fh)
+        for line in compare(report, old) or ["sem diferenças >= 5%"]:
+            print(f"[bench] {line}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
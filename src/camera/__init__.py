@@ -1,3 +1,13 @@
 from .handler import CameraHandler
+from .capture import CaptureOptions
+from .manager import CameraManager, CameraSlot, load_camera_configs
+from .synthetic import SyntheticCamera
 
-__all__ = ["CameraHandler"]
+__all__ = [
+    "CameraHandler",
+    "CaptureOptions",
+    "CameraManager",
+    "CameraSlot",
+    "load_camera_configs",
+    "SyntheticCamera",
+]
@@ -0,0 +1,131 @@
+import os
+from threading import Lock
+
+import cv2
+
+# Lido pelo backend FFmpeg do OpenCV no momento do open()
+FFMPEG_OPTIONS_ENV = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+
+# A variável de ambiente é global ao processo: câmeras abertas em paralelo
+# (CameraManager) não podem trocá-la no meio do open() uma da outra
+_open_lock = Lock()
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+class CaptureOptions:
+    """Ajustes de captura RTSP aplicados em toda abertura, inclusive reconexões.
+
+    - ``transport``: ``tcp`` (sem perda de pacotes/artefatos) ou ``udp``;
+    - ``low_delay``: desliga o buffer de entrada do FFmpeg (``nobuffer``,
+      ``low_delay``), para o frame lido ser o mais recente;
+    - ``threads``: threads de decodificação (0 = padrão do FFmpeg);
+    - ``open_timeout_ms``/``read_timeout_ms``: passados na abertura (depois
+      do open o OpenCV os ignora);
+    - ``profile``: perfil ONVIF — ``main`` (primeiro), ``sub`` (menor
+      resolução), ``auto`` (menor resolução que cubra ``width``) ou índice;
+    - ``extra``: opções FFmpeg adicionais no formato ``chave;valor|...``.
+    """
+
+    def __init__(self, *, transport: str = "tcp", low_delay: bool = True, threads: int = 0,
+                 open_timeout_ms: int = 2000, read_timeout_ms: int = 2000, buffer_size: int = 1,
+                 profile="main", extra: str = ""):
+        if transport not in ("tcp", "udp"):
+            raise ValueError(f"transport inválido: {transport!r}")
+        self.transport = transport
+        self.low_delay = low_delay
+        self.threads = threads
+        self.open_timeout_ms = open_timeout_ms
+        self.read_timeout_ms = read_timeout_ms
+        self.buffer_size = buffer_size
+        self.profile = profile
+        self.extra = extra
+
+    @classmethod
+    def from_env(cls, **overrides) -> "CaptureOptions":
+        """Lê ``CAPTURE_*``; ``overrides`` (ex.: do JSON da câmera) têm prioridade."""
+        opts = dict(
+            transport=os.getenv("CAPTURE_TRANSPORT", "tcp"),
+            low_delay=_env_bool("CAPTURE_LOW_DELAY", "true"),
+            threads=int(os.getenv("CAPTURE_THREADS", 0)),
+            open_timeout_ms=int(os.getenv("CAPTURE_OPEN_TIMEOUT_MS", 2000)),
+            read_timeout_ms=int(os.getenv("CAPTURE_READ_TIMEOUT_MS", 2000)),
+            profile=os.getenv("CAPTURE_PROFILE", "main"),
+            extra=os.getenv("CAPTURE_FFMPEG_OPTIONS", ""),
+        )
+        opts.update(overrides)
+        return cls(**opts)
+
+    def ffmpeg_options(self) -> str:
+        """Valor de ``OPENCV_FFMPEG_CAPTURE_OPTIONS`` para estas opções."""
+        opts = [("rtsp_transport", self.transport)]
+        if self.low_delay:
+            opts += [("fflags", "nobuffer"), ("flags", "low_delay"), ("max_delay", "500000")]
+        if self.threads:
+            opts.append(("threads", str(self.threads)))
+        out = "|".join(f"{k};{v}" for k, v in opts)
+        return f"{out}|{self.extra}" if self.extra else out
+
+
+def open_capture(uri: str, options: CaptureOptions):
+    """Abre ``cv2.VideoCapture`` com FFmpeg aplicando ``options``."""
+    params = []
+    for prop, value in (("CAP_PROP_OPEN_TIMEOUT_MSEC", options.open_timeout_ms),
+                        ("CAP_PROP_READ_TIMEOUT_MSEC", options.read_timeout_ms)):
+        if value and hasattr(cv2, prop):
+            params += [getattr(cv2, prop), int(value)]
+
+    with _open_lock:
+        previous = os.environ.get(FFMPEG_OPTIONS_ENV)
+        os.environ[FFMPEG_OPTIONS_ENV] = options.ffmpeg_options()
+        try:
+            try:
+                cap = cv2.VideoCapture(uri, cv2.CAP_FFMPEG, params)
+            except TypeError:
+                # OpenCV < 4.5.2 não aceita parâmetros na abertura
+                cap = cv2.VideoCapture(uri, cv2.CAP_FFMPEG)
+        finally:
+            if previous is None:
+                os.environ.pop(FFMPEG_OPTIONS_ENV, None)
+            else:
+                os.environ[FFMPEG_OPTIONS_ENV] = previous
+
+    if options.buffer_size and hasattr(cv2, "CAP_PROP_BUFFERSIZE"):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, options.buffer_size)
+    return cap
+
+
+def _resolution(profile):
+    try:
+        res = profile.VideoEncoderConfiguration.Resolution
+        return int(res.Width), int(res.Height)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def select_profile(profiles: list, mode="main", width: int = None):
+    """Escolhe o perfil ONVIF (``GetProfiles``) conforme ``mode``.
+
+    Perfis sem resolução conhecida só são escolhidos por ``main``/índice.
+    """
+    if not profiles:
+        raise ValueError("Câmera sem perfis de mídia")
+    if isinstance(mode, int) or str(mode).isdigit():
+        return profiles[min(int(mode), len(profiles) - 1)]
+    if mode == "main":
+        return profiles[0]
+
+    sized = [(res, p) for p in profiles if (res := _resolution(p))]
+    if not sized:
+        return profiles[0]
+    sized.sort(key=lambda item: item[0][0] * item[0][1])
+    if mode == "sub":
+        return sized[0][1]
+    if mode == "auto":
+        for (w, _), p in sized:
+            if width is None or w >= width:
+                return p
+        return sized[-1][1]
+    raise ValueError(f"Perfil de captura inválido: {mode!r}")
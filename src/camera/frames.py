@@ -0,0 +1,86 @@
+import time
+from threading import Condition
+
+from src.metrics import REGISTRY
+
+FRAME_COPY = REGISTRY.histogram("frame_copy_seconds", "Time spent copying a shared frame")
+
+
+class Frame:
+    """
+    Frame capturado e imutável: ``image`` é um ndarray somente leitura,
+    compartilhado por referência entre todos os consumidores.
+    Quem precisar desenhar sobre ele deve usar :meth:`copy`.
+    """
+
+    __slots__ = ("image", "seq", "timestamp")
+
+    def __init__(self, image, seq: int, timestamp: float):
+        self.image = image
+        self.seq = seq
+        self.timestamp = timestamp
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+    def copy(self):
+        """Cópia gravável do ndarray (para overlays)."""
+        t0 = time.perf_counter()
+        image = self.image.copy()
+        FRAME_COPY.observe(time.perf_counter() - t0)
+        return image
+
+
+class FrameStore:
+    """Último frame da câmera com número de sequência monotônico.
+
+    O produtor publica cada frame uma vez; consumidores obtêm a referência
+    sem cópia e podem aguardar "o próximo frame depois da sequência N".
+    """
+
+    def __init__(self):
+        self._cond = Condition()
+        self._latest: Frame = None
+        self._closed = False
+
+    @property
+    def seq(self) -> int:
+        with self._cond:
+            return self._latest.seq if self._latest else 0
+
+    def publish(self, image, timestamp: float = None) -> Frame:
+        """Congela ``image`` (somente leitura) e a torna o frame mais recente."""
+        image.setflags(write=False)
+        with self._cond:
+            seq = (self._latest.seq if self._latest else 0) + 1
+            frame = Frame(image, seq, time.time() if timestamp is None else timestamp)
+            self._latest = frame
+            self._closed = False
+            self._cond.notify_all()
+        return frame
+
+    def latest(self) -> Frame:
+        """Referência ao frame mais recente (ou ``None``)."""
+        with self._cond:
+            return self._latest
+
+    def wait_next(self, after_seq: int, timeout: float = 1.0) -> Frame:
+        """
+        Aguarda um frame com sequência maior que ``after_seq``.
+        Retorna ``None`` no timeout ou se a store for fechada.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._closed or (self._latest is not None and self._latest.seq > after_seq),
+                timeout=timeout,
+            )
+            if self._latest is not None and self._latest.seq > after_seq:
+                return self._latest
+            return None
+
+    def close(self) -> None:
+        """Acorda todos que estão aguardando (usado no ``stop``)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -1,3 +1,4 @@
+import logging
 import socket
 import os
 # Suprime logs do OpenCV/FFmpeg
@@ -9,12 +10,28 @@ from threading import Thread, Event, Lock
 from collections import deque
 import time
 
+from .capture import CaptureOptions, open_capture, select_profile
+from .frames import Frame, FrameStore
+from .ptz import PTZController
+from .supervisor import Backoff, HealthState, CONNECTING, STREAMING, DEGRADED, OFFLINE, STOPPED
+from src.metrics import REGISTRY
+
+CAPTURE_READ = REGISTRY.histogram("camera_read_seconds", "Duration of VideoCapture.read()", ("camera",))
+FRAMES_CAPTURED = REGISTRY.counter("camera_frames_captured_total", "Frames read from the camera", ("camera",))
+RECONNECTS = REGISTRY.counter("camera_reconnects_total", "Capture reopen attempts", ("camera",))
+
 # Timeout global para conexões socket ONVIF (em segundos)
 socket.setdefaulttimeout(2)
 
 
 class CameraHandler:
-    """Conecta a uma câmera ONVIF, captura vídeo em thread única e mede latência."""
+    """Conecta a uma câmera ONVIF, captura vídeo em thread única e mede latência.
+
+    A thread de captura também supervisiona a conexão: estados
+    ``connecting``/``streaming``/``degraded``/``offline`` (ver :meth:`health`),
+    reconexão com backoff exponencial e jitter e nova descoberta ONVIF
+    quando a URI cacheada deixa de abrir.
+    """
 
     def __init__(
         self,
@@ -24,19 +41,32 @@ class CameraHandler:
         passwd: str,
         width: int = 640,
         height: int = 480,
+        name: str = None,
+        capture=None,
+        *,
+        offline_after: float = 10.0,
+        max_read_failures: int = 3,
+        rediscover_after: int = 3,
+        backoff: Backoff = None,
     ):
+        self.name = name or f"{host}:{port}"
         self.host = host
         self.port = port
         self.user = user
         self.passwd = passwd
         self.width = width
         self.height = height
+        # Opções FFmpeg/perfil ONVIF (dict do JSON da câmera sobre CAPTURE_*)
+        if not isinstance(capture, CaptureOptions):
+            capture = CaptureOptions.from_env(**(capture or {}))
+        self.capture = capture
 
         self._camera = None
         self._cap = None
         self._thread: Thread = None
         self._stop = Event()
-        self._frame = None
+        # Frames imutáveis com sequência; consumidores recebem referência
+        self.frames = FrameStore()
         self._lock = Lock()
 
         # Para medir latência de read()
@@ -46,80 +76,151 @@ class CameraHandler:
         # Cache da URI de streaming
         self._stream_uri: str = None
 
+        # Comandos PTZ em thread própria, com serviços ONVIF cacheados
+        self.ptz = PTZController(lambda: self._camera)
+
+        # Supervisão da conexão
+        self.offline_after = offline_after
+        self.max_read_failures = max_read_failures
+        self.rediscover_after = rediscover_after
+        self._backoff = backoff or Backoff()
+        self._health = HealthState()
+        self._started_at: float = None
+        self._read_hist = CAPTURE_READ.labels(self.name)
+        self._captured = FRAMES_CAPTURED.labels(self.name)
+
     def start(self) -> None:
-        """Inicializa ONVIF (uma vez), abre stream RTSP com timeout e inicia thread."""
-        # Se já está rodando, ignora
-        if self._cap and self._cap.isOpened() and self._thread and self._thread.is_alive():
+        """Inicia a thread de captura/supervisão (não bloqueia na conexão)."""
+        if self._thread and self._thread.is_alive():
             return
+        self._stop.clear()
+        self._started_at = time.time()
+        self._health.set(CONNECTING)
+        self._thread = Thread(target=self._supervise, name=f"capture-{self.name}", daemon=True)
+        self._thread.start()
+        self.ptz.start()
 
+    def _discover(self) -> None:
+        """Descobre via ONVIF a URI RTSP do perfil configurado."""
+        self._camera = ONVIFCamera(self.host, self.port, self.user, self.passwd)
+        media = self._camera.create_media_service()
+        profile = select_profile(media.GetProfiles(), self.capture.profile, self.width)
+        uri = media.GetStreamUri({
+            "StreamSetup": {"Stream": "RTP-Unicast", "Transport": {"Protocol": "RTSP"}},
+            "ProfileToken": profile.token
+        }).Uri
+        if uri.startswith("rtsp://"):
+            uri = uri.replace("rtsp://", f"rtsp://{self.user}:{self.passwd}@")
+        self._stream_uri = uri
+
+    def _connect(self) -> bool:
+        """Descobre a URI (se não houver em cache) e abre o stream."""
         try:
-            # 1) Descobre URI apenas na 1ª vez
             if not self._stream_uri:
-                self._camera = ONVIFCamera(self.host, self.port, self.user, self.passwd)
-                media = self._camera.create_media_service()
-                profile = media.GetProfiles()[0]
-                uri = media.GetStreamUri({
-                    "StreamSetup": {"Stream": "RTP-Unicast", "Transport": {"Protocol": "RTSP"}},
-                    "ProfileToken": profile.token
-                }).Uri
-                if uri.startswith("rtsp://"):
-                    uri = uri.replace("rtsp://", f"rtsp://{self.user}:{self.passwd}@")
-                self._stream_uri = uri
-
-            # 2) Abre captura com FFmpeg usando a URI cacheada
-            #    e configura timeouts de open/read
-            self._cap = cv2.VideoCapture(self._stream_uri, cv2.CAP_FFMPEG)
-            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
-            if hasattr(cv2, "CAP_PROP_BUFFERSIZE"):
-                self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-
-            # ↓↓↓ timeouts em milissegundos ↓↓↓
-            if hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC"):
-                self._cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 2000)
-            if hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
-                self._cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 2000)
-
-            # -- alternativa usando opts para forçar TCP e stimeout (µs) --
-            # opts = ["rtsp_transport","tcp","stimeout","2000000"]
-            # self._cap = cv2.VideoCapture(self._stream_uri, cv2.CAP_FFMPEG, opts)
-
-            if not self._cap.isOpened():
+                self._discover()
+            cap = self._open_capture()
+            if not cap.isOpened():
+                cap.release()
                 raise RuntimeError(f"Falha ao abrir stream: {self._stream_uri}")
-
-            # 3) Inicia thread de captura
-            self._stop.clear()
-            self._thread = Thread(target=self._capture_loop, daemon=True)
-            self._thread.start()
-
+            self._cap = cap
+            return True
         except Exception as e:
-            print(f"[Erro] Falha ao iniciar câmera: {e}")
+            logging.warning("[%s] Falha ao conectar: %s", self.name, e)
+            self._health.set(self._health.state, error=str(e))
+            return False
 
-    def _capture_loop(self):
-        """Loop contínuo: lê frame, mede latência e armazena."""
+    def _supervise(self):
+        """Conecta, lê frames e reconecta com backoff até ``stop``."""
+        connect_failures = 0
+        read_failures = 0
         while not self._stop.is_set():
             if not self._cap or not self._cap.isOpened():
-                time.sleep(0.1)
+                if self._connect():
+                    connect_failures = 0
+                else:
+                    connect_failures += 1
+                    # URI cacheada não abre mais: refaz a descoberta ONVIF
+                    if connect_failures % self.rediscover_after == 0:
+                        self._stream_uri = None
+                    self._health.set(OFFLINE if self._down_for() >= self.offline_after else CONNECTING)
+                    self._stop.wait(self._backoff.next())
+                    continue
+
+            if self._read_once():
+                read_failures = 0
+                self._backoff.reset()
+                self._health.set(STREAMING)
                 continue
 
-            t0 = time.time()
-            ret, frame = self._cap.read()
-            t1 = time.time()
+            read_failures += 1
+            self._health.set(OFFLINE if self._down_for() >= self.offline_after else DEGRADED)
+            if read_failures >= self.max_read_failures:
+                read_failures = 0
+                self._release()
+                RECONNECTS.labels(self.name).inc()
+                self._stop.wait(self._backoff.next())
 
-            if ret:
-                latency = t1 - t0
-                with self._lock:
-                    self._frame = frame
-                    self._last_latency = latency
-                    self._latencies.append(latency)
-            else:
-                # reconecta rapidamente usando só a URI
-                self._restart_capture()
+    def _down_for(self) -> float:
+        """Segundos desde o último frame (ou desde o start, se nunca houve)."""
+        last = self._health.last_frame_at or self._started_at or time.time()
+        return time.time() - last
 
-    def get_frame(self):
-        """Retorna uma cópia do último frame ou None."""
+    def _read_once(self) -> bool:
+        """Lê um frame, mede latência e publica; False se a leitura falhou."""
+        t0 = time.time()
+        ret, frame = self._cap.read()
+        t1 = time.time()
+        if not ret:
+            return False
+        latency = t1 - t0
+        self._read_hist.observe(latency)
+        self._captured.inc()
+        self.frames.publish(frame, t1)
+        self._health.frame(t1)
         with self._lock:
-            return None if self._frame is None else self._frame.copy()
+            self._last_latency = latency
+            self._latencies.append(latency)
+        return True
+
+    def _release(self) -> None:
+        try:
+            if self._cap:
+                self._cap.release()
+        except Exception:
+            pass
+        self._cap = None
+
+    def health(self) -> dict:
+        """Estado da conexão e instantes das transições (epoch, segundos)."""
+        return self._health.snapshot()
+
+    @property
+    def state(self) -> str:
+        return self._health.state
+
+    @property
+    def connected(self) -> bool:
+        return self._health.state == STREAMING
+
+    def get_frame(self):
+        """Retorna uma cópia gravável do último frame ou None.
+
+        Prefira :meth:`get_latest` quando não for desenhar sobre o frame.
+        """
+        frame = self.frames.latest()
+        return None if frame is None else frame.copy()
+
+    def get_latest(self) -> Frame:
+        """Referência (sem cópia) ao último ``Frame`` imutável ou None."""
+        return self.frames.latest()
+
+    def next_frame(self, after_seq: int, timeout: float = 1.0) -> Frame:
+        """Aguarda o próximo ``Frame`` com sequência maior que ``after_seq``."""
+        return self.frames.wait_next(after_seq, timeout)
+
+    def get_frame_seq(self) -> int:
+        """Número de sequência do último frame capturado (0 = nenhum)."""
+        return self.frames.seq
 
     def get_last_latency(self) -> float:
         """Retorna latência (s) do último read()."""
@@ -142,63 +243,32 @@ class CameraHandler:
             "count": len(vals),
         }
 
-    def _restart_capture(self):
-        """Reabre o VideoCapture a partir da URI cacheada (sem nova ONVIF)."""
-        try:
-            if self._cap:
-                self._cap.release()
-        except:
-            pass
-        self._cap = None
-        time.sleep(0.1)
-        if self._stream_uri:
-            try:
-                self._cap = cv2.VideoCapture(self._stream_uri, cv2.CAP_FFMPEG)
-            except:
-                pass
+    def _open_capture(self):
+        """Abre o stream com as mesmas opções na partida e nas reconexões."""
+        cap = open_capture(self._stream_uri, self.capture)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return cap
 
     def control_ptz(self, err_x: float, err_y: float, kp: float = 0.6):
-        """Controla movimento PTZ com base no erro de posição da detecção."""
-        try:
-            ptz = self._camera.create_ptz_service()
-            media = self._camera.create_media_service()
-            profile = media.GetProfiles()[0]
-            token = profile.token
-        
-            # Aplica ganho proporcional
-            vx = kp * err_x
-            vy = kp * err_y
-        
-            # Limita velocidades entre -1.0 e 1.0
-            vx = max(min(vx, 1.0), -1.0)
-            vy = max(min(vy, 1.0), -1.0)
-        
-            # Monta comando de movimento
-            ptz.ContinuousMove({
-                "ProfileToken": token,
-                "Velocity": {
-                    "PanTilt": {
-                        "x": -vx,
-                        "y": -vy  # Inverte se necessário (ajuste depende da câmera)
-                    }
-                }
-            })
-        
-            # Aguarda movimento curto, depois para
-            time.sleep(0.2)
-            ptz.Stop({"ProfileToken": token})
-        
-        except Exception as e:
-            print(f"[Erro PTZ] Falha no controle PTZ: {e}")
-
+        """
+        Controla movimento PTZ com base no erro de posição da detecção.
+        Não bloqueia: o comando vai para a fila do ``PTZController``.
+        """
+        # Aplica ganho proporcional e limita velocidades entre -1.0 e 1.0
+        vx = max(min(kp * err_x, 1.0), -1.0)
+        vy = max(min(kp * err_y, 1.0), -1.0)
+        self.ptz.submit(vx, vy)
 
     def stop(self) -> None:
         """Para a thread e libera recursos."""
         self._stop.set()
+        self.frames.close()
+        self.ptz.stop()
         if self._thread:
             self._thread.join(timeout=1)
-        if self._cap:
-            self._cap.release()
+        self._release()
+        self._health.set(STOPPED)
         if self._camera:
             try:
                 self._camera.devicemgmt.Stop()
@@ -0,0 +1,105 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .handler import CameraHandler
+from src.streaming import MjpegHub, StreamHubs
+
+
+def load_camera_configs(env_var: str = "CAMERAS_CONFIG") -> list:
+    """
+    Carrega a lista de câmeras.
+
+    - ``$CAMERAS_CONFIG`` aponta para um JSON com lista de objetos
+      ``{"id", "name", "host", "port", "user", "passwd", "width", "height",
+      "capture", "detection"}``;
+    - sem o arquivo, monta uma única câmera ``default`` a partir de
+      ``CAM_HOST``/``CAM_PORT``/``CAM_USER``/``CAM_PASS``.
+    """
+    path = os.getenv(env_var)
+    if path:
+        with open(path, "r") as fh:
+            configs = json.load(fh)
+        if not isinstance(configs, list) or not configs:
+            raise ValueError(f"{path}: esperado lista não vazia de câmeras")
+        return configs
+
+    return [{
+        "id": "default",
+        "host": os.getenv("CAM_HOST", "192.168.0.176"),
+        "port": int(os.getenv("CAM_PORT", 80)),
+        "user": os.getenv("CAM_USER", "admin"),
+        "passwd": os.getenv("CAM_PASS", "123456"),
+    }]
+
+
+class CameraSlot:
+    """Recursos de uma câmera: captura (``CameraHandler``) e hubs MJPEG.
+
+    ``streams`` tem um hub por perfil de saída; ``hub`` é o do perfil
+    padrão (resolução original).
+    """
+
+    def __init__(self, cam_id: str, name: str, camera: CameraHandler, detection: dict = None):
+        self.id = cam_id
+        self.name = name
+        self.camera = camera
+        # Bloco "detection" do JSON (ROI, modo, resolução de inferência)
+        self.detection = detection or {}
+        self.streams = StreamHubs(camera, factory=MjpegHub)
+        self.hub = self.streams.default
+
+    def start(self) -> None:
+        self.camera.start()
+        self.streams.start()
+
+    def stop(self) -> None:
+        self.streams.stop()
+        self.camera.stop()
+
+
+class CameraManager:
+    """Mantém um ``CameraHandler`` por câmera configurada.
+
+    Cada câmera custa uma thread de captura e uma de codificação MJPEG,
+    criadas uma única vez no ``start`` (sem reconexões por requisição).
+    """
+
+    def __init__(self, configs: list):
+        self._slots: dict = {}
+        for cfg in configs:
+            cfg = dict(cfg)
+            cam_id = str(cfg.pop("id", len(self._slots)))
+            name = cfg.pop("name", cam_id)
+            detection = cfg.pop("detection", None)
+            if cam_id in self._slots:
+                raise ValueError(f"Câmera duplicada: {cam_id}")
+            self._slots[cam_id] = CameraSlot(cam_id, name, CameraHandler(name=cam_id, **cfg), detection)
+
+    def __iter__(self):
+        return iter(self._slots.values())
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, cam_id: str):
+        """Retorna o ``CameraSlot`` ou ``None``."""
+        return self._slots.get(cam_id)
+
+    @property
+    def default(self) -> CameraSlot:
+        """Primeira câmera configurada (usada pelas rotas legadas ``/api/*``)."""
+        return next(iter(self._slots.values()))
+
+    def _each(self, method: str) -> None:
+        # ONVIF bloqueia até o timeout por câmera; executa em paralelo
+        with ThreadPoolExecutor(max_workers=len(self._slots) or 1) as pool:
+            list(pool.map(lambda s: getattr(s, method)(), self._slots.values()))
+
+    def start(self) -> None:
+        """Inicia captura e hub de todas as câmeras."""
+        self._each("start")
+
+    def stop(self) -> None:
+        """Para todas as câmeras."""
+        self._each("stop")
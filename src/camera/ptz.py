@@ -0,0 +1,132 @@
+import logging
+import time
+from threading import Thread, Condition
+
+from src.metrics import REGISTRY
+
+PTZ_COMMAND = REGISTRY.histogram("ptz_command_seconds", "Duration of ONVIF PTZ requests", ("command",))
+
+
+class PTZController:
+    """
+    Executa comandos PTZ fora do loop de inferência.
+
+    - Os serviços ONVIF (PTZ, mídia) e o token do perfil são criados uma
+      única vez e reaproveitados (recriados só após erro);
+    - ``submit`` não bloqueia: grava a velocidade alvo, sobrescrevendo
+      qualquer comando ainda não enviado (só o alvo mais recente importa);
+    - comandos respeitam ``min_interval`` entre si e o ``Stop`` é enviado
+      pela própria thread ``move_duration`` segundos após o último movimento.
+    """
+
+    def __init__(self, camera_getter, *, min_interval: float = 0.2, move_duration: float = 0.2):
+        # ``camera_getter`` devolve o ONVIFCamera atual (ou None)
+        self._camera_getter = camera_getter
+        self.min_interval = min_interval
+        self.move_duration = move_duration
+
+        self._cond = Condition()
+        self._pending = None        # (vx, vy) ainda não enviado
+        self._stop_at: float = None # quando enviar Stop
+        self._last_move = 0.0
+        self._running = False
+        self._thread: Thread = None
+
+        self._ptz = None
+        self._token = None
+
+        self.sent = 0
+        self.coalesced = 0
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def submit(self, vx: float, vy: float) -> None:
+        """Agenda movimento com velocidade (vx, vy) em [-1, 1]; não bloqueia."""
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (vx, vy)
+            self._cond.notify_all()
+
+    def _services(self):
+        """PTZ service + token do perfil, cacheados."""
+        if self._ptz is None:
+            camera = self._camera_getter()
+            if camera is None:
+                raise RuntimeError("câmera ONVIF não inicializada")
+            ptz = camera.create_ptz_service()
+            media = camera.create_media_service()
+            self._token = media.GetProfiles()[0].token
+            self._ptz = ptz
+        return self._ptz, self._token
+
+    def _next_action(self):
+        """Aguarda e retorna ("move", (vx, vy)), ("stop", None) ou None ao encerrar."""
+        with self._cond:
+            while self._running:
+                now = time.time()
+                if self._pending is not None:
+                    wait = self._last_move + self.min_interval - now
+                    if wait <= 0:
+                        cmd, self._pending = self._pending, None
+                        self._last_move = now
+                        self._stop_at = now + self.move_duration
+                        return "move", cmd
+                elif self._stop_at is not None:
+                    wait = self._stop_at - now
+                    if wait <= 0:
+                        self._stop_at = None
+                        return "stop", None
+                else:
+                    wait = None
+                self._cond.wait(timeout=wait)
+            return None
+
+    def _loop(self):
+        while True:
+            action = self._next_action()
+            if action is None:
+                break
+            kind, cmd = action
+            try:
+                ptz, token = self._services()
+                if kind == "move":
+                    vx, vy = cmd
+                    with PTZ_COMMAND.time("move"):
+                        ptz.ContinuousMove({
+                            "ProfileToken": token,
+                            "Velocity": {
+                                "PanTilt": {
+                                    "x": -vx,
+                                    "y": -vy  # Inverte se necessário (ajuste depende da câmera)
+                                }
+                            }
+                        })
+                    self.sent += 1
+                else:
+                    with PTZ_COMMAND.time("stop"):
+                        ptz.Stop({"ProfileToken": token})
+            except Exception as e:
+                # Descarta proxies para recriá-los no próximo comando
+                self._ptz = None
+                logging.warning("Falha no controle PTZ: %s", e)
+
+        # Garante que a câmera não fica girando ao encerrar
+        if self._ptz is not None and self._stop_at is not None:
+            try:
+                self._ptz.Stop({"ProfileToken": self._token})
+            except Exception:
+                pass
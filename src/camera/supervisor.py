@@ -0,0 +1,69 @@
+import random
+import time
+from collections import deque
+from threading import Lock
+
+# Estados da câmera
+CONNECTING = "connecting"   # tentando abrir o stream (ainda dentro da tolerância)
+STREAMING = "streaming"     # lendo frames normalmente
+DEGRADED = "degraded"       # stream aberto, mas leituras falhando
+OFFLINE = "offline"         # sem frames há mais de ``offline_after`` segundos
+STOPPED = "stopped"
+
+
+class Backoff:
+    """Espera exponencial com jitter: ``base * 2^n`` limitada a ``maximum``,
+    sorteada entre 50% e 100% para câmeras não reconectarem em sincronia."""
+
+    def __init__(self, base: float = 0.5, maximum: float = 30.0):
+        self.base = base
+        self.maximum = maximum
+        self.attempts = 0
+
+    def next(self) -> float:
+        delay = min(self.maximum, self.base * 2 ** self.attempts)
+        self.attempts += 1
+        return delay * random.uniform(0.5, 1.0)
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+class HealthState:
+    """Estado atual da câmera e instantes das transições (thread-safe)."""
+
+    def __init__(self, history: int = 20):
+        self._lock = Lock()
+        self.state = STOPPED
+        self.since = time.time()
+        self.last_frame_at: float = None
+        self.last_error: str = None
+        self._history = deque(maxlen=history)
+
+    def set(self, state: str, error: str = None) -> bool:
+        """Muda o estado; retorna True se houve transição."""
+        with self._lock:
+            if error is not None:
+                self.last_error = error
+            if state == self.state:
+                return False
+            now = time.time()
+            self._history.append((self.state, state, now))
+            self.state, self.since = state, now
+            return True
+
+    def frame(self, ts: float) -> None:
+        with self._lock:
+            self.last_frame_at = ts
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "since": self.since,
+                "last_frame_at": self.last_frame_at,
+                "last_error": self.last_error,
+                "history": [
+                    {"from": a, "to": b, "at": t} for a, b, t in self._history
+                ],
+            }
@@ -0,0 +1,144 @@
+import time
+from threading import Thread, Event, Lock
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .frames import Frame, FrameStore
+from .supervisor import HealthState, STREAMING, STOPPED
+
+
+class SyntheticCamera:
+    """
+    Fonte de frames sem câmera nem rede, com a mesma interface de leitura do
+    ``CameraHandler`` (``get_frame``, ``get_latest``, ``next_frame``, latência…).
+
+    - com ``path``: lê um vídeo gravado em loop;
+    - sem ``path``: gera um fundo com ruído e um retângulo em movimento,
+      de forma determinística a partir de ``seed``.
+
+    Usada pelo benchmark para medir o pipeline de forma reproduzível.
+    """
+
+    def __init__(self, path: str = None, *, width: int = 640, height: int = 480,
+                 fps: float = 25.0, seed: int = 0, name: str = "synthetic"):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.seed = seed
+        self.name = name
+
+        self.frames = FrameStore()
+        self._cap = None
+        self._thread: Thread = None
+        self._stop = Event()
+        self._lock = Lock()
+        self._last_latency: float = None
+        self._latencies = deque(maxlen=100)
+        self._rng = np.random.default_rng(seed)
+        self._background = self._rng.integers(40, 80, (height, width, 3), dtype=np.uint8)
+        self._index = 0
+        self._health = HealthState()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        if self.path:
+            self._cap = cv2.VideoCapture(self.path)
+            if not self._cap.isOpened():
+                raise RuntimeError(f"Falha ao abrir vídeo: {self.path}")
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        self._health.set(STREAMING)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.frames.close()
+        if self._thread:
+            self._thread.join(timeout=1)
+        if self._cap:
+            self._cap.release()
+        self._health.set(STOPPED)
+
+    def render(self, index: int):
+        """Frame sintético ``index``: pessoa (retângulo) andando pela cena."""
+        frame = self._background.copy()
+        w, h = self.width // 6, self.height // 2
+        span = self.width - w
+        x = int((index * 4) % (2 * span))
+        x = x if x < span else 2 * span - x
+        y = self.height // 4
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (180, 160, 140), -1)
+        return frame
+
+    def _read(self):
+        if self._cap is None:
+            frame = self.render(self._index)
+            self._index += 1
+            return True, frame
+        ret, frame = self._cap.read()
+        if not ret:
+            # fim do arquivo: volta ao início
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read()
+        if ret and frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height))
+        return ret, frame
+
+    def _loop(self):
+        interval = 1.0 / self.fps if self.fps else 0.0
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            ret, frame = self._read()
+            t1 = time.perf_counter()
+            if ret:
+                self.frames.publish(frame)
+                self._health.frame(time.time())
+                with self._lock:
+                    self._last_latency = t1 - t0
+                    self._latencies.append(t1 - t0)
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_at = time.perf_counter()
+
+    # -- mesma interface de leitura do CameraHandler ------------------------
+    def health(self) -> dict:
+        return self._health.snapshot()
+
+    @property
+    def connected(self) -> bool:
+        return self._health.state == STREAMING
+
+    def get_frame(self):
+        frame = self.frames.latest()
+        return None if frame is None else frame.copy()
+
+    def get_latest(self) -> Frame:
+        return self.frames.latest()
+
+    def next_frame(self, after_seq: int, timeout: float = 1.0) -> Frame:
+        return self.frames.wait_next(after_seq, timeout)
+
+    def get_frame_seq(self) -> int:
+        return self.frames.seq
+
+    def get_last_latency(self) -> float:
+        with self._lock:
+            return self._last_latency
+
+    def get_latency_stats(self) -> dict:
+        with self._lock:
+            vals = list(self._latencies)
+        if not vals:
+            return {}
+        return {"mean": sum(vals) / len(vals), "min": min(vals), "max": max(vals), "count": len(vals)}
+
+    def control_ptz(self, err_x: float, err_y: float, kp: float = 0.6):
+        """Sem PTZ: ignora comandos."""
@@ -1,3 +1,4 @@
 from .database import Database
+from .writer import EventWriter
 
-__all__ = ["Database"]
+__all__ = ["Database", "EventWriter"]
@@ -1,6 +1,11 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime
+from sqlalchemy import (
+    create_engine, event, inspect, text, Column, Integer, String, Float, DateTime, Index,
+    and_, or_, func, select,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import base64
 import datetime
 
 Base = declarative_base()
@@ -10,23 +15,112 @@ class Event(Base):
     __tablename__ = 'events'
     id = Column(Integer, primary_key=True)
     type = Column(String)
+    camera = Column(String)
     confidence = Column(Float)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_events_timestamp', 'timestamp'),
+        Index('ix_events_type_timestamp', 'type', 'timestamp'),
+        Index('ix_events_camera_timestamp', 'camera', 'timestamp'),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'type': self.type,
+            'camera': self.camera,
+            'confidence': self.confidence,
+            'timestamp': self.timestamp.isoformat(),
+        }
+
+
+class EventClip(Base):
+    """Recorded clip covering one event (several events may share a file)."""
+    __tablename__ = 'clips'
+    id = Column(Integer, primary_key=True)
+    camera = Column(String)
+    event_type = Column(String)
+    event_at = Column(DateTime)
+    start = Column(DateTime)
+    end = Column(DateTime)
+    path = Column(String)
+    frames = Column(Integer)
+    size = Column(Integer)
+
+    __table_args__ = (
+        Index('ix_clips_event_at', 'event_at'),
+        Index('ix_clips_camera_event_at', 'camera', 'event_at'),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'camera': self.camera,
+            'event_type': self.event_type,
+            'event_at': self.event_at.isoformat(),
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'frames': self.frames,
+            'size': self.size,
+        }
+
+
+def _engine_options(url: str) -> dict:
+    """Pool settings: a real pool for servers, a shared connection for in-memory SQLite."""
+    if url.startswith('sqlite'):
+        opts = {'connect_args': {'check_same_thread': False}}
+        if ':memory:' in url or url in ('sqlite://', 'sqlite:///'):
+            # every thread (e.g. the background writer) must see the same DB
+            opts['poolclass'] = StaticPool
+        return opts
+    return {'pool_size': 5, 'max_overflow': 5, 'pool_pre_ping': True, 'pool_recycle': 1800}
+
 
 class Database:
     def __init__(self, url: str):
-        self.engine = create_engine(url)
+        self.engine = create_engine(url, **_engine_options(url))
+        if url.startswith('sqlite'):
+            event.listen(self.engine, 'connect', _sqlite_pragmas)
         Base.metadata.create_all(self.engine)
+        _add_missing_columns(self.engine, Event.__table__)
+        # create_all skips indexes of tables that already exist
+        for table in (Event.__table__, EventClip.__table__):
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
         self.Session = sessionmaker(bind=self.engine)
 
+    def ping(self) -> None:
+        """Round-trip to the database; raises if it is unreachable."""
+        with self.engine.connect() as conn:
+            conn.execute(select(1))
+
     def save_event(self, data: dict) -> None:
         session = self.Session()
-        event = Event(type=data.get('type'), confidence=data.get('confidence'))
+        event = Event(type=data.get('type'), camera=data.get('camera'),
+                      confidence=data.get('confidence'))
         session.add(event)
         session.commit()
         session.close()
 
+    def save_events(self, events) -> int:
+        """Bulk insert in a single transaction (one executemany)."""
+        now = datetime.datetime.utcnow()
+        rows = [
+            {
+                'type': e.get('type'),
+                'camera': e.get('camera'),
+                'confidence': e.get('confidence'),
+                'timestamp': e.get('timestamp') or now,
+            }
+            for e in events
+        ]
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            conn.execute(Event.__table__.insert(), rows)
+        return len(rows)
+
     def get_recent_events(self, limit: int = 50):
         session = self.Session()
         events = (
@@ -39,8 +133,227 @@ class Database:
         return [
             {
                 'type': e.type,
+                'camera': e.camera,
                 'confidence': e.confidence,
                 'timestamp': e.timestamp.isoformat(),
             }
             for e in events
         ]
+
+    def query_events(self, *, type: str = None, camera: str = None, start=None, end=None,
+                     limit: int = 50, cursor: str = None) -> dict:
+        """Newest-first page of events using keyset pagination.
+
+        ``cursor`` is the ``next_cursor`` of the previous page. Each page is
+        an index range scan, so its cost does not depend on how deep the
+        client has paged or on the table size.
+        """
+        stmt = select(Event).where(*_filters(type, start, end, camera))
+        if cursor:
+            ts, last_id = decode_cursor(cursor)
+            stmt = stmt.where(or_(
+                Event.timestamp < ts,
+                and_(Event.timestamp == ts, Event.id < last_id),
+            ))
+        stmt = stmt.order_by(Event.timestamp.desc(), Event.id.desc()).limit(limit + 1)
+
+        with self.Session() as session:
+            rows = session.execute(stmt).scalars().all()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'events': [e.to_dict() for e in rows],
+            'next_cursor': encode_cursor(rows[-1]) if more else None,
+        }
+
+    def summarize(self, *, type: str = None, camera: str = None, start=None, end=None) -> dict:
+        """Aggregates computed in SQL: totals per type, per camera and per hour."""
+        where = _filters(type, start, end, camera)
+        hour = self._hour_bucket(Event.timestamp)
+        by_type = (
+            select(Event.type, func.count(), func.avg(Event.confidence))
+            .where(*where).group_by(Event.type).order_by(Event.type)
+        )
+        by_camera = (
+            select(Event.camera, Event.type, func.count())
+            .where(*where).group_by(Event.camera, Event.type).order_by(Event.camera, Event.type)
+        )
+        per_hour = (
+            select(hour.label('hour'), func.count())
+            .where(*where).group_by('hour').order_by('hour')
+        )
+        with self.engine.connect() as conn:
+            types = conn.execute(by_type).all()
+            cameras = conn.execute(by_camera).all()
+            hours = conn.execute(per_hour).all()
+        return {
+            'by_type': [
+                {
+                    'type': t,
+                    'count': n,
+                    'mean_confidence': round(avg, 4) if avg is not None else None,
+                }
+                for t, n, avg in types
+            ],
+            'by_camera': [
+                {'camera': c, 'type': t, 'count': n} for c, t, n in cameras
+            ],
+            'per_hour': [{'hour': _iso(h), 'count': n} for h, n in hours],
+        }
+
+    def absence_periods(self, *, camera: str = None, start=None, end=None,
+                        absence_type: str = 'absence', presence_type: str = 'presence') -> dict:
+        """Absences from each ``absence`` event to the next ``presence`` event
+        of the same camera.
+
+        The end of each period is a correlated ``MIN`` served by the
+        ``(type, timestamp)`` index. Ongoing absences have ``end`` None and
+        are measured up to now.
+        """
+        a = Event.__table__.alias('a')
+        p = Event.__table__.alias('p')
+        same_camera = or_(
+            p.c.camera == a.c.camera,
+            and_(p.c.camera.is_(None), a.c.camera.is_(None)),
+        )
+        nxt = (
+            select(func.min(p.c.timestamp))
+            .where(p.c.type == presence_type, same_camera, p.c.timestamp > a.c.timestamp)
+            .scalar_subquery()
+        )
+        stmt = select(a.c.camera, a.c.timestamp, nxt).where(a.c.type == absence_type)
+        if camera is not None:
+            stmt = stmt.where(a.c.camera == camera)
+        if start is not None:
+            stmt = stmt.where(a.c.timestamp >= _naive_utc(start))
+        if end is not None:
+            stmt = stmt.where(a.c.timestamp < _naive_utc(end))
+        stmt = stmt.order_by(a.c.timestamp)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+
+        now = datetime.datetime.utcnow()
+        periods = []
+        last_end = {}
+        for cam, began, ended in rows:
+            began, ended = _as_datetime(began), _as_datetime(ended)
+            # repeated alerts inside one absence share the same end
+            if cam in last_end and ended == last_end[cam]:
+                continue
+            last_end[cam] = ended
+            periods.append({
+                'camera': cam,
+                'start': began.isoformat(),
+                'end': ended.isoformat() if ended else None,
+                'duration_s': round(((ended or now) - began).total_seconds(), 1),
+            })
+        durations = [period['duration_s'] for period in periods]
+        return {
+            'periods': periods,
+            'count': len(periods),
+            'total_s': round(sum(durations), 1),
+            'mean_s': round(sum(durations) / len(durations), 1) if durations else None,
+        }
+
+    def save_clips(self, clips) -> int:
+        """Index recorded clips (one row per event)."""
+        rows = [dict(c) for c in clips]
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            conn.execute(EventClip.__table__.insert(), rows)
+        return len(rows)
+
+    def query_clips(self, *, camera: str = None, type: str = None, start=None, end=None,
+                    limit: int = 50) -> list:
+        """Newest-first clips, filtered by camera, event type and event time."""
+        stmt = select(EventClip)
+        if camera is not None:
+            stmt = stmt.where(EventClip.camera == camera)
+        if type is not None:
+            stmt = stmt.where(EventClip.event_type == type)
+        if start is not None:
+            stmt = stmt.where(EventClip.event_at >= _naive_utc(start))
+        if end is not None:
+            stmt = stmt.where(EventClip.event_at < _naive_utc(end))
+        stmt = stmt.order_by(EventClip.event_at.desc(), EventClip.id.desc()).limit(limit)
+        with self.Session() as session:
+            return [c.to_dict() for c in session.execute(stmt).scalars().all()]
+
+    def clip_path(self, clip_id: int):
+        """File of clip ``clip_id`` or None."""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(EventClip.path).where(EventClip.id == clip_id)
+            ).scalar_one_or_none()
+
+    def _hour_bucket(self, column):
+        if self.engine.dialect.name == 'sqlite':
+            return func.strftime('%Y-%m-%dT%H:00:00', column)
+        return func.date_trunc('hour', column)
+
+
+def _naive_utc(value):
+    """Timestamps are stored as naive UTC; convert aware datetimes."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromisoformat(value)
+
+
+def _iso(value) -> str:
+    return value.isoformat() if isinstance(value, datetime.datetime) else str(value)
+
+
+def _filters(type, start, end, camera=None) -> list:
+    where = []
+    if type is not None:
+        where.append(Event.type == type)
+    if camera is not None:
+        where.append(Event.camera == camera)
+    if start is not None:
+        where.append(Event.timestamp >= _naive_utc(start))
+    if end is not None:
+        where.append(Event.timestamp < _naive_utc(end))
+    return where
+
+
+def encode_cursor(event: Event) -> str:
+    raw = f"{event.timestamp.isoformat()}|{event.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` if malformed."""
+    try:
+        ts, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(ts), int(last_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _add_missing_columns(engine, table) -> None:
+    """Add model columns missing from a table created by an older version."""
+    existing = {c['name'] for c in inspect(engine).get_columns(table.name)}
+    missing = [c for c in table.columns if c.name not in existing]
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for column in missing:
+            ddl = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl}'))
+
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    # WAL lets readers (API) run while the writer commits; NORMAL sync is
+    # durable enough for detection events and much faster than FULL.
+    cur = dbapi_conn.cursor()
+    cur.execute('PRAGMA journal_mode=WAL')
+    cur.execute('PRAGMA synchronous=NORMAL')
+    cur.close()
@@ -0,0 +1,136 @@
+"""Write-behind event persistence."""
+
+import datetime
+import logging
+import time
+from collections import deque
+from threading import Thread, Event, Condition
+
+
+class EventWriter:
+    """Buffer events in memory and bulk-insert them from a background thread.
+
+    ``save_event`` never touches the database: it stamps the event and
+    appends it to a bounded buffer (the oldest events are dropped if the DB
+    falls behind for too long, and counted in ``dropped``). The writer
+    flushes when ``max_batch`` events are pending or ``flush_interval``
+    seconds have passed, and drains the buffer on ``stop``. After a failed
+    write it waits ``flush_interval``, doubling up to ``max_backoff``, before
+    trying again; while ``db`` is still ``None`` it checks once per
+    ``flush_interval``. It has the same ``save_event`` method as ``Database``,
+    so ``EventManager`` can use either.
+    """
+
+    def __init__(self, db, *, max_batch: int = 500, flush_interval: float = 1.0, max_pending: int = 100_000,
+                 max_backoff: float = 60.0):
+        self.db = db
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self._buffer = deque(maxlen=max_pending)
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Thread = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+        self._backoff = 0.0       # current retry delay (0 = healthy)
+        self._retry_at = 0.0
+        self._logged_at = float("-inf")
+
+    def save_event(self, data: dict) -> None:
+        """Queue one event; returns immediately."""
+        event = dict(data)
+        event.setdefault('timestamp', datetime.datetime.utcnow())
+        with self._cond:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+            if len(self._buffer) >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread and flush everything still buffered."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self.flush()
+
+    def _take(self) -> list:
+        with self._cond:
+            n = min(self.max_batch, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(n)]
+
+    def flush(self) -> int:
+        """Write all buffered events now; returns how many were written."""
+        if self.db is None:
+            return 0  # database not connected yet: keep buffering
+        total = 0
+        while True:
+            batch = self._take()
+            if not batch:
+                return total
+            try:
+                total += self.db.save_events(batch)
+            except Exception:
+                self._failed(batch)
+                return total
+            self.written += len(batch)
+            self._backoff = 0.0
+
+    def _failed(self, batch: list) -> None:
+        """Put a failed batch back in front and schedule the next attempt."""
+        self.failures += 1
+        self._backoff = min(max(self.flush_interval, self._backoff * 2), self.max_backoff)
+        self._retry_at = time.time() + self._backoff
+        with self._cond:
+            # events that arrived meanwhile may have filled the buffer: drop
+            # the oldest of the batch, like save_event does, and count them
+            room = self._buffer.maxlen - len(self._buffer)
+            lost = max(len(batch) - room, 0)
+            if lost:
+                self.dropped += lost
+                batch = batch[lost:]
+            self._buffer.extendleft(reversed(batch))
+            pending = len(self._buffer)
+        now = time.time()
+        if now - self._logged_at >= self.max_backoff:
+            self._logged_at = now
+            logging.exception("Failed to persist events (%d failures, %d pending); retrying in %.1f s",
+                              self.failures, pending, self._backoff)
+        if lost:
+            logging.warning("Event buffer full: dropped %d oldest events", lost)
+
+    def _loop(self):
+        last = time.time()
+        while not self._stop.is_set():
+            with self._cond:
+                if self._backoff:
+                    # after a failure only the retry timer starts a new attempt
+                    self._cond.wait_for(self._stop.is_set, timeout=max(0.0, self._retry_at - time.time()))
+                elif self.db is None:
+                    # not connected yet: a full batch can't be written either
+                    self._cond.wait_for(self._stop.is_set, timeout=self.flush_interval)
+                else:
+                    self._cond.wait_for(
+                        lambda: len(self._buffer) >= self.max_batch or self._stop.is_set(),
+                        timeout=max(0.0, self.flush_interval - (time.time() - last)),
+                    )
+            if self._stop.is_set():
+                break
+            self.flush()
+            last = time.time()
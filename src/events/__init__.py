@@ -1,3 +1,4 @@
 from .manager import EventManager
+from .rules import build_rules
 
-__all__ = ["EventManager"]
+__all__ = ["EventManager", "build_rules"]
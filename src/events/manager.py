@@ -1,15 +1,85 @@
+import datetime
+import logging
+import time
+
+from .rules import Observation, build_rules
+
+
 class EventManager:
-    """Analyzes detections and manages event persistence."""
+    """Analyzes detections and manages event persistence.
 
-    def __init__(self, db, rules: dict):
+    ``rules`` maps rule names to their parameters (see
+    :func:`src.events.rules.build_rules`). Each frame is reduced once to an
+    :class:`Observation` and every rule updates its own state from it, so the
+    cost per frame does not grow with history. Events go to ``db`` (a
+    ``Database`` or an ``EventWriter``) and, for rules with ``notify``
+    enabled, to the ``notify(event)`` callback. ``on_event(event)`` is called
+    for every event (e.g. to record a clip around it).
+    """
+
+    def __init__(self, db, rules: dict, *, camera: str = None, notify=None, on_event=None):
         self.db = db
-        self.rules = rules
+        self.rules = build_rules(rules)
+        self.camera = camera
+        self.notify = notify
+        self.on_event = on_event
+
+    def observe(self, detections, frame_shape=None, now: float = None) -> Observation:
+        """Summarize one frame of detections (count, best confidence, edge distance)."""
+        count, best, edge = 0, 0.0, 1.0
+        for r in detections or []:
+            boxes = getattr(r, "boxes", None) or []
+            shape = frame_shape or getattr(r, "orig_shape", None)
+            for box in boxes:
+                count += 1
+                best = max(best, float(box.conf[0]))
+                if shape is not None:
+                    h, w = shape[:2]
+                    x1, y1, x2, y2 = map(float, box.xyxy[0])
+                    cx, cy = (x1 + x2) / 2 / w, (y1 + y2) / 2 / h
+                    edge = min(edge, cx, 1 - cx, cy, 1 - cy)
+        return Observation(count, best, edge, time.time() if now is None else now)
 
-    def analyze(self, detections):
-        """Return events based on detections (stub)."""
-        # In a real implementation, this would inspect detections
-        return []
+    def analyze(self, detections, frame_shape=None, now: float = None):
+        """Update every rule with one frame and return the events it triggered."""
+        obs = self.observe(detections, frame_shape, now)
+        events = []
+        for rule in self.rules:
+            hit = rule.update(obs)
+            if hit is None:
+                continue
+            etype, confidence, message = hit
+            events.append({
+                "type": etype,
+                "confidence": confidence,
+                "camera": self.camera,
+                "rule": rule.name,
+                "message": message,
+                "notify": rule.notify,
+                "timestamp": datetime.datetime.utcfromtimestamp(obs.now),
+            })
+        return events
 
     def persist(self, events):
         for ev in events:
             self.db.save_event(ev)
+
+    def process(self, detections, frame_shape=None, now: float = None):
+        """Analyze a frame, persist its events and notify; returns the events."""
+        events = self.analyze(detections, frame_shape, now)
+        if events:
+            self.persist(events)
+            if self.on_event is not None:
+                for ev in events:
+                    try:
+                        self.on_event(ev)
+                    except Exception:
+                        logging.exception("Event hook failed for %s", ev["type"])
+            if self.notify is not None:
+                for ev in events:
+                    if ev["notify"]:
+                        try:
+                            self.notify(ev)
+                        except Exception:
+                            logging.exception("Failed to notify event %s", ev["type"])
+        return events
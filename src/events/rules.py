@@ -0,0 +1,156 @@
+"""Stateful detection rules evaluated incrementally, one frame at a time.
+
+Every rule keeps a handful of counters/timestamps and does O(1) work per
+frame; nothing rescans past detections. Rules are edge-triggered: they
+emit one event when their condition starts to hold and re-arm once it
+clears, so a condition lasting hours produces a single event.
+"""
+
+from collections import deque
+
+
+class Observation:
+    """Per-frame summary shared by all rules (computed once per frame)."""
+
+    __slots__ = ("count", "best_conf", "edge_distance", "now")
+
+    def __init__(self, count: int, best_conf: float, edge_distance: float, now: float):
+        self.count = count
+        self.best_conf = best_conf
+        # smallest distance from a box centre to the frame border, as a
+        # fraction of the frame size (0.5 = centre; 1.0 when nobody is seen)
+        self.edge_distance = edge_distance
+        self.now = now
+
+
+class Rule:
+    """Base class: subclasses implement :meth:`update`."""
+
+    kind = None
+    #: rules whose events deserve a push notification by default
+    notify_default = True
+
+    def __init__(self, name: str, *, notify: bool = None):
+        self.name = name
+        self.notify = self.notify_default if notify is None else notify
+
+    def update(self, obs: Observation):
+        """Feed one frame; return ``(type, confidence, message)`` or None."""
+        raise NotImplementedError
+
+
+class NoPersonRule(Rule):
+    """No person for ``seconds``; emits ``presence`` when someone returns."""
+
+    kind = "no_person"
+
+    def __init__(self, name: str, *, seconds: float = 30, **kwargs):
+        super().__init__(name, **kwargs)
+        self.seconds = seconds
+        self._last_seen = None
+        self._absent = False
+
+    def update(self, obs):
+        if self._last_seen is None:
+            self._last_seen = obs.now
+        if obs.count:
+            self._last_seen = obs.now
+            if self._absent:
+                self._absent = False
+                return "presence", obs.best_conf, "Pessoa detectada novamente"
+        elif not self._absent and obs.now - self._last_seen > self.seconds:
+            self._absent = True
+            return "absence", None, f"Nenhuma pessoa detectada há {self.seconds:g} s"
+        return None
+
+
+class EdgeZoneRule(Rule):
+    """A person's box centre entered the outer ``margin`` of the frame."""
+
+    kind = "edge_zone"
+
+    def __init__(self, name: str, *, margin: float = 0.1, **kwargs):
+        super().__init__(name, **kwargs)
+        self.margin = margin
+        self._inside = False
+
+    def update(self, obs):
+        near = obs.edge_distance < self.margin
+        if near and not self._inside:
+            self._inside = True
+            return "edge_zone", obs.best_conf, "Pessoa próxima à borda da imagem"
+        if not near:
+            self._inside = False
+        return None
+
+
+class MaxPersonsRule(Rule):
+    """More than ``count`` people in at least ``min_frames`` of the last ``window`` frames."""
+
+    kind = "max_persons"
+
+    def __init__(self, name: str, *, count: int = 1, window: int = 10, min_frames: int = None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.count = count
+        self.min_frames = min_frames or max(1, window // 2)
+        self._window = deque(maxlen=window)
+        self._hits = 0
+        self._active = False
+
+    def update(self, obs):
+        # running sum over the window: add the new frame, drop the evicted one
+        hit = obs.count > self.count
+        if len(self._window) == self._window.maxlen:
+            self._hits -= self._window[0]
+        self._window.append(hit)
+        self._hits += hit
+
+        if self._hits >= self.min_frames and not self._active:
+            self._active = True
+            return "max_persons", obs.best_conf, f"Mais de {self.count} pessoa(s) detectada(s)"
+        if self._hits == 0:
+            self._active = False
+        return None
+
+
+class LowConfidenceRule(Rule):
+    """``frames`` consecutive frames whose best detection is below ``threshold``."""
+
+    kind = "low_confidence"
+    notify_default = False
+
+    def __init__(self, name: str, *, threshold: float = 0.5, frames: int = 10, **kwargs):
+        super().__init__(name, **kwargs)
+        self.threshold = threshold
+        self.frames = frames
+        self._streak = 0
+
+    def update(self, obs):
+        if obs.count and obs.best_conf < self.threshold:
+            self._streak += 1
+            if self._streak == self.frames:
+                return "low_confidence", obs.best_conf, "Detecções com baixa confiança"
+        else:
+            self._streak = 0
+        return None
+
+
+RULES = {cls.kind: cls for cls in (NoPersonRule, EdgeZoneRule, MaxPersonsRule, LowConfidenceRule)}
+
+
+def build_rules(config: dict) -> list:
+    """Instantiate rules from ``{name: {"kind": ..., **params}}``.
+
+    ``kind`` defaults to the name, so ``{"no_person": {"seconds": 60}}``
+    is enough for a single rule of each kind.
+    """
+    rules = []
+    for name, params in (config or {}).items():
+        params = dict(params or {})
+        kind = params.pop("kind", name)
+        try:
+            cls = RULES[kind]
+        except KeyError:
+            raise ValueError(f"Unknown rule kind {kind!r}; expected one of {sorted(RULES)}") from None
+        rules.append(cls(name, **params))
+    return rules
@@ -1,11 +1,392 @@
+"""CPU inference backends for the YOLO person detector.
+
+``InferenceEngine`` exports ``yolo11n.pt`` once to ONNX (optionally INT8) or
+OpenVINO, caches the result on disk and runs it with a fixed thread count.
+Outputs mimic the ultralytics ``Results``/``Boxes`` layout used by the rest
+of the server (``r.boxes``, ``box.xyxy[0]``, ``box.conf[0]``), so callers do
+not care which backend produced them. When the selected runtime is missing
+the engine falls back to the plain ultralytics/PyTorch backend.
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from threading import Lock
+
+import cv2
+import numpy as np
+
+from src.metrics import REGISTRY
+
+BACKENDS = ("torch", "onnx", "openvino")
+
+INFERENCE = REGISTRY.histogram(
+    "inference_seconds", "Duration of one (possibly batched) forward pass", ("backend",))
+INFERENCE_FRAMES = REGISTRY.counter("inference_frames_total", "Frames run through the detector")
+
+
+class Box:
+    """Single detection, indexed like an ultralytics ``Boxes`` row."""
+
+    def __init__(self, xyxy, conf: float, cls: int):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(1, 4)
+        self.conf = np.asarray([conf], dtype=np.float32)
+        self.cls = np.asarray([cls], dtype=np.float32)
+
+
+class Prepared:
+    """Letterboxed input of one frame, ready for a raw-tensor backend.
+
+    When only a region of the frame was used, ``orig_shape`` is the shape
+    of that crop and ``offset``/``frame_shape`` map boxes back to the full
+    frame.
+    """
+
+    __slots__ = ("image", "ratio", "pad", "orig_shape", "offset", "frame_shape")
+
+    def __init__(self, image, ratio, pad, orig_shape, offset=(0, 0), frame_shape=None):
+        self.image = image
+        self.ratio = ratio
+        self.pad = pad
+        self.orig_shape = orig_shape
+        self.offset = offset
+        self.frame_shape = frame_shape or orig_shape
+
+
+class Detections:
+    """Detections of one frame (``boxes`` is a list of :class:`Box`)."""
+
+    def __init__(self, boxes, orig_shape):
+        self.boxes = boxes
+        self.orig_shape = orig_shape
+
+    def __len__(self):
+        return len(self.boxes)
+
+
+def crop(frame, roi):
+    """Crop ``roi`` = ``(x1, y1, x2, y2)`` in pixels, clamped to the frame.
+
+    Returns ``(view, (x1, y1))``; the view shares memory with ``frame``.
+    """
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = (int(round(v)) for v in roi)
+    x1, x2 = min(max(x1, 0), w - 1), min(max(x2, 1), w)
+    y1, y2 = min(max(y1, 0), h - 1), min(max(y2, 1), h)
+    if x2 <= x1 or y2 <= y1:
+        return frame, (0, 0)
+    return frame[y1:y2, x1:x2], (x1, y1)
+
+
+def reproject(result, offset, frame_shape) -> "Detections":
+    """Shift boxes detected on a crop back to full-frame coordinates."""
+    ox, oy = offset
+    boxes = []
+    for b in result.boxes:
+        x1, y1, x2, y2 = (float(v) for v in b.xyxy[0])
+        boxes.append(Box((x1 + ox, y1 + oy, x2 + ox, y2 + oy), float(b.conf[0]), int(b.cls[0])))
+    return Detections(boxes, frame_shape)
+
+
+def letterbox(frame, size: int):
+    """Resize keeping aspect ratio and pad to ``size``x``size``.
+
+    Returns ``(image, ratio, (pad_x, pad_y))``.
+    """
+    h, w = frame.shape[:2]
+    r = min(size / h, size / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    if (nw, nh) != (w, h):
+        frame = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    out[pad_y:pad_y + nh, pad_x:pad_x + nw] = frame
+    return out, r, (pad_x, pad_y)
+
+
+def decode_yolo(output, ratio, pad, orig_shape, *, conf=0.4, iou=0.45, classes=None):
+    """Decode one ``(4 + nc, anchors)`` YOLOv8/11 head output into :class:`Detections`."""
+    preds = output.T  # (anchors, 4 + nc)
+    scores = preds[:, 4:]
+    cls_ids = scores.argmax(axis=1)
+    confs = scores[np.arange(len(scores)), cls_ids]
+    keep = confs >= conf
+    if classes is not None:
+        keep &= np.isin(cls_ids, classes)
+    preds, cls_ids, confs = preds[keep], cls_ids[keep], confs[keep]
+    if not len(preds):
+        return Detections([], orig_shape)
+
+    cx, cy, w, h = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+    x1 = (cx - w / 2 - pad[0]) / ratio
+    y1 = (cy - h / 2 - pad[1]) / ratio
+    bw, bh = w / ratio, h / ratio
+    rects = np.stack([x1, y1, bw, bh], axis=1)
+    idx = cv2.dnn.NMSBoxes(rects.tolist(), confs.tolist(), conf, iou)
+    idx = np.asarray(idx).reshape(-1)
+
+    oh, ow = orig_shape[:2]
+    boxes = []
+    for i in idx:
+        bx1, by1, bw_, bh_ = rects[i]
+        xyxy = (
+            min(max(bx1, 0), ow), min(max(by1, 0), oh),
+            min(max(bx1 + bw_, 0), ow), min(max(by1 + bh_, 0), oh),
+        )
+        boxes.append(Box(xyxy, float(confs[i]), int(cls_ids[i])))
+    boxes.sort(key=lambda b: -b.conf[0])
+    return Detections(boxes, orig_shape)
+
+
 class InferenceEngine:
-    """Stub inference engine."""
+    """Pluggable YOLO detector (``torch``, ``onnx`` or ``openvino`` on CPU)."""
 
-    def __init__(self, model_path: str, device: str = "cpu"):
+    def __init__(
+        self,
+        model_path: str = "yolo11n.pt",
+        device: str = "cpu",
+        *,
+        backend: str = "onnx",
+        imgsz: int = 640,
+        int8: bool = False,
+        threads: int = None,
+        cache_dir: str = "models",
+        conf: float = 0.4,
+        iou: float = 0.45,
+        classes=(0,),
+        warmup: int = 2,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
         self.model_path = model_path
         self.device = device
-        # Real implementation would load a ML model
+        self.backend = backend
+        self.imgsz = imgsz
+        self.int8 = int8
+        self.threads = threads or os.cpu_count() or 1
+        self.cache_dir = Path(cache_dir)
+        self.conf = conf
+        self.iou = iou
+        self.classes = list(classes) if classes is not None else None
+        self.warmup = warmup
+
+        self._model = None
+        # Exported backends set ``_forward`` (NCHW blob -> raw head output);
+        # the torch backend sets ``_predict`` (frames -> ultralytics Results).
+        self._forward = None
+        self._predict = None
+        # True only after the warm-up passes: until then callers such as the
+        # pipeline keep real frames away from the model
+        self._ready = False
+        # ultralytics predict is not thread-safe; runtimes are, but a single
+        # forward pass already uses all ``threads`` so concurrent calls only
+        # fight for the same cores.
+        self._lock = Lock()
+        # load() may race between a background loader and the first infer()
+        self._load_lock = Lock()
+
+    @classmethod
+    def from_env(cls) -> "InferenceEngine":
+        """Build an engine from ``INFER_*`` environment variables."""
+        return cls(
+            os.getenv("INFER_MODEL", "yolo11n.pt"),
+            backend=os.getenv("INFER_BACKEND", "onnx"),
+            imgsz=int(os.getenv("INFER_IMGSZ", 640)),
+            int8=os.getenv("INFER_INT8", "false").lower() in ("1", "true", "yes"),
+            threads=int(os.getenv("INFER_THREADS", 0)) or None,
+            cache_dir=os.getenv("INFER_CACHE_DIR", "models"),
+        )
+
+    @property
+    def loaded(self) -> bool:
+        """Model loaded and warmed up."""
+        return self._ready
+
+    @property
+    def _has_backend(self) -> bool:
+        return self._forward is not None or self._predict is not None
+
+    def load(self) -> "InferenceEngine":
+        """Export (if needed), load the model and run warm-up passes.
+
+        Called lazily by the first inference; concurrent callers wait for a
+        single load. If the configured backend fails for any reason (missing
+        runtime, failed export, corrupt cache) it falls back to torch; if
+        that fails too the engine stays unloaded and the error propagates,
+        so a later call can try again.
+        """
+        if self._ready:
+            return self
+        with self._load_lock:
+            if not self._ready:
+                try:
+                    self._load()
+                except Exception:
+                    # never leave a half-loaded (or un-warmed) model behind
+                    self._forward = self._predict = None
+                    raise
+                self._ready = True
+        return self
+
+    def _load(self) -> None:
+        loaders = {
+            "torch": self._load_torch,
+            "onnx": self._load_onnx,
+            "openvino": self._load_openvino,
+        }
+        try:
+            loaders[self.backend]()
+        except Exception as e:
+            if self.backend == "torch":
+                raise
+            logging.exception("Backend %s failed to load (%s); falling back to torch", self.backend, e)
+            self._forward = None
+            self._load_torch()
+            self.backend = "torch"
+
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(self.warmup):
+            self.infer(dummy)
+
+    # -- export -----------------------------------------------------------
+    def _export(self, fmt: str, target: Path, **kwargs) -> Path:
+        """Export ``model_path`` with ultralytics and move it to ``target``."""
+        if target.exists():
+            return target
+        from ultralytics import YOLO
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        logging.info("Exporting %s to %s (first run only)", self.model_path, fmt)
+        exported = YOLO(self.model_path).export(format=fmt, imgsz=self.imgsz, **kwargs)
+        shutil.move(str(exported), str(target))
+        return target
+
+    def _artifact(self, suffix: str) -> Path:
+        stem = Path(self.model_path).stem
+        tag = "_int8" if self.int8 else ""
+        return self.cache_dir / f"{stem}_{self.imgsz}{tag}{suffix}"
+
+    # -- backends ---------------------------------------------------------
+    def _load_torch(self):
+        from ultralytics import YOLO
+
+        try:
+            import torch
+
+            torch.set_num_threads(self.threads)
+        except ImportError:
+            pass
+        self._model = YOLO(self.model_path)
+
+        def predict(frames):
+            return list(self._model.predict(
+                source=frames, conf=self.conf, iou=self.iou, classes=self.classes,
+                imgsz=self.imgsz, device=self.device, verbose=False,
+            ))
+
+        self._predict = predict
+
+    def _load_onnx(self):
+        import onnxruntime as ort
+
+        path = self._artifact(".onnx")
+        if not path.exists():
+            fp32 = self._export("onnx", self._artifact(".fp32.onnx") if self.int8 else path,
+                                dynamic=True, simplify=True)
+            if self.int8:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                quantize_dynamic(str(fp32), str(path), weight_type=QuantType.QUInt8)
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = self.threads
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+        self._model = session
+        input_name = session.get_inputs()[0].name
+
+        self._forward = lambda blob: session.run(None, {input_name: blob})[0]
+
+    def _load_openvino(self):
+        import openvino as ov
+
+        path = self._artifact("_openvino")
+        self._export("openvino", path, int8=self.int8, dynamic=True)
+        xml = next(path.glob("*.xml"))
+        core = ov.Core()
+        compiled = core.compile_model(
+            core.read_model(xml), "CPU",
+            {"INFERENCE_NUM_THREADS": self.threads, "PERFORMANCE_HINT": "LATENCY"},
+        )
+        self._model = compiled
+        output = compiled.output(0)
+
+        self._forward = lambda blob: compiled([blob])[output]
+
+    # -- public API -------------------------------------------------------
+    def preprocess(self, frame, roi=None, size: int = None):
+        """Prepare one frame for :meth:`infer_prepared`.
+
+        Letterboxing runs here, outside the model lock, so a pipeline can do
+        it in its own stage. ``roi`` (pixels, ``x1, y1, x2, y2``) restricts
+        detection to that region and ``size`` overrides ``imgsz`` for this
+        frame (exported models are dynamic). The torch backend preprocesses
+        internally and gets the (cropped) frame.
+        """
+        if not self._has_backend:
+            self.load()
+        offset = (0, 0)
+        image = frame
+        if roi is not None:
+            image, offset = crop(frame, roi)
+        if self._forward is None:
+            if roi is None:
+                return frame
+            return Prepared(image, 1.0, (0, 0), image.shape, offset, frame.shape)
+        img, ratio, pad = letterbox(image, size or self.imgsz)
+        return Prepared(img, ratio, pad, image.shape, offset, frame.shape)
+
+    def infer_prepared(self, items):
+        """Run inference over items returned by :meth:`preprocess`.
+
+        Items of the same input size share one forward pass.
+        """
+        if not self._has_backend:
+            self.load()
+        items = list(items)
+        INFERENCE_FRAMES.inc(len(items))
+        if self._forward is None:
+            frames = [p.image if isinstance(p, Prepared) else p for p in items]
+            with self._lock, INFERENCE.time(self.backend):
+                results = self._predict(frames)
+            return [
+                reproject(r, p.offset, p.frame_shape) if isinstance(p, Prepared) else r
+                for r, p in zip(results, items)
+            ]
+
+        groups: dict = {}
+        for i, p in enumerate(items):
+            groups.setdefault(p.image.shape, []).append(i)
+        out = [None] * len(items)
+        for idx in groups.values():
+            blob = np.stack([items[i].image for i in idx])[..., ::-1].transpose(0, 3, 1, 2)  # BGR→RGB, NCHW
+            blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+            with self._lock, INFERENCE.time(self.backend):
+                raw = self._forward(blob)
+            for j, i in enumerate(idx):
+                p = items[i]
+                det = decode_yolo(raw[j], p.ratio, p.pad, p.orig_shape,
+                                  conf=self.conf, iou=self.iou, classes=self.classes)
+                out[i] = det if p.frame_shape == p.orig_shape else reproject(det, p.offset, p.frame_shape)
+        return out
+
+    def infer(self, frame, roi=None, size: int = None):
+        """Detect on one frame; returns a one-element list like ``predict``."""
+        return self.infer_prepared([self.preprocess(frame, roi, size)])
 
-    def infer(self, frame):
-        """Return empty detections list."""
-        return []
+    def infer_batch(self, frames):
+        """Detect on several frames in a single forward pass."""
+        return self.infer_prepared([self.preprocess(f) for f in frames])
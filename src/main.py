@@ -1,168 +1,558 @@
-import os
 import time
-import cv2
+_IMPORT_STARTED = time.perf_counter()
+
+import os
+import asyncio
+import json
 import logging
-from threading import Thread, Event
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, FileResponse
+
+from src.camera import CameraManager, load_camera_configs
+from src.processing import MotionGate, DetectionPipeline, RoiSelector, Tracker
+from src.inference import InferenceEngine
+from src.streaming import MjpegHub, StreamProfile, DetectionBroadcaster
+from src.metrics import REGISTRY
+from src.notifications import TokenRegistry, IdentifiedNotifier, NotificationDispatcher, FcmTransport, StubTransport
+from src.db import Database, EventWriter
+from src.events import EventManager
+from src.recording import ClipRecorder, ClipWriter
+from src.monitor.presence_monitor import PresenceMonitor
+from src.readiness import Readiness, FAILED, PENDING, READY
 
-from fastapi import FastAPI, HTTPException, Response
-from fastapi.responses import JSONResponse, StreamingResponse
+# Estado de cada subsistema para /api/ready; o relógio começa no import
+readiness = Readiness(_IMPORT_STARTED)
 
-from src.camera import CameraHandler
-from src.processing import VideoProcessor
-from src.notifications import TokenRegistry, IdentifiedNotifier
-from src.monitor.presence_monitor import PresenceMonitor
-from src.firebase_setup import init_firebase
-
-# Configurações e inicialização de câmera e processador
-driver = {
-    "host": os.getenv("CAM_HOST", "192.168.0.176"),
-    "port": int(os.getenv("CAM_PORT", 80)),
-    "user": os.getenv("CAM_USER", "admin"),
-    "passwd": os.getenv("CAM_PASS", "123456"),
-}
-camera = CameraHandler(**driver)
-processor = VideoProcessor(camera)
+# Configurações e inicialização das câmeras (CAMERAS_CONFIG ou CAM_*)
+cameras = CameraManager(load_camera_configs())
 token_registry = TokenRegistry()
 fcm_key = os.getenv("FCM_KEY", "")
 notifier = IdentifiedNotifier(fcm_key, cooldown=60)
-presence_monitor = PresenceMonitor(notifier, token_registry)
-init_firebase()
-
-# Eventos para controle de threads de processamento
-t_processing_stop = Event()
-t_processing_thread = Thread(target=lambda: None)
+# Envio em segundo plano, em lotes multicast, com retry e cooldown por
+# token e tipo de evento (NOTIFY_TRANSPORT=stub só registra no log)
+dispatcher = NotificationDispatcher(
+    StubTransport() if os.getenv("NOTIFY_TRANSPORT", "fcm") == "stub" else FcmTransport(),
+    token_registry,
+    cooldown=float(os.getenv("NOTIFY_COOLDOWN", 60)),
+    on_invalid=token_registry.remove_many,
+)
+
+# Um monitor por câmera; a engine de inferência (export/cache
+# ONNX/OpenVINO + warm-up) é compartilhada e carregada uma única vez, em
+# segundo plano no lifespan, para o servidor responder antes disso
+engine = InferenceEngine.from_env()
+readiness.register("model")
+readiness.register("firebase", required=False)
+monitors: dict = {}
+# ROI/resolução de inferência por câmera (bloco "detection" do CAMERAS_CONFIG)
+rois: dict = {}
+for _slot in cameras:
+    if _slot.detection:
+        rois[_slot.id] = RoiSelector.from_config(_slot.detection)
+    monitors[_slot.id] = PresenceMonitor(notifier, token_registry, camera=_slot.id,
+                                         dispatcher=dispatcher)
+
+# Persistência de eventos com write-behind: o pipeline só enfileira em
+# memória; uma thread grava em lote (EVENTS_BATCH_MAX ou EVENTS_FLUSH_MS).
+# O banco é aberto no lifespan, em segundo plano; até lá os eventos ficam
+# no buffer do EventWriter
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///events.db")
+database: Database = None
+readiness.register("database")
+event_writer = EventWriter(
+    None,
+    max_batch=int(os.getenv("EVENTS_BATCH_MAX", 500)),
+    flush_interval=float(os.getenv("EVENTS_FLUSH_MS", 1000)) / 1000,
+)
+
+# Regras de eventos por câmera (EVENT_RULES, JSON). São a única origem dos
+# eventos e notificações de ausência/retorno (regra no_person)
+EVENT_RULES = json.loads(os.getenv("EVENT_RULES", '{"no_person": {"seconds": 30}}'))
+
+# Título da notificação por tipo de evento
+EVENT_TITLES = {
+    "absence": "Ausência de humano",
+    "presence": "Pessoa detectada",
+    "edge_zone": "Pessoa próxima à borda",
+    "max_persons": "Várias pessoas detectadas",
+    "low_confidence": "Detecções com baixa confiança",
+}
 
 
-# Função de loop contínuo de processamento
-def processing_loop():
-    """
-    Loop dedicado ao rastreamento automático PTZ com base na detecção de pessoa.
-    Não salva nem exibe nada — só move a câmera.
-    """
-    while not t_processing_stop.is_set():
-        frame = camera.get_frame()
-        presence_monitor.check_camera(frame)
-        if frame is None:
-            time.sleep(0.1)
-            continue
+def _notify_event(event: dict) -> None:
+    title = EVENT_TITLES.get(event["type"]) or event["type"].replace("_", " ").capitalize()
+    if event.get("camera"):
+        title = f"{title} ({event['camera']})"
+    # cooldown por tipo de evento e câmera
+    dispatcher.submit(f"{event['type']}:{event.get('camera')}", title, event["message"],
+                      data={"camera": event.get("camera") or ""}, camera=event.get("camera"))
+
+
+# Pré-gravação por câmera (JPEG reduzido em memória, RECORD_BUFFER_MB) e
+# clipes de RECORD_PRE_S antes a RECORD_POST_S depois de cada evento,
+# gravados em RECORD_DIR por uma thread própria
+RECORD_ENABLED = os.getenv("RECORD_ENABLED", "true").lower() in ("1", "true", "yes")
+clip_writer = ClipWriter(os.getenv("RECORD_DIR", "clips"))
+recorders: dict = {}
+if RECORD_ENABLED:
+    for _slot in cameras:
+        recorders[_slot.id] = ClipRecorder(
+            _slot.camera, clip_writer,
+            camera_id=_slot.id,
+            pre_seconds=float(os.getenv("RECORD_PRE_S", 10)),
+            post_seconds=float(os.getenv("RECORD_POST_S", 10)),
+            fps=float(os.getenv("RECORD_FPS", 5)),
+            quality=int(os.getenv("RECORD_QUALITY", 70)),
+            width=int(os.getenv("RECORD_WIDTH", 640)),
+            max_bytes=int(float(os.getenv("RECORD_BUFFER_MB", 32)) * 2**20),
+        )
+
+event_managers = {
+    _slot.id: EventManager(
+        event_writer, EVENT_RULES, camera=_slot.id, notify=_notify_event,
+        on_event=recorders[_slot.id].trigger_event if _slot.id in recorders else None,
+    )
+    for _slot in cameras
+}
 
-        results = processor.process_frame_data(frame)
-        if results is None:
-            results = []
-        presence_monitor.handle_detections(results)
+# Atalhos para a câmera padrão, usada pelas rotas legadas /api/*
+camera = cameras.default.camera
+
+# Executor dedicado à codificação JPEG dos snapshots fora do event loop,
+# sem disputar o threadpool do Starlette usado pelas rotas síncronas
+SNAPSHOT_WORKERS = int(os.getenv("SNAPSHOT_WORKERS", 2))
+snapshot_executor: ThreadPoolExecutor = None
+
+# Filtro de movimento por câmera: sem mudança na cena, reaproveita as
+# últimas detecções em vez de rodar o YOLO (MOTION_ENABLED=false desliga)
+MOTION_ENABLED = os.getenv("MOTION_ENABLED", "true").lower() in ("1", "true", "yes")
+gates: dict = {}
+if MOTION_ENABLED:
+    for _slot in cameras:
+        gates[_slot.id] = MotionGate(
+            threshold=float(os.getenv("MOTION_THRESHOLD", 0.005)),
+            max_interval=float(os.getenv("MOTION_MAX_INTERVAL", 5.0)),
+        )
+
+# Tracker por câmera: IDs estáveis, alvo suavizado para o PTZ e inferência só
+# a cada TRACK_DETECT_EVERY frames (posições previstas nos demais)
+TRACK_ENABLED = os.getenv("TRACK_ENABLED", "true").lower() in ("1", "true", "yes")
+trackers: dict = {}
+if TRACK_ENABLED:
+    for _slot in cameras:
+        trackers[_slot.id] = Tracker(max_age=float(os.getenv("TRACK_MAX_AGE", 1.0)))
+
+# Detecções por frame para clientes WebSocket/SSE (/api/detections), cada um
+# com fila própria de DETECTIONS_BUFFER mensagens
+detections = DetectionBroadcaster(
+    buffer=int(os.getenv("DETECTIONS_BUFFER", 8)),
+    max_subscribers=int(os.getenv("DETECTIONS_MAX_CLIENTS", 100)),
+)
+
+# Pipeline de detecção: captura → pré-processamento → inferência em lote
+# (último frame de cada câmera) → presença → PTZ, cada estágio em sua thread
+pipeline = DetectionPipeline(
+    cameras, engine, monitors,
+    gates=gates,
+    events=event_managers,
+    rois=rois,
+    trackers=trackers,
+    broadcaster=detections,
+    detect_every=int(os.getenv("TRACK_DETECT_EVERY", 3)) if TRACK_ENABLED else 1,
+    max_batch=int(os.getenv("INFER_BATCH_MAX", 8)),
+    max_wait=float(os.getenv("INFER_BATCH_WAIT_MS", 20)) / 1000,
+)
+pipeline.register_metrics(REGISTRY)
+readiness.register("pipeline")
 
-        height, width = frame.shape[:2]
 
-        for r in results:
-            for box in r.boxes:
-                x1, y1, x2, y2 = map(float, box.xyxy[0])
-                cx = (x1 + x2) / 2
-                cy = (y1 + y2) / 2
+# FastAPI com contexto de vida (lifespan)
+from contextlib import asynccontextmanager
 
-                err_x = (cx - width / 2) / width
-                err_y = (cy - height / 2) / height
 
-                # Só move se estiver fora da zona morta
-                if abs(err_x) > 0.1 or abs(err_y) > 0.1:
-                    camera.control_ptz(err_x, err_y, kp=0.6)
+def _init_firebase() -> None:
+    # firebase_admin (e as bibliotecas do Google) só são importados aqui
+    from src.firebase_setup import init_firebase
+    init_firebase()
 
-                break  # só a primeira detecção relevante
 
-        time.sleep(0.01)  # pequena pausa para aliviar CPU
+def _open_database() -> None:
+    # Conexão e create_all fora do import: um banco inacessível não impede
+    # o servidor de responder (/api/health) e é tentado de novo com backoff
+    global database
+    database = Database(DATABASE_URL)
+    event_writer.db = database
+    clip_writer.db = database
 
 
+def _db() -> Database:
+    if database is None:
+        raise HTTPException(503, "Banco de dados indisponível")
+    return database
 
-# FastAPI com contexto de vida (lifespan)
-from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logging.info("Iniciando câmera ONVIF e loop de análise")
-    # 1) Inicia captura de vídeo
-    camera.start()
-    # 2) Reseta evento e inicia thread de processamento
-    t_processing_stop.clear()
-    global t_processing_thread
-    t_processing_thread = Thread(target=processing_loop, daemon=True)
-    t_processing_thread.start()
+    logging.info("Iniciando %d câmera(s) ONVIF e loop de análise", len(cameras))
+    # 1) Modelo, Firebase e banco carregam em segundo plano; o pipeline
+    #    descarta frames até o modelo ficar pronto (ver /api/ready). Falhas
+    #    do modelo e do banco são tentadas de novo com backoff
+    readiness.run("model", engine.load, background=True, retry=True)
+    readiness.run("firebase", _init_firebase, required=False, background=True)
+    readiness.run("database", _open_database, background=True, retry=True)
+    # Captura de vídeo de todas as câmeras (não bloqueia na conexão ONVIF)
+    readiness.run("cameras", cameras.start, required=False)
+    global snapshot_executor
+    snapshot_executor = ThreadPoolExecutor(
+        max_workers=SNAPSHOT_WORKERS, thread_name_prefix="snapshot"
+    )
+    # 2) Inicia o gravador de eventos, as notificações e os estágios do
+    #    pipeline de detecção
+    event_writer.start()
+    dispatcher.start()
+    clip_writer.start()
+    for recorder in recorders.values():
+        recorder.start()
+    readiness.run("pipeline", pipeline.start)
 
     yield  # aplica as rotas e mantém serviço vivo
 
-    # No shutdown, sinaliza e aguarda thread terminar
+    # No shutdown, para o pipeline antes das câmeras
     logging.info("Parando loop de análise")
-    t_processing_stop.set()
-    t_processing_thread.join(timeout=1)
-    camera.stop()
+    readiness.stop()
+    pipeline.stop()
+    for recorder in recorders.values():
+        recorder.stop()
+    snapshot_executor.shutdown(wait=False, cancel_futures=True)
+    cameras.stop()
+    dispatcher.stop()
+    clip_writer.stop()
+    # Grava os eventos ainda em memória antes de sair
+    event_writer.stop()
 
 
 app = FastAPI(lifespan=lifespan)
 
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+readiness.set("import", READY, seconds=IMPORT_SECONDS)
+logging.info("src.main importado em %.2f s", IMPORT_SECONDS)
+REGISTRY.gauge_callback(
+    "startup_seconds", "Time taken to import or start each subsystem", ("subsystem",),
+    readiness.seconds)
+
+
+@app.get("/api/health")
+def health():
+    """Liveness: o processo está de pé e respondendo."""
+    return {"status": "ok", "uptime_s": round(time.perf_counter() - _IMPORT_STARTED, 3)}
+
+
+@app.get("/api/ready")
+def ready():
+    """Readiness por subsistema; 503 até modelo, pipeline e banco estarem prontos.
+
+    Câmeras e Firebase aparecem no relatório mas não bloqueiam: uma câmera
+    offline ou notificações indisponíveis não impedem servir as outras rotas.
+    """
+    report = readiness.report()
+    db = report["subsystems"].setdefault("database", {"state": PENDING, "required": True})
+    if database is None:
+        report["ready"] = False
+    else:
+        try:
+            database.ping()
+        except Exception as e:
+            db.update(state=FAILED, error=str(e))
+            report["ready"] = False
+    report["cameras"] = {slot.id: slot.camera.state for slot in cameras}
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+def _get_slot(cam_id: str):
+    slot = cameras.get(cam_id)
+    if slot is None:
+        raise HTTPException(404, f"Câmera desconhecida: {cam_id}")
+    return slot
+
+
+def _status_response(cam):
+    """200 só em ``streaming``; estado e início dele vão nos cabeçalhos."""
+    health = cam.health()
+    headers = {
+        "X-Camera-State": health["state"],
+        "X-Camera-State-Since": f"{health['since']:.3f}",
+    }
+    if health["state"] != "streaming":
+        return Response("Camera is not connected", status_code=503, headers=headers)
+    return Response("Camera is connected", status_code=200, headers=headers)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+async def _snapshot_response(cam_id: str, request: Request, max_age: float = None):
+    """Último resultado do pipeline em JPEG com overlay; nunca roda inferência.
+
+    O ``ETag`` identifica o frame: ``If-None-Match`` igual responde 304.
+    Com ``max_age`` (segundos), um resultado mais antigo responde 503.
+    """
+    snap = pipeline.snapshots.get(cam_id)
+    if snap is None:
+        raise HTTPException(503, "Sem frame processado")
+    age = snap.age()
+    headers = {"ETag": snap.etag, "Cache-Control": "no-cache", "X-Frame-Age": f"{age:.3f}"}
+    if max_age is not None and age > max_age:
+        raise HTTPException(503, "Snapshot desatualizado", headers=headers)
+    if _etag_matches(request.headers.get("if-none-match"), snap.etag):
+        return Response(status_code=304, headers=headers)
+    if snap.encoded:
+        jpg = snap.jpeg()
+    else:
+        # Primeira requisição deste resultado: codifica fora do event loop
+        loop = asyncio.get_running_loop()
+        jpg = await loop.run_in_executor(snapshot_executor, snap.jpeg)
+    return Response(jpg, media_type="image/jpeg", headers=headers)
+
+
+def _stream_response(slot, width: int = None, fps: float = None, quality: int = None,
+                     adaptive: bool = False):
+    profile = StreamProfile.parse(width, fps, quality)
+    try:
+        # cria o hub do perfil já aqui para responder 503 antes do stream
+        slot.streams.get(profile)
+    except LookupError as e:
+        raise HTTPException(503, str(e))
+    return StreamingResponse(
+        slot.streams.aframes(profile, adaptive=adaptive),
+        media_type=f'multipart/x-mixed-replace; boundary={MjpegHub.BOUNDARY}'
+    )
+
+
+def _latency_response(cam):
+    stats = cam.get_latency_stats()
+    if not stats:
+        raise HTTPException(503, "Ainda não há medições de latência")
+    return JSONResponse({
+        "last_ms": round(cam.get_last_latency() * 1000, 1),
+        "mean_ms": round(stats["mean"] * 1000, 1),
+        "min_ms": round(stats["min"] * 1000, 1),
+        "max_ms": round(stats["max"] * 1000, 1),
+        "samples": stats["count"]
+    })
+
 
 @app.get("/api/status", response_class=Response)
 def status():
     """Verifica se a câmera está conectada."""
-    if not camera._cap or not camera._cap.isOpened():
-        return Response("Camera is not connected", status_code=503)
-    return Response("Camera is connected", status_code=200)
+    return _status_response(camera)
 
 
 @app.get("/api/snapshot", response_class=Response)
-def get_snapshot():
-    """Retorna um único frame processado em JPEG."""
-    frame = processor.process_frame()
-    if frame is None:
-        raise HTTPException(503, "Sem frame disponível")
-    _, jpg = cv2.imencode('.jpg', frame)
-    return Response(jpg.tobytes(), media_type="image/jpeg")
+async def get_snapshot(request: Request, max_age: float = Query(None, gt=0)):
+    """Último frame processado pelo pipeline em JPEG, com as detecções."""
+    return await _snapshot_response(cameras.default.id, request, max_age)
 
 
 @app.get("/api/stream")
-def stream():
-    """MJPEG stream com overlay de latência."""
-    def mjpeg_generator():
-        while True:
-            frame = camera.get_frame()
-            if frame is None:
-                time.sleep(0.1)
-                continue
-            lat = camera.get_last_latency() or 0.0
-            cv2.putText(frame, f"Lat: {lat*1000:.1f} ms", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            _, jpg = cv2.imencode('.jpg', frame)
-            yield (
-                b'--frame\r\n'
-                b'Content-Type: image/jpeg\r\n\r\n' + jpg.tobytes() + b'\r\n'
-            )
-
-    return StreamingResponse(
-        mjpeg_generator(),
-        media_type='multipart/x-mixed-replace; boundary=frame'
-    )
+async def stream(width: int = Query(None, gt=0), fps: float = Query(None, gt=0),
+                 quality: int = Query(None, ge=1, le=100), adaptive: bool = False):
+    """MJPEG stream com overlay de latência (JPEG compartilhado entre clientes).
+
+    ``width``, ``fps`` e ``quality`` escolhem o perfil de saída; clientes com
+    o mesmo perfil dividem a codificação. ``adaptive=true`` reduz a qualidade
+    quando o cliente não acompanha. Gerador assíncrono: clientes aguardando
+    frame não ocupam threads.
+    """
+    return _stream_response(cameras.default, width, fps, quality, adaptive)
 
 
 @app.post("/api/register-token")
 def register_token(data: dict):
-    """Recebe token FCM e registra para notificações."""
+    """Recebe token FCM e registra para notificações.
+
+    ``cameras`` (opcional) limita as notificações às câmeras da lista.
+    """
     token = data.get("token")
     if not token:
         raise HTTPException(400, "Token ausente")
-    token_registry.add(token)
+    subscribed = data.get("cameras")
+    if subscribed is not None:
+        if not isinstance(subscribed, list) or any(cameras.get(c) is None for c in subscribed):
+            raise HTTPException(400, "cameras deve ser uma lista de ids de câmeras")
+    token_registry.add(token, cameras=subscribed)
     return {"status": "ok"}
 
 
 @app.get("/api/latency")
 def get_latency():
     """Retorna JSON com estatísticas de latência."""
-    stats = camera.get_latency_stats()
-    if not stats:
-        raise HTTPException(503, "Ainda não há medições de latência")
-    return JSONResponse({
-        "last_ms": round(camera.get_last_latency() * 1000, 1),
-        "mean_ms": round(stats["mean"] * 1000, 1),
-        "min_ms": round(stats["min"] * 1000, 1),
-        "max_ms": round(stats["max"] * 1000, 1),
-        "samples": stats["count"]
-    })
+    return _latency_response(camera)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métricas no formato texto do Prometheus."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/pipeline")
+def pipeline_stats():
+    """Vazão, fila e latência de cada estágio do pipeline de detecção."""
+    return pipeline.stats()
+
+
+@app.get("/api/events")
+def list_events(type: str = None, camera: str = None, start: datetime = None,
+                end: datetime = None, limit: int = 50, cursor: str = None):
+    """Eventos mais recentes primeiro, com filtros e paginação por cursor.
+
+    Para a próxima página, envie ``cursor=<next_cursor>`` da resposta.
+    """
+    if not 1 <= limit <= 500:
+        raise HTTPException(400, "limit deve estar entre 1 e 500")
+    try:
+        return _db().query_events(type=type, camera=camera, start=start, end=end,
+                                     limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@app.get("/api/events/summary")
+def events_summary(type: str = None, camera: str = None, start: datetime = None,
+                   end: datetime = None):
+    """Agregados no banco: contagem e confiança média por tipo, contagem
+    por câmera e por hora e períodos de ausência de cada câmera."""
+    db = _db()
+    summary = db.summarize(type=type, camera=camera, start=start, end=end)
+    summary["absences"] = db.absence_periods(camera=camera, start=start, end=end)
+    return summary
+
+
+@app.websocket("/api/detections")
+async def detections_ws(websocket: WebSocket, camera: str = None):
+    """Detecções de cada frame processado, uma mensagem JSON por frame.
+
+    ``camera`` filtra uma câmera (padrão: todas). Se o cliente não
+    acompanha, recebe só as mensagens mais recentes.
+    """
+    if camera is not None and cameras.get(camera) is None:
+        await websocket.close(code=1008)
+        return
+    try:
+        sub = detections.subscribe(camera)
+    except LookupError:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+
+    async def send():
+        while True:
+            await websocket.send_text(await sub.get())
+
+    sender = asyncio.create_task(send())
+    try:
+        # Mensagens do cliente são ignoradas; o receive só detecta o fechamento
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        detections.unsubscribe(sub)
+
+
+@app.get("/api/detections")
+async def detections_sse(camera: str = None):
+    """Mesmas mensagens de ``/api/detections`` via Server-Sent Events."""
+    if camera is not None:
+        _get_slot(camera)
+    try:
+        sub = detections.subscribe(camera)
+    except LookupError as e:
+        raise HTTPException(503, str(e))
+
+    async def events():
+        try:
+            while True:
+                message = await sub.get(timeout=15)
+                # comentário periódico mantém proxies com a conexão aberta
+                yield f"data: {message}\n\n" if message is not None else ": ping\n\n"
+        finally:
+            detections.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/api/clips")
+def list_clips(camera: str = None, type: str = None, start: datetime = None, end: datetime = None,
+               limit: int = 50):
+    """Clipes gravados por evento, do mais recente ao mais antigo."""
+    if not 1 <= limit <= 500:
+        raise HTTPException(400, "limit deve estar entre 1 e 500")
+    return _db().query_clips(camera=camera, type=type, start=start, end=end, limit=limit)
+
+
+@app.get("/api/clips/{clip_id}")
+def get_clip(clip_id: int):
+    """Arquivo MJPEG do clipe."""
+    path = _db().clip_path(clip_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(404, "Clipe não encontrado")
+    return FileResponse(path, media_type="video/x-motion-jpeg", filename=os.path.basename(path))
+
+
+@app.get("/api/cameras")
+def list_cameras():
+    """Lista as câmeras configuradas."""
+    return [
+        {
+            "id": slot.id,
+            "name": slot.name,
+            "connected": slot.camera.connected,
+            "health": slot.camera.health(),
+            "motion": gates[slot.id].stats() if slot.id in gates else None,
+            "tracking": trackers[slot.id].stats() if slot.id in trackers else None,
+            "recording": recorders[slot.id].stats() if slot.id in recorders else None,
+            "streams": [
+                {**profile._asdict(), "clients": n}
+                for profile, n in slot.streams.profiles().items()
+            ],
+        }
+        for slot in cameras
+    ]
+
+
+@app.get("/api/cameras/{cam_id}/status", response_class=Response)
+def camera_status(cam_id: str):
+    """Verifica se a câmera ``cam_id`` está conectada."""
+    return _status_response(_get_slot(cam_id).camera)
+
+
+@app.get("/api/cameras/{cam_id}/snapshot", response_class=Response)
+async def camera_snapshot(cam_id: str, request: Request, max_age: float = Query(None, gt=0)):
+    """Snapshot processado da câmera ``cam_id`` (mesmos parâmetros de ``/api/snapshot``)."""
+    return await _snapshot_response(_get_slot(cam_id).id, request, max_age)
+
+
+@app.get("/api/cameras/{cam_id}/stream")
+async def camera_stream(cam_id: str, width: int = Query(None, gt=0), fps: float = Query(None, gt=0),
+                        quality: int = Query(None, ge=1, le=100), adaptive: bool = False):
+    """MJPEG stream da câmera ``cam_id`` (mesmos parâmetros de ``/api/stream``)."""
+    return _stream_response(_get_slot(cam_id), width, fps, quality, adaptive)
+
+
+@app.get("/api/cameras/{cam_id}/latency")
+def camera_latency(cam_id: str):
+    """Estatísticas de latência da câmera ``cam_id``."""
+    return _latency_response(_get_slot(cam_id).camera)
 
 
 if __name__ == "__main__":
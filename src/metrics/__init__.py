@@ -0,0 +1,3 @@
+from .registry import REGISTRY, Registry, Counter, Histogram, CallbackGauge
+
+__all__ = ["REGISTRY", "Registry", "Counter", "Histogram", "CallbackGauge"]
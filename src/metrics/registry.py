@@ -0,0 +1,262 @@
+"""Minimal Prometheus-style metrics: counters, fixed-bucket histograms and
+callback gauges, rendered in the text exposition format.
+
+Updates on the hot path are a lock + integer increment (histograms add a
+``bisect``), so they are cheap enough for the capture thread.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from threading import Lock
+
+# Latency buckets (seconds): 0.5 ms .. 10 s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Family:
+    """Metric with optional labels; ``labels(...)`` returns the child series."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(str(kwargs[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _series(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_labels(self.labelnames, values)} {_fmt(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float):
+        """Estimate ``q`` by linear interpolation inside the matching bucket."""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                if i >= len(self.bounds):
+                    return self.bounds[-1]
+                hi = self.bounds[i]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.bounds[-1]
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Histogram(_Family):
+    """Fixed-bucket histogram; also exports p50/p95/p99 as ``<name>_quantile``."""
+
+    kind = "histogram"
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self, *values, **kwargs):
+        """Context manager that observes the elapsed wall time."""
+        return _Timer(self.labels(*values, **kwargs) if (values or kwargs) else self._default)
+
+    def _render_child(self, values, child):
+        counts, total_sum, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, c in zip(list(self.buckets) + [math.inf], counts):
+            cumulative += c
+            le = f'le="{_fmt(bound)}"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {_fmt(total_sum)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {total}")
+        return lines
+
+    def render(self) -> list:
+        lines = super().render()
+        qname = f"{self.name}_quantile"
+        lines += [f"# HELP {qname} Estimated quantiles of {self.name}", f"# TYPE {qname} gauge"]
+        for values, child in self._series():
+            for q in self.QUANTILES:
+                v = child.quantile(q)
+                if v is not None:
+                    extra = f'quantile="{q}"'
+                    lines.append(f"{qname}{_labels(self.labelnames, values, extra)} {_fmt(v)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_child", "_t0")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._t0)
+
+
+class CallbackGauge:
+    """Gauge whose series are read from ``fn()`` at scrape time.
+
+    ``fn`` returns ``{label_values_tuple: value}``; nothing runs on the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames, fn, kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in (self.fn() or {}).items():
+            if value is None:
+                continue
+            if not isinstance(values, tuple):
+                values = (values,)
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_fmt(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = Lock()
+
+    def _get_or_add(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._get_or_add(name, lambda: Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_add(name, lambda: Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_callback(self, name, help_text, labelnames, fn, kind: str = "gauge") -> CallbackGauge:
+        """Register (or replace) a callback gauge."""
+        metric = CallbackGauge(name, help_text, labelnames, fn, kind)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -6,41 +6,55 @@ from src.notifications.token_registry import TokenRegistry
 
 
 class PresenceMonitor:
-    """Monitor camera frames and detections to notify events."""
+    """Monitor camera frames and detections.
 
-    def __init__(self, notifier: IdentifiedNotifier, registry: TokenRegistry, *, absence_timeout: int = 30):
+    Notifies when the camera goes offline and records when a person was last
+    seen. Absence and presence events come from the ``no_person`` rule of
+    the camera's ``EventManager``.
+    """
+
+    def __init__(self, notifier: IdentifiedNotifier, registry: TokenRegistry, *, camera: str = None,
+                 dispatcher=None):
         self.notifier = notifier
         self.registry = registry
-        self.absence_timeout = absence_timeout
-        self.last_person_ts = time.time()
-        self.absence_sent = False
+        self.camera = camera
+        # NotificationDispatcher: sends in background instead of on this thread
+        self.dispatcher = dispatcher
+        self.last_person_ts = None
         self.camera_sent = False
 
-    def check_camera(self, frame) -> None:
-        """Notify if camera disconnected."""
-        if frame is None:
+    def check_camera(self, frame, health: dict = None) -> None:
+        """Notify if camera disconnected.
+
+        With ``health`` (``CameraHandler.health()``) the supervisor's state
+        decides: only ``offline`` counts as disconnected, so short reconnects
+        do not page anyone.
+        """
+        offline = frame is None if health is None else health.get("state") == "offline"
+        if offline:
             if not self.camera_sent:
-                self._notify_all("Camera desconectada", "A camera parou de enviar frames")
+                title = "Camera desconectada"
+                if self.camera:
+                    title = f"{title} ({self.camera})"
+                self._notify_all(title, "A camera parou de enviar frames", "camera_offline")
                 self.camera_sent = True
         else:
             self.camera_sent = False
 
     def handle_detections(self, results: List) -> None:
-        """Track person absence and send notification."""
-        now = time.time()
-        detected = False
+        """Record the time of the last frame with a person."""
         for detection_result in results or []:
             if getattr(detection_result, "boxes", []):
                 if len(detection_result.boxes) > 0:
-                    detected = True
+                    self.last_person_ts = time.time()
                     break
-        if detected:
-            self.last_person_ts = now
-            self.absence_sent = False
-        elif now - self.last_person_ts > self.absence_timeout and not self.absence_sent:
-            self._notify_all("Ausência de humano", "Nenhuma pessoa detectada")
-            self.absence_sent = True
-
-    def _notify_all(self, title: str, message: str) -> None:
+
+    def _notify_all(self, title: str, message: str, event_type: str = None) -> None:
+        if self.dispatcher is not None:
+            # cooldown per event type and camera; only tokens subscribed to
+            # this camera receive it
+            self.dispatcher.submit(f"{event_type or title}:{self.camera}", title, message,
+                                   data={"camera": self.camera or ""}, camera=self.camera)
+            return
         for t in self.registry.get_all():
             self.notifier.notify(t, title=title, message=message)
@@ -1,5 +1,14 @@
 from .notifier import Notifier
 from .identified_notifier import IdentifiedNotifier
 from .token_registry import TokenRegistry
+from .dispatcher import NotificationDispatcher
+from .transport import FcmTransport, StubTransport
 
-__all__ = ["Notifier", "IdentifiedNotifier", "TokenRegistry"]
+__all__ = [
+    "Notifier",
+    "IdentifiedNotifier",
+    "TokenRegistry",
+    "NotificationDispatcher",
+    "FcmTransport",
+    "StubTransport",
+]
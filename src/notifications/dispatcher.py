@@ -0,0 +1,190 @@
+"""Background, batched push-notification dispatcher."""
+
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from threading import Thread, Event, Condition
+
+from src.metrics import REGISTRY
+
+from .notifier import NOTIFY_SEND
+from .transport import INVALID, RETRY
+
+NOTIFICATIONS = REGISTRY.counter(
+    "notifications_total", "Push notifications per token by outcome", ("result",))
+
+
+class Notification:
+    """One message for a set of tokens (``None`` = every token subscribed to ``camera``)."""
+
+    __slots__ = ("event_type", "title", "message", "tokens", "data", "camera", "attempt")
+
+    def __init__(self, event_type: str, title: str, message: str, tokens=None, data: dict = None,
+                 camera: str = None, attempt: int = 0):
+        self.event_type = event_type
+        self.title = title
+        self.message = message
+        self.tokens = tokens
+        self.data = data
+        self.camera = camera
+        self.attempt = attempt
+
+
+class NotificationDispatcher:
+    """Queue notifications and send them from a background thread.
+
+    ``submit`` only appends to a bounded queue, so callers on the
+    processing thread never wait for Firebase. The worker resolves the
+    recipients, skips tokens still in cooldown for that event type, sends
+    in multicast batches of up to ``transport.max_batch`` tokens and
+    schedules transient failures for retry with exponential backoff and
+    jitter. Tokens reported invalid are passed to ``on_invalid``.
+    """
+
+    def __init__(self, transport, registry, *, cooldown: float = 60, max_retries: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 60.0, queue_size: int = 1000,
+                 on_invalid=None):
+        self.transport = transport
+        self.registry = registry
+        self.cooldown = cooldown
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.on_invalid = on_invalid
+        self.batch_size = getattr(transport, "max_batch", 500)
+
+        self._queue = deque(maxlen=queue_size)
+        self._retries = []              # heap of (due, seq, Notification)
+        self._seq = itertools.count()
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Thread = None
+        # (token, event_type) -> last accepted send
+        self._last_sent: dict = {}
+
+        self.stats = {"sent": 0, "failed": 0, "invalid": 0, "retried": 0,
+                      "suppressed": 0, "dropped": 0}
+
+    # -- API --------------------------------------------------------------
+    def submit(self, event_type: str, title: str, message: str, *, tokens=None, data: dict = None,
+               camera: str = None) -> None:
+        """Queue a notification; returns immediately."""
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.stats["dropped"] += 1
+            self._queue.append(Notification(event_type, title, message, tokens, data, camera))
+            self._cond.notify()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name="notifications", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue) + len(self._retries)
+
+    # -- worker -----------------------------------------------------------
+    def _next(self, timeout: float = None):
+        """Next notification ready to send, or None after ``timeout``."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._retries and self._retries[0][0] <= now:
+                    return heapq.heappop(self._retries)[2]
+                if self._queue:
+                    return self._queue.popleft()
+                if self._stop.is_set() or (deadline is not None and now >= deadline):
+                    return None
+                waits = [t - now for t in (deadline, self._retries[0][0] if self._retries else None)
+                         if t is not None]
+                self._cond.wait(min(waits) if waits else None)
+
+    def run_once(self, timeout: float = 0.0) -> bool:
+        """Send the next ready notification; False if there was none."""
+        notif = self._next(timeout)
+        if notif is None:
+            return False
+        self._dispatch(notif)
+        return True
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once(timeout=0.5)
+
+    def _recipients(self, notif: Notification) -> list:
+        tokens = notif.tokens if notif.tokens is not None else self.registry.get_all(notif.camera)
+        if notif.attempt:
+            return list(tokens)  # already passed the cooldown check
+        now = time.time()
+        out = []
+        for t in tokens:
+            key = (t, notif.event_type)
+            if now - self._last_sent.get(key, float("-inf")) < self.cooldown:
+                self.stats["suppressed"] += 1
+                continue
+            self._last_sent[key] = now
+            out.append(t)
+        return out
+
+    def _dispatch(self, notif: Notification) -> None:
+        tokens = self._recipients(notif)
+        for i in range(0, len(tokens), self.batch_size):
+            self._send_batch(notif, tokens[i:i + self.batch_size])
+
+    def _send_batch(self, notif: Notification, tokens: list) -> None:
+        try:
+            with NOTIFY_SEND.time():
+                statuses = self.transport.send(tokens, notif.title, notif.message, notif.data)
+        except Exception:
+            logging.exception("Failed to send %s to %d token(s)", notif.event_type, len(tokens))
+            statuses = [RETRY] * len(tokens)
+
+        retry, invalid = [], []
+        for token, status in zip(tokens, statuses):
+            if status is None:
+                self.stats["sent"] += 1
+                NOTIFICATIONS.labels("sent").inc()
+            elif status == INVALID:
+                invalid.append(token)
+            elif status == RETRY and notif.attempt < self.max_retries:
+                retry.append(token)
+            else:
+                self.stats["failed"] += 1
+                NOTIFICATIONS.labels("failed").inc()
+
+        if invalid:
+            self.stats["invalid"] += len(invalid)
+            NOTIFICATIONS.labels("invalid").inc(len(invalid))
+            if self.on_invalid is not None:
+                try:
+                    self.on_invalid(invalid)
+                except Exception:
+                    logging.exception("on_invalid callback failed")
+        if retry:
+            self._schedule_retry(notif, retry)
+
+    def _schedule_retry(self, notif: Notification, tokens: list) -> None:
+        attempt = notif.attempt + 1
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        delay *= random.uniform(0.5, 1.0)  # jitter: avoid retrying in lockstep
+        again = Notification(notif.event_type, notif.title, notif.message, tokens, notif.data,
+                             notif.camera, attempt)
+        self.stats["retried"] += len(tokens)
+        NOTIFICATIONS.labels("retried").inc(len(tokens))
+        with self._cond:
+            heapq.heappush(self._retries, (time.time() + delay, next(self._seq), again))
+            self._cond.notify()
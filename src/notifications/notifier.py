@@ -1,6 +1,12 @@
 """Wrapper around Firebase Admin messaging."""
 
-from firebase_admin import messaging
+from src.metrics import REGISTRY
+
+# firebase_admin.messaging, imported on first send so importing the server
+# does not pull in the Google client libraries
+messaging = None
+
+NOTIFY_SEND = REGISTRY.histogram("notification_send_seconds", "Duration of FCM send calls")
 
 
 class Notifier:
@@ -10,8 +16,12 @@ class Notifier:
         self._api_key = api_key
 
     def send(self, token: str, title: str, message: str):
+        global messaging
+        if messaging is None:
+            from firebase_admin import messaging
         msg = messaging.Message(
             token=token,
             notification=messaging.Notification(title=title, body=message),
         )
-        messaging.send(msg)
+        with NOTIFY_SEND.time():
+            messaging.send(msg)
@@ -1,28 +1,130 @@
+"""FCM token store with an append-only journal."""
+
+import json
+import logging
+import os
+import time
+from threading import RLock
+
+
 class TokenRegistry:
-    """Store FCM tokens in a text file."""
+    """Store FCM tokens and their metadata in an append-only journal file.
+
+    Each change is one JSON line (``add`` or ``remove``) appended to
+    ``path``, so registering a token no longer rewrites the whole file.
+    When dead lines outnumber the live tokens the journal is compacted into
+    a snapshot (temp file + atomic rename). Plain token lines from the old
+    ``tokens.txt`` format are still read. All methods are thread-safe.
+
+    Metadata per token: ``last_seen`` (epoch seconds) and ``cameras`` (camera
+    ids the device subscribed to; empty means every camera).
+    """
 
-    def __init__(self, path: str = "tokens.txt"):
+    def __init__(self, path: str = "tokens.txt", *, touch_interval: float = 3600, compact_min: int = 100):
         self.path = path
-        self.tokens = set()
+        self.touch_interval = touch_interval
+        self.compact_min = compact_min
+        self.tokens: dict = {}
+        self._lines = 0
+        self._lock = RLock()
         self._load()
 
+    # -- persistence ------------------------------------------------------
     def _load(self) -> None:
+        tokens, lines = {}, 0
         try:
             with open(self.path, "r") as fh:
-                self.tokens = set(t.strip() for t in fh if t.strip())
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines += 1
+                    if not line.startswith("{"):
+                        tokens[line] = {"last_seen": None, "cameras": []}
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logging.warning("Skipping corrupt journal line in %s", self.path)
+                        continue
+                    if entry.get("op") == "remove":
+                        tokens.pop(entry.get("token"), None)
+                    else:
+                        tokens[entry["token"]] = {
+                            "last_seen": entry.get("last_seen"),
+                            "cameras": entry.get("cameras") or [],
+                        }
         except FileNotFoundError:
-            self.tokens = set()
+            pass
+        self.tokens, self._lines = tokens, lines
 
-    def _save(self) -> None:
-        with open(self.path, "w") as fh:
-            for t in sorted(self.tokens):
-                fh.write(t + "\n")
+    def _append(self, entry: dict) -> None:
+        with open(self.path, "a") as fh:
+            fh.write(json.dumps(entry) + "\n")
+        self._lines += 1
+        if self._lines > max(self.compact_min, 2 * len(self.tokens)):
+            self.compact()
 
-    def add(self, token: str) -> None:
-        if not token or token in self.tokens:
+    def compact(self) -> None:
+        """Rewrite the journal as one ``add`` line per live token."""
+        with self._lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as fh:
+                for token in sorted(self.tokens):
+                    fh.write(json.dumps({"op": "add", "token": token, **self.tokens[token]}) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, self.path)
+            self._lines = len(self.tokens)
+
+    # -- API --------------------------------------------------------------
+    def add(self, token: str, cameras=None) -> None:
+        """Register ``token`` (or refresh it), optionally for specific cameras."""
+        if not token:
             return
-        self.tokens.add(token)
-        self._save()
+        now = time.time()
+        with self._lock:
+            meta = self.tokens.get(token)
+            new_cameras = sorted(set(cameras)) if cameras is not None else None
+            if meta is not None:
+                stale = meta["last_seen"] is None or now - meta["last_seen"] >= self.touch_interval
+                changed = new_cameras is not None and new_cameras != meta["cameras"]
+                if not stale and not changed:
+                    return
+            meta = {
+                "last_seen": now,
+                "cameras": new_cameras if new_cameras is not None else (meta or {}).get("cameras", []),
+            }
+            self.tokens[token] = meta
+            self._append({"op": "add", "token": token, **meta})
+
+    def remove(self, token: str) -> bool:
+        with self._lock:
+            if self.tokens.pop(token, None) is None:
+                return False
+            self._append({"op": "remove", "token": token})
+            return True
+
+    def remove_many(self, tokens) -> int:
+        """Drop tokens the send path reported as invalid; returns how many."""
+        removed = sum(self.remove(t) for t in tokens)
+        if removed:
+            logging.info("Removed %d invalid FCM token(s)", removed)
+        return removed
+
+    def get(self, token: str):
+        """Metadata of ``token`` (a copy) or None."""
+        with self._lock:
+            meta = self.tokens.get(token)
+            return dict(meta, cameras=list(meta["cameras"])) if meta else None
+
+    def get_all(self, camera: str = None):
+        """Tokens subscribed to ``camera`` (all tokens when ``camera`` is None)."""
+        with self._lock:
+            if camera is None:
+                return list(self.tokens)
+            return [t for t, m in self.tokens.items() if not m["cameras"] or camera in m["cameras"]]
 
-    def get_all(self):
-        return list(self.tokens)
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.tokens)
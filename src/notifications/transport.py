@@ -0,0 +1,85 @@
+"""Multicast transports used by :class:`NotificationDispatcher`.
+
+``send(tokens, title, message, data)`` returns one status per token, in
+order: ``None`` when delivered, or one of :data:`INVALID` (drop the token),
+:data:`RETRY` (transient, try again later) and :data:`FAILED`.
+"""
+
+import logging
+
+INVALID = "invalid"
+RETRY = "retry"
+FAILED = "failed"
+
+# FirebaseError codes worth retrying
+_RETRY_CODES = {"UNAVAILABLE", "INTERNAL", "RESOURCE_EXHAUSTED", "DEADLINE_EXCEEDED", "UNKNOWN"}
+# Codes that say the token itself is gone. PERMISSION_DENIED (credentials or
+# project) and INVALID_ARGUMENT (payload) fail every token alike and must
+# not prune the registry.
+_INVALID_CODES = {"NOT_FOUND"}
+
+
+class FcmTransport:
+    """Send through Firebase Admin ``send_each_for_multicast`` (500 tokens max)."""
+
+    max_batch = 500
+
+    def __init__(self):
+        self._module = None
+
+    @property
+    def _messaging(self):
+        # Imported on first use so building the server does not pull in the
+        # Google client libraries
+        if self._module is None:
+            from firebase_admin import messaging
+
+            self._module = messaging
+        return self._module
+
+    def send(self, tokens, title: str, message: str, data: dict = None) -> list:
+        messaging = self._messaging
+        msg = messaging.MulticastMessage(
+            tokens=list(tokens),
+            notification=messaging.Notification(title=title, body=message),
+            data={k: str(v) for k, v in (data or {}).items()},
+        )
+        batch = messaging.send_each_for_multicast(msg)
+        return [None if r.success else self._classify(r.exception) for r in batch.responses]
+
+    def _classify(self, exc) -> str:
+        messaging = self._messaging
+        if isinstance(exc, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+            return INVALID
+        code = getattr(exc, "code", None)
+        if code in _INVALID_CODES:
+            return INVALID
+        if code in _RETRY_CODES or isinstance(exc, messaging.QuotaExceededError):
+            return RETRY
+        return FAILED
+
+
+class StubTransport:
+    """Offline transport: records every batch instead of calling Firebase.
+
+    ``statuses`` maps a token to the status it should report (or to a list
+    of statuses consumed one per attempt), to simulate failures in tests.
+    """
+
+    max_batch = 500
+
+    def __init__(self, statuses: dict = None):
+        self.statuses = dict(statuses or {})
+        self.sent = []
+
+    def send(self, tokens, title: str, message: str, data: dict = None) -> list:
+        tokens = list(tokens)
+        self.sent.append({"tokens": tokens, "title": title, "message": message, "data": data})
+        logging.info("[stub] %s: %s -> %d token(s)", title, message, len(tokens))
+        out = []
+        for t in tokens:
+            status = self.statuses.get(t)
+            if isinstance(status, list):
+                status = status.pop(0) if status else None
+            out.append(status)
+        return out
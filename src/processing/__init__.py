@@ -1,3 +1,19 @@
 from .video_processor import VideoProcessor
+from .motion import MotionGate
+from .pipeline import DetectionPipeline, DropOldestQueue, LatestSlots, Stage
+from .roi import RoiSelector
+from .tracker import Tracker
+from .snapshot import DetectionSnapshot, SnapshotStore
 
-__all__ = ["VideoProcessor"]
+__all__ = [
+    "VideoProcessor",
+    "MotionGate",
+    "DetectionPipeline",
+    "DropOldestQueue",
+    "LatestSlots",
+    "Stage",
+    "RoiSelector",
+    "Tracker",
+    "DetectionSnapshot",
+    "SnapshotStore",
+]
@@ -0,0 +1,89 @@
+import time
+
+import cv2
+
+
+class MotionGate:
+    """
+    Filtro barato antes da inferência: compara o frame atual (reduzido,
+    em cinza e suavizado) com o frame da última inferência e só libera o
+    YOLO quando a fração de pixels alterados passa de ``threshold`` ou
+    quando ``max_interval`` segundos se passaram desde a última inferência.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.005,
+        pixel_delta: int = 25,
+        size: tuple = (160, 120),
+        max_interval: float = 5.0,
+        blur: int = 5,
+    ):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self.max_interval = max_interval
+        self.blur = blur
+
+        self._ref = None
+        self._last_infer = 0.0
+        self._pending = None
+        self.inferred = 0
+        self.skipped = 0
+
+    def _prepare(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        if self.blur:
+            gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+        return gray
+
+    def change_ratio(self, gray) -> float:
+        """Fração de pixels que mudaram em relação à referência."""
+        diff = cv2.absdiff(gray, self._ref)
+        _, mask = cv2.threshold(diff, self.pixel_delta, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(mask) / mask.size
+
+    def check(self, frame, now: float = None) -> bool:
+        """A cena mudou ou o intervalo máximo expirou? Não altera a referência.
+
+        Chame :meth:`commit` se o frame for de fato inferido ou :meth:`skip`
+        se as detecções anteriores forem reaproveitadas.
+        """
+        now = time.time() if now is None else now
+        gray = self._prepare(frame)
+        self._pending = (gray, now)
+        return (
+            self._ref is None
+            or now - self._last_infer >= self.max_interval
+            or self.change_ratio(gray) >= self.threshold
+        )
+
+    def commit(self) -> None:
+        """O frame do último :meth:`check` foi inferido: vira a referência."""
+        self._ref, self._last_infer = self._pending
+        self.inferred += 1
+
+    def skip(self) -> None:
+        self.skipped += 1
+
+    def should_infer(self, frame, now: float = None) -> bool:
+        """Retorna ``True`` se a cena mudou ou o intervalo máximo expirou
+        (:meth:`check` seguido de :meth:`commit` ou :meth:`skip`)."""
+        run = self.check(frame, now)
+        if run:
+            self.commit()
+        else:
+            self.skip()
+        return run
+
+    __call__ = should_infer
+
+    def stats(self) -> dict:
+        total = self.inferred + self.skipped
+        return {
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+        }
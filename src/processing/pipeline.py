@@ -0,0 +1,485 @@
+import logging
+import time
+from collections import deque
+from threading import Thread, Event, Condition, Lock
+
+from src.metrics import REGISTRY
+from src.streaming.detections import detection_message
+from .snapshot import SnapshotStore
+
+FRAMES_PROCESSED = REGISTRY.counter(
+    "frames_processed_total", "Frames that completed detection (inferred or reused)", ("camera",))
+MODEL_WAIT_DROPPED = REGISTRY.counter(
+    "frames_dropped_model_unloaded_total", "Frames discarded because the model is not loaded")
+
+
+class DropOldestQueue:
+    """Fila limitada: quando cheia, ``put`` descarta o item mais antigo.
+
+    Estágios lentos passam a trabalhar sempre sobre os dados mais recentes,
+    sem acumular atraso.
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize deve ser >= 1")
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = Condition()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item) -> None:
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get_batch(self, max_items: int = 1, timeout: float = 0.1, max_wait: float = 0.0) -> list:
+        """
+        Aguarda até ``timeout`` pelo primeiro item; depois espera até
+        ``max_wait`` para completar ``max_items``. Retorna lista (pode ser vazia).
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout=timeout):
+                return []
+            if max_items > 1 and max_wait > 0:
+                self._cond.wait_for(lambda: len(self._items) >= max_items, timeout=max_wait)
+            n = min(max_items, len(self._items))
+            return [self._items.popleft() for _ in range(n)]
+
+
+class LatestSlots:
+    """Um lugar por câmera com o frame mais recente ainda não consumido.
+
+    ``put`` substitui o item pendente da mesma câmera (contado em
+    ``dropped``), então uma câmera rápida nunca expulsa o frame de outra e
+    um lote nunca leva dois frames da mesma câmera. ``get_batch`` monta o
+    lote pela ordem de espera, a câmera que espera há mais tempo primeiro.
+    """
+
+    def __init__(self, key=lambda job: job.cam_id):
+        self.key = key
+        self._slots: dict = {}
+        self._cond = Condition()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._slots)
+
+    def put(self, item) -> None:
+        with self._cond:
+            k = self.key(item)
+            if k in self._slots:
+                # Mantém a posição na fila: a câmera não perde a vez
+                self.dropped += 1
+            self._slots[k] = item
+            self._cond.notify()
+
+    def get_batch(self, max_items: int = 1, timeout: float = 0.1, max_wait: float = 0.0) -> list:
+        """Mesma semântica de :meth:`DropOldestQueue.get_batch`, um item por câmera."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._slots, timeout=timeout):
+                return []
+            if max_items > 1 and max_wait > 0:
+                self._cond.wait_for(lambda: len(self._slots) >= max_items, timeout=max_wait)
+            keys = list(self._slots)[:max_items]
+            return [self._slots.pop(k) for k in keys]
+
+
+class Job:
+    """Frame de uma câmera percorrendo o pipeline."""
+
+    __slots__ = ("cam_id", "frame", "seq", "captured_at", "prepared", "results", "reused",
+                 "tracked", "target")
+
+    def __init__(self, cam_id: str, frame=None, seq: int = 0, captured_at: float = None):
+        self.cam_id = cam_id
+        self.frame = frame              # ndarray somente leitura (ou None = sem frame)
+        self.seq = seq
+        self.captured_at = captured_at or time.time()
+        self.prepared = None            # entrada do modelo (InferenceEngine.preprocess)
+        self.results = None
+        self.reused = False             # detecções reaproveitadas (cena parada)
+        self.tracked = False            # caixas previstas pelo Tracker (sem inferência)
+        self.target = None              # caixa seguida pelo PTZ (x1, y1, x2, y2)
+
+
+class Stage:
+    """
+    Worker de um estágio: consome lotes de ``inbox``, aplica ``fn`` e envia
+    cada saída para o destino devolvido por ``route`` (ou ``outbox``).
+
+    ``fn`` recebe a lista do lote e devolve a lista de saídas
+    (``None`` descarta o item). Estágios sem ``inbox`` são fontes: ``fn()``
+    é chamada em loop e pode bloquear aguardando dados.
+    """
+
+    def __init__(self, name: str, fn, inbox: DropOldestQueue = None, outbox: DropOldestQueue = None,
+                 *, batch: int = 1, max_wait: float = 0.0, route=None):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.batch = batch
+        self.max_wait = max_wait
+        self.route = route
+
+        self.processed = 0
+        self._latencies = deque(maxlen=100)
+        self._done_at = deque(maxlen=100)
+        self._thread: Thread = None
+        self._stop = Event()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: float = 1.0) -> None:
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def run_once(self) -> int:
+        """Processa um lote; retorna quantos itens foram consumidos."""
+        if self.inbox is None:
+            items = None
+        else:
+            items = self.inbox.get_batch(self.batch, timeout=0.1, max_wait=self.max_wait)
+            if not items:
+                return 0
+
+        t0 = time.time()
+        try:
+            outputs = self.fn() if items is None else self.fn(items)
+        except Exception:
+            logging.exception("Falha no estágio %s", self.name)
+            return 0
+        t1 = time.time()
+
+        outputs = [o for o in (outputs or []) if o is not None]
+        n = len(items) if items is not None else len(outputs)
+        if n:
+            self.processed += n
+            self._latencies.append(t1 - t0)
+            self._done_at.append(t1)
+        for out in outputs:
+            target = self.route(out) if self.route else self.outbox
+            if target is not None:
+                target.put(out)
+        return n
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+
+    def stats(self) -> dict:
+        lat = list(self._latencies)
+        done = list(self._done_at)
+        fps = (len(done) - 1) / (done[-1] - done[0]) if len(done) > 1 and done[-1] > done[0] else 0.0
+        return {
+            "processed": self.processed,
+            "fps": round(fps, 2),
+            "queue": len(self.inbox) if self.inbox else 0,
+            "dropped": self.inbox.dropped if self.inbox else 0,
+            "latency_ms": {
+                "mean": round(sum(lat) / len(lat) * 1000, 2) if lat else None,
+                "max": round(max(lat) * 1000, 2) if lat else None,
+            },
+        }
+
+
+class DetectionPipeline:
+    """
+    Captura → pré-processamento → inferência → pós-processamento/presença → PTZ,
+    cada estágio em sua thread. Até a inferência cada câmera ocupa um único
+    lugar com seu frame mais recente (:class:`LatestSlots`); depois, filas
+    limitadas que descartam o item mais antigo. O FPS de detecção fica
+    limitado pelo estágio mais lento, não pela soma de todos.
+
+    - captura: uma fonte por câmera, aguardando ``next_frame`` (sem sleep fixo);
+    - pré-processamento: filtro de movimento, recorte da ROI e
+      ``engine.preprocess`` (letterbox);
+    - inferência: lotes de até ``max_batch`` frames, no máximo um por câmera;
+    - pós-processamento: ``Tracker`` (IDs estáveis e, com ``detect_every``
+      > 1, posições previstas nos frames sem inferência), ``PresenceMonitor``,
+      regras do ``EventManager``, escolha do alvo e publicação do último
+      resultado em ``snapshots`` e no ``broadcaster`` (WebSocket/SSE);
+    - PTZ: cálculo do erro e envio ao ``PTZController`` da câmera.
+
+    Frames sem inferência (reaproveitados ou previstos) não passam pela
+    fila de inferência: enquanto um frame da mesma câmera está sendo
+    inferido eles esperam atrás dele (até ``hold_timeout`` segundos), então
+    o pós-processamento vê cada câmera sempre em ordem de ``seq``.
+    """
+
+    def __init__(self, cameras, engine, monitors: dict, *, gates: dict = None, events: dict = None,
+                 rois: dict = None, trackers: dict = None, detect_every: int = 1, broadcaster=None,
+                 max_batch: int = 8, max_wait: float = 0.02, queue_size: int = None,
+                 dead_zone: float = 0.1, kp: float = 0.6, hold_timeout: float = 1.0):
+        self.cameras = {slot.id: slot.camera for slot in cameras}
+        self.engine = engine
+        self.monitors = monitors
+        self.gates = gates or {}
+        self.events = events or {}
+        self.rois = rois or {}
+        self.trackers = trackers or {}
+        self.detect_every = max(int(detect_every), 1)
+        self.broadcaster = broadcaster
+        self.dead_zone = dead_zone
+        self.kp = kp
+        self.hold_timeout = hold_timeout
+
+        self._last_results: dict = {}
+        # Último (frame, detecções, instante) por câmera, para /snapshot
+        self.snapshots = SnapshotStore()
+        self._last_seq: dict = {}
+        self._since_detect: dict = {}
+        self._waiting_model = False
+        # Ordem por câmera: último frame enviado à inferência (seq, instante),
+        # frames retidos atrás dele e último seq publicado
+        self._order_lock = Lock()
+        self._inflight: dict = {}
+        self._held: dict = {}
+        self._published: dict = {}
+
+        n = max(len(self.cameras), 1)
+        size = queue_size or 2 * n
+        # Antes da inferência só interessa o frame mais recente de cada câmera
+        self.q_pre = LatestSlots()
+        self.q_infer = LatestSlots()
+        self.q_post = DropOldestQueue(size)
+        self.q_ptz = DropOldestQueue(size)
+
+        self.stages = [
+            Stage(f"capture[{cam_id}]", lambda cam_id=cam_id: self._capture(cam_id), outbox=self.q_pre)
+            for cam_id in self.cameras
+        ]
+        self.stages += [
+            Stage("preprocess", self._preprocess, self.q_pre, route=self._route_pre),
+            # Lote nunca maior que o nº de câmeras: com uma câmera não há espera
+            Stage("inference", self._infer, self.q_infer, self.q_post,
+                  batch=min(max_batch, n), max_wait=max_wait),
+            Stage("postprocess", self._postprocess, self.q_post, self.q_ptz),
+            Stage("ptz", self._ptz, self.q_ptz),
+        ]
+
+        # Latência captura → detecção (fim do pós-processamento)
+        self._e2e = deque(maxlen=100)
+
+    # -- estágios ---------------------------------------------------------
+    def _capture(self, cam_id: str):
+        cam = self.cameras[cam_id]
+        frame = cam.next_frame(self._last_seq.get(cam_id, 0), timeout=0.1)
+        if frame is None:
+            # Sem frame novo: avisa o monitor se a câmera está offline (ou,
+            # sem supervisor, se nunca houve frame)
+            health = getattr(cam, "health", None)
+            offline = health()["state"] == "offline" if health else cam.get_latest() is None
+            return [Job(cam_id)] if offline else []
+        self._last_seq[cam_id] = frame.seq
+        return [Job(cam_id, frame.image, frame.seq, frame.timestamp)]
+
+    def _preprocess(self, jobs):
+        if not getattr(self.engine, "loaded", True):
+            # Modelo ainda carregando (ou em nova tentativa após falha): só
+            # os avisos de câmera sem frame seguem
+            if not self._waiting_model:
+                self._waiting_model = True
+                logging.warning("Modelo não carregado; descartando frames até ficar pronto")
+            MODEL_WAIT_DROPPED.inc(sum(job.frame is not None for job in jobs))
+            return [job for job in jobs if job.frame is None]
+        if self._waiting_model:
+            self._waiting_model = False
+            logging.info("Modelo carregado; detecção retomada")
+        for job in jobs:
+            if job.frame is None:
+                continue
+            gate = self.gates.get(job.cam_id)
+            last = self._last_results.get(job.cam_id)
+            if gate is not None and not gate.check(job.frame) and last is not None:
+                gate.skip()
+                job.results, job.reused = last, True
+                continue
+            if job.cam_id in self.trackers:
+                # Inferência só a cada ``detect_every`` frames; nos demais o
+                # tracker prevê as posições. A referência do filtro de
+                # movimento não muda aqui: o próximo frame ainda vê a mudança
+                # e ela chega à inferência no próximo quadro-chave
+                n = self._since_detect.get(job.cam_id, 0)
+                self._since_detect[job.cam_id] = (n + 1) % self.detect_every
+                if n:
+                    job.tracked = True
+                    continue
+            if gate is not None:
+                gate.commit()
+            roi = self.rois.get(job.cam_id)
+            if roi is None:
+                job.prepared = self.engine.preprocess(job.frame)
+            else:
+                job.prepared = self.engine.preprocess(job.frame, roi.select(job.frame.shape), roi.imgsz)
+        return jobs
+
+    def _route_pre(self, job):
+        if job.frame is None:
+            return self.q_post
+        with self._order_lock:
+            if not (job.reused or job.tracked):
+                self._inflight[job.cam_id] = (job.seq, time.time())
+                return self.q_infer
+            # Frames sem inferência seguem direto para o pós-processamento,
+            # mas não ultrapassam um frame da câmera ainda em inferência
+            inflight = self._inflight.get(job.cam_id)
+            if inflight is None:
+                return self.q_post
+            if time.time() - inflight[1] < self.hold_timeout:
+                held = self._held.setdefault(job.cam_id, deque(maxlen=self.detect_every))
+                held.append(job)
+                return None
+            # Inferência perdida (falha no estágio): libera a câmera
+            del self._inflight[job.cam_id]
+            self._held.pop(job.cam_id, None)
+            return self.q_post
+
+    def _release(self, job) -> list:
+        """Frames retidos atrás de ``job``, que acabou de ser inferido."""
+        with self._order_lock:
+            inflight = self._inflight.get(job.cam_id)
+            if inflight is None or inflight[0] > job.seq:
+                return []
+            del self._inflight[job.cam_id]
+            held = self._held.pop(job.cam_id, ())
+        return [j for j in held if j.seq > job.seq]
+
+    def _infer(self, jobs):
+        results = self.engine.infer_prepared([job.prepared for job in jobs])
+        for job, res in zip(jobs, results):
+            job.results = [res]
+            job.prepared = None
+            self._last_results[job.cam_id] = job.results
+            roi = self.rois.get(job.cam_id)
+            if roi is not None:
+                roi.update(job.results)
+        return jobs
+
+    def _postprocess(self, jobs):
+        out = []
+        jobs = deque(jobs)
+        while jobs:
+            job = jobs.popleft()
+            monitor = self.monitors[job.cam_id]
+            health = getattr(self.cameras[job.cam_id], "health", None)
+            if health is None:
+                monitor.check_camera(job.frame)
+            else:
+                monitor.check_camera(job.frame, health())
+            if job.frame is None:
+                continue
+            if not (job.reused or job.tracked):
+                jobs.extendleft(reversed(self._release(job)))
+            if job.seq <= self._published.get(job.cam_id, 0):
+                # Chegou depois de um frame mais novo (retenção expirada):
+                # descartado para tracker, regras e clientes não voltarem no tempo
+                continue
+            self._published[job.cam_id] = job.seq
+            tracker = self.trackers.get(job.cam_id)
+            if tracker is not None:
+                if job.tracked:
+                    job.results = [tracker.predict(job.captured_at, job.frame.shape)]
+                elif not job.reused:
+                    # Frames inferidos também saem com IDs (e caixas suavizadas);
+                    # o filtro de movimento passa a reaproveitar esse resultado
+                    job.results = [tracker.update(job.results, job.captured_at, job.frame.shape)]
+                    self._last_results[job.cam_id] = job.results
+                target = tracker.target()
+                job.target = target.xyxy if target is not None else None
+            results = job.results or []
+            monitor.handle_detections(results)
+            manager = self.events.get(job.cam_id)
+            if manager is not None:
+                manager.process(results, job.frame.shape)
+            self.snapshots.publish(job.cam_id, job.frame, results, job.captured_at, job.seq)
+            if self.broadcaster is not None and self.broadcaster.wants(job.cam_id):
+                self.broadcaster.publish(job.cam_id, detection_message(
+                    job.cam_id, job.seq, job.captured_at, job.frame.shape, results,
+                    inferred=not (job.reused or job.tracked),
+                    last_seen=getattr(monitor, "last_person_ts", None),
+                ))
+            FRAMES_PROCESSED.labels(job.cam_id).inc()
+            self._e2e.append(time.time() - job.captured_at)
+            out.append(job)
+        return out
+
+    def _ptz(self, jobs):
+        """Rastreamento automático PTZ.
+
+        Com tracker, segue o alvo suavizado pelo Kalman (mesmo ID entre
+        frames); sem tracker, a primeira detecção de pessoa.
+        """
+        for job in jobs:
+            if job.cam_id in self.trackers:
+                target = job.target
+            else:
+                target = next((tuple(map(float, box.xyxy[0]))
+                               for r in job.results or [] for box in r.boxes), None)
+            if target is None:
+                continue
+            height, width = job.frame.shape[:2]
+            x1, y1, x2, y2 = target
+            err_x = ((x1 + x2) / 2 - width / 2) / width
+            err_y = ((y1 + y2) / 2 - height / 2) / height
+
+            # Só move se estiver fora da zona morta
+            if abs(err_x) > self.dead_zone or abs(err_y) > self.dead_zone:
+                self.cameras[job.cam_id].control_ptz(err_x, err_y, kp=self.kp)
+        return []
+
+    # -- métricas ---------------------------------------------------------
+    def register_metrics(self, registry=REGISTRY) -> None:
+        """Expõe filas e filtro de movimento como séries lidas no scrape."""
+        queues = {"preprocess": self.q_pre, "inference": self.q_infer,
+                  "postprocess": self.q_post, "ptz": self.q_ptz}
+        registry.gauge_callback(
+            "pipeline_queue_depth", "Items waiting in each pipeline queue", ("queue",),
+            lambda: {name: len(q) for name, q in queues.items()})
+        registry.gauge_callback(
+            "frames_dropped_total", "Frames discarded by full pipeline queues", ("queue",),
+            lambda: {name: q.dropped for name, q in queues.items()}, kind="counter")
+        registry.gauge_callback(
+            "motion_skipped_total", "Frames whose inference was skipped by the motion gate",
+            ("camera",), lambda: {cid: g.skipped for cid, g in self.gates.items()}, kind="counter")
+        registry.gauge_callback(
+            "tracker_active_tracks", "Confirmed person tracks per camera", ("camera",),
+            lambda: {cid: t.stats()["confirmed"] for cid, t in self.trackers.items()})
+
+    # -- ciclo de vida ----------------------------------------------------
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self) -> None:
+        for stage in self.stages:
+            stage.stop()
+        for stage in self.stages:
+            stage.join()
+
+    def stats(self) -> dict:
+        e2e = list(self._e2e)
+        return {
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+            "end_to_end_ms": {
+                "mean": round(sum(e2e) / len(e2e) * 1000, 2) if e2e else None,
+                "max": round(max(e2e) * 1000, 2) if e2e else None,
+            },
+        }
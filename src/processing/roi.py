@@ -0,0 +1,80 @@
+class RoiSelector:
+    """
+    Escolhe, por câmera, a região do frame enviada ao detector.
+
+    - ``roi``: região fixa ``[x1, y1, x2, y2]`` em frações do frame (0–1),
+      ex.: só o berço; ``None`` = frame inteiro;
+    - ``mode="track"``: recorta em volta da última detecção (caixa ampliada
+      por ``margin`` e com lado mínimo ``min_size`` do frame). Sem detecção
+      recente, ou a cada ``full_every`` frames, volta à região fixa para
+      encontrar pessoas novas;
+    - ``imgsz``: resolução de inferência desta câmera (``None`` = da engine).
+
+    As caixas voltam em coordenadas do frame inteiro
+    (``InferenceEngine.preprocess``/``reproject``), então PTZ e overlay não
+    mudam.
+    """
+
+    def __init__(self, roi=None, *, mode: str = "fixed", imgsz: int = None,
+                 margin: float = 1.0, min_size: float = 0.3, full_every: int = 10, lost_after: int = 3):
+        if mode not in ("fixed", "track"):
+            raise ValueError(f"Modo de ROI inválido: {mode!r}")
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            if not (0 <= x1 < x2 <= 1 and 0 <= y1 < y2 <= 1):
+                raise ValueError(f"ROI deve estar em frações 0-1 com x1<x2, y1<y2: {roi!r}")
+        self.roi = tuple(roi) if roi is not None else None
+        self.mode = mode
+        self.imgsz = imgsz
+        self.margin = margin
+        self.min_size = min_size
+        self.full_every = full_every
+        self.lost_after = lost_after
+
+        self._last_box = None       # última caixa (pixels, frame inteiro)
+        self._misses = 0
+        self._since_full = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "RoiSelector":
+        """Cria a partir do bloco ``detection`` do JSON da câmera."""
+        cfg = dict(cfg or {})
+        return cls(cfg.pop("roi", None), **cfg)
+
+    def _fixed(self, shape):
+        if self.roi is None:
+            return None
+        h, w = shape[:2]
+        x1, y1, x2, y2 = self.roi
+        return (x1 * w, y1 * h, x2 * w, y2 * h)
+
+    def select(self, shape):
+        """Região (pixels ``x1, y1, x2, y2``) para o próximo frame ou None."""
+        if self.mode != "track" or self._last_box is None or self._since_full >= self.full_every:
+            self._since_full = 0
+            return self._fixed(shape)
+        self._since_full += 1
+
+        h, w = shape[:2]
+        x1, y1, x2, y2 = self._last_box
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        bw = max((x2 - x1) * (1 + self.margin), self.min_size * w)
+        bh = max((y2 - y1) * (1 + self.margin), self.min_size * h)
+        return (max(cx - bw / 2, 0), max(cy - bh / 2, 0), min(cx + bw / 2, w), min(cy + bh / 2, h))
+
+    def update(self, results) -> None:
+        """Registra a melhor detecção do frame (modo ``track``)."""
+        if self.mode != "track":
+            return
+        best, best_conf = None, -1.0
+        for r in results or []:
+            for box in r.boxes:
+                conf = float(box.conf[0])
+                if conf > best_conf:
+                    best, best_conf = tuple(float(v) for v in box.xyxy[0]), conf
+        if best is not None:
+            self._last_box, self._misses = best, 0
+        else:
+            self._misses += 1
+            if self._misses >= self.lost_after:
+                self._last_box = None
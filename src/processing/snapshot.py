@@ -0,0 +1,82 @@
+import time
+import uuid
+from threading import Lock
+
+import cv2
+
+from src.streaming.mjpeg_hub import JPEG_ENCODE
+
+# Identifica este processo no ETag: ``seq`` recomeça em 1 a cada reinício
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def draw_detections(image, results) -> None:
+    """Desenha as caixas de pessoa (e a confiança) sobre ``image``."""
+    for r in results or []:
+        for box in r.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            conf = float(box.conf[0])
+            cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(image, f"Pessoa {conf:.2f}", (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.5, (0, 255, 0), 1)
+
+
+class DetectionSnapshot:
+    """Último resultado do pipeline de uma câmera: frame, detecções e instante.
+
+    O JPEG com overlay é gerado só no primeiro :meth:`jpeg` e reaproveitado
+    por todas as requisições seguintes até o próximo resultado.
+    """
+
+    __slots__ = ("cam_id", "frame", "results", "timestamp", "seq", "_jpeg", "_lock")
+
+    def __init__(self, cam_id: str, frame, results, timestamp: float, seq: int):
+        self.cam_id = cam_id
+        self.frame = frame          # ndarray somente leitura (não desenhar nele)
+        self.results = results
+        self.timestamp = timestamp  # captura do frame (epoch)
+        self.seq = seq
+        self._jpeg: bytes = None
+        self._lock = Lock()
+
+    @property
+    def etag(self) -> str:
+        return f'"{BOOT_ID}-{self.cam_id}-{self.seq}"'
+
+    def age(self, now: float = None) -> float:
+        return (time.time() if now is None else now) - self.timestamp
+
+    @property
+    def encoded(self) -> bool:
+        return self._jpeg is not None
+
+    def jpeg(self) -> bytes:
+        """JPEG com as caixas desenhadas (codificado uma vez)."""
+        with self._lock:
+            if self._jpeg is None:
+                image = self.frame.copy()
+                draw_detections(image, self.results)
+                with JPEG_ENCODE.time():
+                    ok, jpg = cv2.imencode(".jpg", image)
+                if not ok:
+                    raise RuntimeError("Falha ao codificar snapshot")
+                self._jpeg = jpg.tobytes()
+            return self._jpeg
+
+
+class SnapshotStore:
+    """Último :class:`DetectionSnapshot` de cada câmera (publicado pelo pipeline)."""
+
+    def __init__(self):
+        self._latest: dict = {}
+        self._lock = Lock()
+
+    def publish(self, cam_id: str, frame, results, timestamp: float, seq: int) -> DetectionSnapshot:
+        snap = DetectionSnapshot(cam_id, frame, results, timestamp, seq)
+        with self._lock:
+            self._latest[cam_id] = snap
+        return snap
+
+    def get(self, cam_id: str) -> DetectionSnapshot:
+        with self._lock:
+            return self._latest.get(cam_id)
@@ -0,0 +1,199 @@
+import time
+from itertools import count
+from threading import Lock
+
+import numpy as np
+
+from src.inference.engine import Box, Detections
+
+
+def iou(a, b) -> float:
+    """Interseção sobre união de duas caixas ``x1, y1, x2, y2``."""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(ix2 - ix1, 0.0) * max(iy2 - iy1, 0.0)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class KalmanBox:
+    """
+    Filtro de Kalman de velocidade constante sobre ``cx, cy, w, h`` (estilo
+    SORT). O passo de tempo vem dos timestamps dos frames, então frames
+    pulados ou FPS variável não distorcem a velocidade estimada.
+    """
+
+    def __init__(self, xyxy, *, process_noise: float = 1.0, measurement_noise: float = 1.0):
+        self.x = np.zeros(8)
+        self.x[:4] = self._measure(xyxy)
+        w, h = max(self.x[2], 1.0), max(self.x[3], 1.0)
+        # Incerteza inicial alta na velocidade (ainda desconhecida)
+        self.P = np.diag([w, h, w, h, 10 * w, 10 * h, 10 * w, 10 * h]) ** 2 / 100
+        self.q = process_noise
+        self.r = measurement_noise
+        self.H = np.eye(4, 8)
+
+    @staticmethod
+    def _measure(xyxy):
+        x1, y1, x2, y2 = (float(v) for v in xyxy)
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+    def predict(self, dt: float) -> None:
+        if dt <= 0:
+            return
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        # Ruído proporcional ao tamanho da caixa (pessoas perto andam "mais" pixels)
+        scale = max(self.x[2], self.x[3], 1.0) / 20
+        Q = np.diag([dt, dt, dt, dt, 1, 1, 1, 1]) * (self.q * scale) ** 2 * dt
+        self.x = F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = F @ self.P @ F.T + Q
+
+    def update(self, xyxy) -> None:
+        z = self._measure(xyxy)
+        scale = max(z[2], z[3], 1.0) / 20
+        R = np.eye(4) * (self.r * scale) ** 2
+        S = self.H @ self.P @ self.H.T + R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self.H @ self.x)
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    @property
+    def xyxy(self) -> tuple:
+        cx, cy, w, h = self.x[:4]
+        return (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+    @property
+    def center(self) -> tuple:
+        return float(self.x[0]), float(self.x[1])
+
+
+class Track:
+    """Pessoa acompanhada entre frames, com ID estável."""
+
+    def __init__(self, track_id: int, xyxy, conf: float, ts: float):
+        self.id = track_id
+        self.kf = KalmanBox(xyxy)
+        self.conf = conf
+        self.hits = 1
+        self.updated_at = ts
+
+    @property
+    def xyxy(self) -> tuple:
+        return self.kf.xyxy
+
+
+class Tracker:
+    """
+    Rastreador multi-objeto por IoU + Kalman entre inferências.
+
+    - ``update(results, ts)``: associa as detecções aos tracks (maior IoU
+      primeiro, mínimo ``iou_threshold``), cria tracks para as novas e
+      descarta os que ficaram ``max_age`` segundos sem detecção. Devolve as
+      detecções do frame com ``box.id`` e a caixa corrigida pelo Kalman;
+    - ``predict(ts)``: posição estimada de cada track num frame sem
+      inferência, no mesmo formato de ``r.boxes`` (com ``box.id``);
+    - ``target()``: track seguido pelo PTZ. Continua o mesmo enquanto
+      existir, em vez de pular para a primeira caixa de cada frame.
+
+    Só tracks com ``min_hits`` detecções aparecem nas predições e no alvo,
+    para uma detecção espúria isolada não mover a câmera (nos frames
+    inferidos todas as detecções aparecem, já com ID).
+    """
+
+    def __init__(self, *, iou_threshold: float = 0.3, max_age: float = 1.0, min_hits: int = 2):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+
+        self._tracks: list = []
+        self._ids = count(1)
+        self._ts: float = None
+        self._target: int = None
+        self._lock = Lock()
+
+    def _advance(self, ts: float) -> None:
+        # Resultados da inferência chegam depois de frames já previstos:
+        # nunca volta no tempo, só avança
+        if self._ts is not None and ts > self._ts:
+            for track in self._tracks:
+                track.kf.predict(ts - self._ts)
+        if self._ts is None or ts > self._ts:
+            self._ts = ts
+
+    def _confirmed(self) -> list:
+        return [t for t in self._tracks if t.hits >= self.min_hits]
+
+    @staticmethod
+    def _box(track) -> Box:
+        box = Box(track.xyxy, track.conf, 0)
+        box.id = np.asarray([track.id], dtype=np.float32)
+        return box
+
+    def update(self, results, ts: float = None, shape=None) -> Detections:
+        """Corrige os tracks com as detecções de um frame inferido.
+
+        Retorna as detecções na ordem recebida, cada uma com o ID do seu
+        track e a caixa suavizada.
+        """
+        ts = time.time() if ts is None else ts
+        detections = [
+            (tuple(float(v) for v in box.xyxy[0]), float(box.conf[0]))
+            for r in results or [] for box in r.boxes
+        ]
+        if shape is None:
+            shape = next((getattr(r, "orig_shape", None) for r in results or []), None)
+        with self._lock:
+            self._advance(ts)
+            pairs = sorted(
+                ((iou(t.xyxy, d[0]), ti, di)
+                 for ti, t in enumerate(self._tracks) for di, d in enumerate(detections)),
+                reverse=True,
+            )
+            used_t, matched = set(), {}
+            for score, ti, di in pairs:
+                if score < self.iou_threshold:
+                    break
+                if ti in used_t or di in matched:
+                    continue
+                used_t.add(ti)
+                track = matched[di] = self._tracks[ti]
+                track.kf.update(detections[di][0])
+                track.conf = detections[di][1]
+                track.hits += 1
+                track.updated_at = ts
+
+            self._tracks = [t for t in self._tracks if ts - t.updated_at <= self.max_age]
+            for di, (xyxy, conf) in enumerate(detections):
+                if di not in matched:
+                    matched[di] = Track(next(self._ids), xyxy, conf, ts)
+                    self._tracks.append(matched[di])
+            return Detections([self._box(matched[di]) for di in range(len(detections))], shape)
+
+    def predict(self, ts: float = None, shape=None) -> Detections:
+        """Caixas previstas dos tracks confirmados para um frame sem inferência."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._advance(ts)
+            self._tracks = [t for t in self._tracks if ts - t.updated_at <= self.max_age]
+            return Detections([self._box(t) for t in self._confirmed()], shape)
+
+    def target(self):
+        """Track seguido pelo PTZ (o atual, se ainda ativo; senão o de maior
+        confiança) ou None."""
+        with self._lock:
+            confirmed = self._confirmed()
+            current = next((t for t in confirmed if t.id == self._target), None)
+            if current is None and confirmed:
+                current = max(confirmed, key=lambda t: t.conf)
+            self._target = current.id if current else None
+            return current
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tracks": len(self._tracks),
+                "confirmed": len(self._confirmed()),
+                "target": self._target,
+            }
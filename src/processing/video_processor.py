@@ -1,40 +1,36 @@
-from ultralytics import YOLO
-import cv2
+from src.inference import InferenceEngine
+from .roi import RoiSelector
 
-class VideoProcessor:
-    def __init__(self, camera_handler):
-        self.camera = camera_handler
-
-        # Carrega modelo leve YOLOv8n (pré-treinado para detecção de pessoas)
-        self.model = YOLO("yolo11n.pt")  
-
-    def process_frame(self):
-        frame = self.camera.get_frame()
-        if frame is None:
-            return None
 
-        # Roda inferência (classe 0 = pessoa)
-        results = self.model.predict(source=frame, conf=0.4, classes=[0], verbose=False)
+class VideoProcessor:
+    """Inferência avulsa de um frame (scripts e testes); o servidor usa o
+    ``DetectionPipeline``."""
 
-        for r in results:
-            for box in r.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = box.conf[0].item()
-                label = f"Pessoa {conf:.2f}"
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX,
-                            0.5, (0, 255, 0), 1)
+    def __init__(self, camera_handler, engine: InferenceEngine = None, roi: RoiSelector = None):
+        self.camera = camera_handler
+        # Região/resolução de inferência da câmera (None = frame inteiro)
+        self.roi = roi
+
+        # Detector de pessoas (YOLO11n) via backend configurável em INFER_*.
+        # Com várias câmeras a mesma engine é compartilhada entre processadores.
+        # O modelo é carregado na primeira inferência (ou em segundo plano
+        # pelo lifespan), não aqui.
+        self.engine = engine if engine is not None else InferenceEngine.from_env()
+
+    def _predict(self, frame):
+        if self.roi is None:
+            return self.engine.infer(frame)
+        results = self.engine.infer(frame, self.roi.select(frame.shape), self.roi.imgsz)
+        self.roi.update(results)
+        return results
 
-        return frame
-    
     def process_frame_data(self, frame):
         """Recebe um frame e retorna resultados da inferência."""
         if frame is None:
             return None
-        results = self.model.predict(source=frame, conf=0.4, classes=[0], verbose=False)
+        results = self._predict(frame)
         return results
 
     def get_processed_frame(self):
         """Return the latest frame from the camera."""
         return self.camera.get_frame()
-
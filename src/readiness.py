@@ -0,0 +1,102 @@
+import logging
+import time
+from threading import Event, Lock, Thread
+
+PENDING = "pending"
+STARTING = "starting"
+READY = "ready"
+FAILED = "failed"
+
+
+class Readiness:
+    """Estado de inicialização de cada subsistema e quanto tempo levou.
+
+    Subsistemas ``required`` decidem o ``/api/ready``; os demais (ex.:
+    Firebase) só aparecem no relatório, e uma falha neles não tira o
+    servidor do ar.
+    """
+
+    def __init__(self, started_at: float = None):
+        # perf_counter do início do import de src.main
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self._lock = Lock()
+        self._subsystems: dict = {}
+        self._ready_logged = False
+        self._stop = Event()
+
+    def register(self, name: str, *, required: bool = True) -> None:
+        with self._lock:
+            self._subsystems.setdefault(name, {
+                "state": PENDING, "required": required, "seconds": None, "error": None,
+            })
+
+    def set(self, name: str, state: str, *, seconds: float = None, error: str = None) -> None:
+        self.register(name)
+        with self._lock:
+            sub = self._subsystems[name]
+            sub["state"] = state
+            if seconds is not None:
+                sub["seconds"] = round(seconds, 3)
+            sub["error"] = error
+        if state == READY and self.ready() and not self._ready_logged:
+            self._ready_logged = True
+            logging.info("Servidor pronto em %.2f s", time.perf_counter() - self.started_at)
+
+    def run(self, name: str, fn, *, required: bool = True, background: bool = False,
+            retry: bool = False, backoff: float = 1.0, max_backoff: float = 60.0):
+        """Executa ``fn`` medindo o tempo; com ``background`` numa thread própria.
+
+        Exceções marcam o subsistema como ``failed`` e não se propagam. Com
+        ``retry``, tenta de novo após ``backoff`` segundos, dobrando a espera
+        até ``max_backoff``, até dar certo ou :meth:`stop` ser chamado.
+        """
+        self.register(name, required=required)
+        self.set(name, STARTING)
+
+        def target():
+            delay = backoff
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    logging.exception("Falha ao iniciar %s", name)
+                    self.set(name, FAILED, seconds=time.perf_counter() - t0, error=str(e))
+                else:
+                    self.set(name, READY, seconds=time.perf_counter() - t0)
+                    return
+                if not retry:
+                    return
+                logging.warning("Nova tentativa de iniciar %s em %.0f s", name, delay)
+                if self._stop.wait(delay):
+                    return
+                delay = min(delay * 2, max_backoff)
+
+        if not background:
+            target()
+            return None
+        thread = Thread(target=target, name=f"startup-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Interrompe as novas tentativas pendentes (shutdown)."""
+        self._stop.set()
+
+    def ready(self) -> bool:
+        with self._lock:
+            return all(s["state"] == READY for s in self._subsystems.values() if s["required"])
+
+    def seconds(self) -> dict:
+        """Duração de cada subsistema já iniciado (para métricas)."""
+        with self._lock:
+            return {n: s["seconds"] for n, s in self._subsystems.items() if s["seconds"] is not None}
+
+    def report(self) -> dict:
+        with self._lock:
+            subsystems = {n: dict(s) for n, s in self._subsystems.items()}
+        return {
+            "ready": self.ready(),
+            "uptime_s": round(time.perf_counter() - self.started_at, 3),
+            "subsystems": subsystems,
+        }
@@ -0,0 +1,5 @@
+from .buffer import FrameRing
+from .recorder import ClipRecorder
+from .writer import Clip, ClipWriter
+
+__all__ = ["FrameRing", "ClipRecorder", "Clip", "ClipWriter"]
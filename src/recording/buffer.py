@@ -0,0 +1,46 @@
+from collections import deque
+from threading import Lock
+
+
+class FrameRing:
+    """
+    JPEGs recentes de uma câmera, do mais antigo ao mais novo.
+
+    Limitado por ``max_bytes`` (orçamento de memória) e por ``max_age``
+    segundos: ao passar de qualquer um, os frames mais antigos saem.
+    """
+
+    def __init__(self, max_bytes: int, max_age: float):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes deve ser > 0")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._frames = deque()      # (timestamp, jpeg bytes)
+        self._bytes = 0
+        self._lock = Lock()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def append(self, ts: float, data: bytes) -> None:
+        with self._lock:
+            self._frames.append((ts, data))
+            self._bytes += len(data)
+            while self._frames and (
+                self._bytes > self.max_bytes or ts - self._frames[0][0] > self.max_age
+            ):
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+                self.dropped += 1
+
+    def between(self, start: float, end: float) -> list:
+        """Frames com ``start <= timestamp <= end`` (referências, sem cópia)."""
+        with self._lock:
+            return [(ts, data) for ts, data in self._frames if start <= ts <= end]
@@ -0,0 +1,142 @@
+import datetime
+import logging
+import time
+from threading import Thread, Event, Lock
+
+import cv2
+
+from .buffer import FrameRing
+from .writer import Clip
+
+
+class ClipRecorder:
+    """
+    Pré-gravação de uma câmera e gravação de clipes de eventos.
+
+    Uma thread própria pega o último frame da câmera por referência (sem
+    cópia), reduz para ``width``, codifica em JPEG a no máximo ``fps``
+    quadros/s e guarda no :class:`FrameRing` (``pre_seconds``, limitado a
+    ``max_bytes``). Captura e inferência não esperam por nada disso: se
+    esta thread atrasar, ela só pula frames.
+
+    :meth:`trigger` abre um clipe com os ``pre_seconds`` anteriores ao
+    evento e segue acumulando até ``post_seconds`` depois dele; eventos que
+    chegam com o clipe aberto o estendem (até ``max_clip`` segundos). O
+    clipe fechado vai para o ``ClipWriter``, que grava em disco.
+    """
+
+    def __init__(self, camera, writer, *, camera_id: str, pre_seconds: float = 10.0,
+                 post_seconds: float = 10.0, fps: float = 5.0, quality: int = 70,
+                 width: int = 640, max_bytes: int = 32 * 2**20, max_clip: float = 120.0):
+        self.camera = camera
+        self.writer = writer
+        self.camera_id = camera_id
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.quality = quality
+        self.width = width
+        self.max_clip = max_clip
+        self.ring = FrameRing(max_bytes, pre_seconds)
+
+        self._active: Clip = None
+        self._lock = Lock()
+        self._thread: Thread = None
+        self._stop = Event()
+        self._seq = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name=f"recorder-{self.camera_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Para a thread; um clipe em andamento é entregue como está."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._close(force=True)
+
+    def _encode(self, image):
+        h, w = image.shape[:2]
+        if self.width and self.width < w:
+            image = cv2.resize(image, (self.width, max(1, round(h * self.width / w))),
+                               interpolation=cv2.INTER_AREA)
+        ok, jpg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)])
+        return jpg.tobytes() if ok else None
+
+    def add_frame(self, ts: float, image) -> None:
+        """Codifica e guarda um frame (chamado pela thread do gravador)."""
+        data = self._encode(image)
+        if data is None:
+            return
+        self.ring.append(ts, data)
+        with self._lock:
+            if self._active is not None and ts <= self._active.end:
+                self._active.frames.append((ts, data))
+        self._close(now=ts)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            frame = self.camera.next_frame(self._seq, timeout=0.5)
+            if frame is None:
+                # Câmera parada: não segura o clipe para sempre
+                self._close(now=time.time())
+                continue
+            self._seq = frame.seq
+            started = time.time()
+            try:
+                self.add_frame(frame.timestamp, frame.image)
+            except Exception:
+                logging.exception("[%s] Falha ao gravar frame no buffer", self.camera_id)
+            if self.fps:
+                self._stop.wait(max(0.0, 1.0 / self.fps - (time.time() - started)))
+
+    def trigger(self, event_type: str, at: float = None) -> None:
+        """Marca um evento em ``at`` (epoch); não bloqueia."""
+        at = time.time() if at is None else at
+        with self._lock:
+            clip = self._active
+            if clip is not None and at <= clip.end:
+                clip.end = min(max(clip.end, at + self.post_seconds), clip.start + self.max_clip)
+                clip.events.append({"type": event_type, "at": at})
+                return
+            # Clipe anterior já passou do fim (câmera sem frames novos)
+            self._active = None
+        if clip is not None:
+            self.writer.submit(clip)
+
+        start = at - self.pre_seconds
+        frames = self.ring.between(start, float("inf"))
+        with self._lock:
+            self._active = Clip(self.camera_id, start, at + self.post_seconds,
+                                [{"type": event_type, "at": at}], frames)
+
+    def trigger_event(self, event: dict) -> None:
+        """Adaptador para ``EventManager(on_event=...)``."""
+        ts = event.get("timestamp")
+        if isinstance(ts, datetime.datetime):
+            ts = ts.replace(tzinfo=datetime.timezone.utc).timestamp()
+        self.trigger(event["type"], ts)
+
+    def _close(self, now: float = None, force: bool = False) -> None:
+        with self._lock:
+            clip = self._active
+            if clip is None or not (force or now > clip.end):
+                return
+            self._active = None
+        self.writer.submit(clip)
+
+    @property
+    def recording(self) -> bool:
+        with self._lock:
+            return self._active is not None
+
+    def stats(self) -> dict:
+        return {
+            "buffered_frames": len(self.ring),
+            "buffered_bytes": self.ring.nbytes,
+            "recording": self.recording,
+        }
@@ -0,0 +1,196 @@
+import datetime
+import logging
+import os
+import re
+import time
+from collections import deque
+from threading import Thread, Event, Condition
+
+from src.metrics import REGISTRY
+
+CLIPS_WRITTEN = REGISTRY.counter("clips_written_total", "Event clips written to disk", ("camera",))
+
+
+class Clip:
+    """Trecho a gravar: frames JPEG ``(ts, bytes)`` e os eventos que o geraram."""
+
+    __slots__ = ("camera", "start", "end", "events", "frames")
+
+    def __init__(self, camera: str, start: float, end: float, events: list, frames: list = None):
+        self.camera = camera
+        self.start = start
+        self.end = end
+        self.events = events        # [{"type", "at"}] (at = epoch)
+        self.frames = frames or []
+
+
+def _utc(ts: float) -> datetime.datetime:
+    return datetime.datetime.utcfromtimestamp(ts)
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(name)) or "_"
+
+
+class ClipWriter:
+    """
+    Grava os clipes em disco numa thread própria e indexa no ``Database``.
+
+    O arquivo é MJPEG puro (JPEGs concatenados, os mesmos bytes do buffer,
+    sem decodificar/recodificar), em ``<directory>/<câmera>/<data>/``.
+    Toca em VLC/ffplay; para AVI/MP4: ``ffmpeg -f mjpeg -framerate <fps>
+    -i clip.mjpeg -c copy clip.avi``. A fila é limitada: se o disco não
+    acompanhar, o clipe mais antigo ainda não gravado é descartado.
+
+    Sem ``db`` (banco ainda conectando) ou com falha ao indexar, o arquivo é
+    gravado e as linhas do índice esperam em memória (até ``max_unindexed``)
+    para serem salvas assim que o banco responder.
+    """
+
+    def __init__(self, directory: str, db=None, *, queue_size: int = 16, max_unindexed: int = 10_000):
+        self.directory = directory
+        self.db = db
+        self._queue = deque(maxlen=queue_size)
+        self._unindexed = deque(maxlen=max_unindexed)
+        self._logged_at = float("-inf")
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Thread = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def submit(self, clip: Clip) -> None:
+        """Enfileira o clipe; não bloqueia."""
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(clip)
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, name="clip-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Para a thread e grava o que ainda estiver na fila."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self.drain()
+        self.index_pending()
+
+    def drain(self) -> int:
+        """Grava todos os clipes pendentes agora; retorna quantos."""
+        n = 0
+        while True:
+            with self._cond:
+                if not self._queue:
+                    return n
+                clip = self._queue.popleft()
+            self.write(clip)
+            n += 1
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stop.is_set(), timeout=1.0)
+            self.drain()
+            self.index_pending()
+
+    def index_pending(self) -> int:
+        """Salva no banco as linhas de índice pendentes; retorna quantas."""
+        if self.db is None or not self._unindexed:
+            return 0
+        rows = list(self._unindexed)
+        try:
+            self.db.save_clips(rows)
+        except Exception:
+            # Tentado de novo a cada volta da thread; loga no máximo 1x/min
+            now = time.time()
+            if now - self._logged_at >= 60:
+                self._logged_at = now
+                logging.exception("Falha ao indexar %d clipes; os arquivos já estão gravados", len(rows))
+            return 0
+        for _ in rows:
+            self._unindexed.popleft()
+        return len(rows)
+
+    def path_for(self, clip: Clip) -> str:
+        first = _utc(clip.events[0]["at"] if clip.events else clip.start)
+        kind = _safe(clip.events[0]["type"]) if clip.events else "clip"
+        return os.path.join(
+            self.directory, _safe(clip.camera), first.strftime("%Y%m%d"),
+            f"{first.strftime('%H%M%S')}{first.microsecond // 1000:03d}-{kind}.mjpeg",
+        )
+
+    @staticmethod
+    def _reserve(path: str) -> str:
+        """Cria o arquivo vazio com nome exclusivo (``-1``, ``-2``... se já existir)."""
+        base, ext = os.path.splitext(path)
+        n = 0
+        while True:
+            candidate = f"{base}-{n}{ext}" if n else path
+            try:
+                with open(candidate, "x"):
+                    return candidate
+            except FileExistsError:
+                n += 1
+
+    def write(self, clip: Clip) -> str:
+        """Grava um clipe (arquivo temporário + rename) e o indexa (ou deixa o índice
+        pendente, sem banco); retorna o caminho."""
+        if not clip.frames:
+            logging.warning("[%s] Clipe sem frames (buffer vazio?)", clip.camera)
+            return None
+        path = self.path_for(clip)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Dois clipes no mesmo milissegundo não sobrescrevem um ao outro
+            path = self._reserve(path)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as fh:
+                for _, data in clip.frames:
+                    fh.write(data)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+        except Exception:
+            self.failures += 1
+            logging.exception("[%s] Falha ao gravar clipe %s", clip.camera, path)
+            return None
+        self.written += 1
+        CLIPS_WRITTEN.labels(clip.camera).inc()
+        self._unindexed.extend(
+            {
+                "camera": clip.camera,
+                "event_type": ev["type"],
+                "event_at": _utc(ev["at"]),
+                "start": _utc(clip.frames[0][0]),
+                "end": _utc(clip.frames[-1][0]),
+                "path": path,
+                "frames": len(clip.frames),
+                "size": size,
+            }
+            for ev in clip.events
+        )
+        self.index_pending()
+        return path
+
+    def stats(self) -> dict:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "pending": self.pending(),
+            "unindexed": len(self._unindexed),
+        }
@@ -0,0 +1,5 @@
+from .mjpeg_hub import MjpegHub
+from .profiles import StreamProfile, StreamHubs
+from .detections import DetectionBroadcaster
+
+__all__ = ["MjpegHub", "StreamProfile", "StreamHubs", "DetectionBroadcaster"]
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import time
+from collections import deque
+from threading import Lock
+
+from src.metrics import REGISTRY
+
+DETECTION_MESSAGES = REGISTRY.counter(
+    "detection_messages_total", "Detection messages queued to subscribers", ("result",))
+
+
+def detection_message(cam_id: str, seq: int, captured_at: float, shape, results, *,
+                      inferred: bool = True, last_seen: float = None, now: float = None) -> dict:
+    """Mensagem compacta de um frame processado.
+
+    ``boxes`` é uma lista de ``[x1, y1, x2, y2, conf, id]`` em pixels do
+    frame ``w`` x ``h`` (``id`` do track ou ``null`` sem tracker).
+    """
+    now = time.time() if now is None else now
+    boxes = []
+    for r in results or []:
+        for box in r.boxes:
+            x1, y1, x2, y2 = (int(round(float(v))) for v in box.xyxy[0])
+            track = getattr(box, "id", None)
+            boxes.append([x1, y1, x2, y2, round(float(box.conf[0]), 3),
+                          int(track[0]) if track is not None else None])
+    h, w = shape[:2]
+    return {
+        "camera": cam_id,
+        "seq": seq,
+        "ts": round(captured_at, 3),
+        "latency_ms": round((now - captured_at) * 1000, 1),
+        "w": w,
+        "h": h,
+        "inferred": inferred,
+        "persons": len(boxes),
+        "last_seen": round(last_seen, 3) if last_seen is not None else None,
+        "boxes": boxes,
+    }
+
+
+class Subscriber:
+    """Fila de um cliente: limitada, descarta a mensagem mais antiga.
+
+    Um cliente lento (socket cheio) só perde mensagens velhas; o pipeline
+    nunca espera por ele e os demais clientes não são afetados.
+    """
+
+    def __init__(self, loop, camera: str = None, maxsize: int = 8):
+        self.loop = loop
+        self.camera = camera
+        self._queue = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self._lock = Lock()
+        self._wake_pending = False
+        self.dropped = 0
+
+    def push(self, message: str) -> None:
+        """Enfileira (qualquer thread) e acorda o cliente no seu event loop."""
+        with self._lock:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+                DETECTION_MESSAGES.labels("dropped").inc()
+            self._queue.append(message)
+            wake, self._wake_pending = not self._wake_pending, True
+        if wake:
+            try:
+                self.loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                pass  # loop já encerrado
+
+    def _wake(self) -> None:
+        with self._lock:
+            self._wake_pending = False
+        self._ready.set()
+
+    async def get(self, timeout: float = None):
+        """Próxima mensagem (JSON) ou ``None`` no timeout."""
+        while True:
+            with self._lock:
+                if self._queue:
+                    return self._queue.popleft()
+                self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+
+class DetectionBroadcaster:
+    """Distribui as detecções de cada frame para clientes WebSocket/SSE.
+
+    A mensagem é serializada uma vez por frame e só quando há alguém
+    inscrito na câmera; cada cliente tem sua fila de ``buffer`` mensagens.
+    """
+
+    def __init__(self, *, buffer: int = 8, max_subscribers: int = 100):
+        self.buffer = buffer
+        self.max_subscribers = max_subscribers
+        self._subscribers: list = []
+        self._lock = Lock()
+
+    def subscribe(self, camera: str = None) -> Subscriber:
+        """Inscreve um cliente (chamar dentro do event loop).
+
+        ``camera`` None recebe todas as câmeras. Levanta ``LookupError`` se o
+        limite de clientes foi atingido.
+        """
+        sub = Subscriber(asyncio.get_running_loop(), camera, self.buffer)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise LookupError("Limite de clientes de detecção atingido")
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def wants(self, cam_id: str) -> bool:
+        """Há clientes para ``cam_id``? (evita montar mensagens à toa)"""
+        with self._lock:
+            return any(s.camera in (None, cam_id) for s in self._subscribers)
+
+    def publish(self, cam_id: str, message: dict) -> int:
+        """Envia ``message`` aos inscritos da câmera; retorna quantos."""
+        with self._lock:
+            targets = [s for s in self._subscribers if s.camera in (None, cam_id)]
+        if not targets:
+            return 0
+        data = json.dumps(message, separators=(",", ":"))
+        for sub in targets:
+            sub.push(data)
+        DETECTION_MESSAGES.labels("queued").inc(len(targets))
+        return len(targets)
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from threading import Thread, Event, Condition
+
+import cv2
+
+from src.metrics import REGISTRY
+
+JPEG_ENCODE = REGISTRY.histogram("jpeg_encode_seconds", "Duration of cv2.imencode for JPEG output")
+
+
+def _resolve_all(futures) -> None:
+    """Acorda, no event loop, os clientes assíncronos aguardando frame."""
+    for fut in futures:
+        if not fut.done():
+            fut.set_result(None)
+
+
+class MjpegHub:
+    """Codifica cada frame novo da câmera uma única vez e distribui o JPEG
+    para todos os clientes MJPEG conectados.
+
+    ``width`` (redimensiona mantendo a proporção), ``fps`` (limite de
+    codificação) e ``quality`` (JPEG, 1-100) definem o perfil de saída;
+    ``None`` mantém o original / sem limite / padrão do OpenCV.
+    """
+
+    BOUNDARY = "frame"
+
+    def __init__(self, camera, *, wait_timeout: float = 0.5, overlay: bool = True,
+                 width: int = None, fps: float = None, quality: int = None):
+        self.camera = camera
+        self.wait_timeout = wait_timeout
+        self.overlay = overlay
+        self.width = width
+        self.fps = fps
+        self.quality = quality
+
+        self._cond = Condition()
+        self._seq = 0           # sequência do último JPEG publicado
+        self._source_seq = 0    # sequência do frame da câmera já codificado
+        self._chunk: bytes = None
+        self._subscribers = 0
+        # Clientes asyncio aguardando o próximo JPEG, agrupados por event loop
+        self._async_waiters: dict = {}
+
+        self._thread: Thread = None
+        self._stop = Event()
+
+    def start(self) -> None:
+        """Inicia a thread de codificação (idempotente)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._encode_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Para a thread e acorda os clientes que estão aguardando."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+            self._wake_async()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    @property
+    def subscribers(self) -> int:
+        with self._cond:
+            return self._subscribers
+
+    def _encode_loop(self):
+        """Codifica apenas quando há clientes e a câmera tem frame novo."""
+        while not self._stop.is_set():
+            if not self.subscribers:
+                time.sleep(0.1)
+                continue
+
+            # Aguarda notificação de frame novo em vez de fazer polling
+            frame = self.camera.next_frame(self._source_seq, timeout=self.wait_timeout)
+            if frame is None:
+                continue
+            self._source_seq = frame.seq
+            started = time.time()
+
+            chunk = self._encode(frame)
+            if chunk is not None:
+                self._publish(chunk)
+
+            # Limite de FPS: espera o intervalo e codifica o frame mais
+            # recente disponível, descartando os intermediários
+            if self.fps:
+                self._stop.wait(max(0.0, 1.0 / self.fps - (time.time() - started)))
+
+    def _encode(self, frame):
+        # O frame da câmera é somente leitura: copia só se for desenhar
+        image = frame.image
+        resized = False
+        if self.width:
+            h, w = image.shape[:2]
+            if self.width < w:
+                # resize já gera um array novo, que pode receber o overlay
+                image = cv2.resize(image, (self.width, max(1, round(h * self.width / w))),
+                                   interpolation=cv2.INTER_AREA)
+                resized = True
+        if self.overlay and not resized:
+            image = frame.copy()
+        if self.overlay:
+            lat = self.camera.get_last_latency() or 0.0
+            cv2.putText(image, f"Lat: {lat*1000:.1f} ms", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)] if self.quality else []
+        with JPEG_ENCODE.time():
+            ok, jpg = cv2.imencode('.jpg', image, params)
+        if not ok:
+            return None
+        return (
+            b'--' + self.BOUNDARY.encode() + b'\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + jpg.tobytes() + b'\r\n'
+        )
+
+    def _publish(self, chunk: bytes) -> None:
+        with self._cond:
+            self._chunk = chunk
+            self._seq += 1
+            self._cond.notify_all()
+            self._wake_async()
+
+    def _wake_async(self) -> None:
+        """Agenda um único callback por event loop (chamar com ``_cond`` travado)."""
+        waiters, self._async_waiters = self._async_waiters, {}
+        for loop, futures in waiters.items():
+            try:
+                loop.call_soon_threadsafe(_resolve_all, futures)
+            except RuntimeError:
+                pass  # loop já encerrado
+
+    def wait_next(self, last_seq: int, timeout: float = 1.0):
+        """
+        Bloqueia até existir um JPEG mais novo que ``last_seq``.
+        Retorna ``(seq, chunk)`` ou ``(last_seq, None)`` no timeout.
+        Clientes lentos recebem sempre o mais recente, pulando os
+        intermediários em vez de acumular fila.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._seq != last_seq or self._stop.is_set(),
+                timeout=timeout,
+            )
+            if self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._chunk
+
+    async def await_next(self, last_seq: int, timeout: float = 1.0):
+        """Versão asyncio de :meth:`wait_next`; não ocupa thread enquanto espera."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._seq != last_seq:
+                return self._seq, self._chunk
+            if self._stop.is_set():
+                return last_seq, None
+            fut = loop.create_future()
+            self._async_waiters.setdefault(loop, []).append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._cond:
+            futures = self._async_waiters.get(loop)
+            if futures and fut in futures:
+                futures.remove(fut)
+            if self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._chunk
+
+    def _subscribe(self, delta: int) -> None:
+        with self._cond:
+            self._subscribers += delta
+
+    def frames(self):
+        """Gerador multipart síncrono para um cliente; registra o assinante."""
+        self._subscribe(1)
+        try:
+            seq = 0
+            while not self._stop.is_set():
+                seq, chunk = self.wait_next(seq)
+                if chunk is not None:
+                    yield chunk
+        finally:
+            self._subscribe(-1)
+
+    async def aframes(self):
+        """Gerador multipart assíncrono, usado pelo endpoint de streaming."""
+        self._subscribe(1)
+        try:
+            seq = 0
+            while not self._stop.is_set():
+                seq, chunk = await self.await_next(seq)
+                if chunk is not None:
+                    yield chunk
+        finally:
+            self._subscribe(-1)
@@ -0,0 +1,166 @@
+import logging
+import time
+from collections import namedtuple
+from threading import Lock, Thread
+
+from .mjpeg_hub import MjpegHub
+
+# Larguras aceitas: pedidos próximos caem no mesmo perfil e dividem o encode
+WIDTHS = (160, 320, 480, 640, 800, 960, 1280, 1920)
+MIN_QUALITY = 30
+
+
+class StreamProfile(namedtuple("StreamProfile", "width fps quality")):
+    """Perfil de saída MJPEG (``None`` = original / sem limite / padrão)."""
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, width: int = None, fps: float = None, quality: int = None) -> "StreamProfile":
+        """Normaliza os parâmetros da requisição.
+
+        ``width`` sobe para a próxima largura de :data:`WIDTHS`, ``fps`` vira
+        inteiro entre 1 e 30 e ``quality`` é arredondada de 5 em 5 (10-95),
+        para que clientes com pedidos parecidos compartilhem o mesmo hub.
+        """
+        if width is not None:
+            width = next((w for w in WIDTHS if w >= width), None)
+        if fps is not None:
+            fps = min(max(int(round(fps)), 1), 30)
+        if quality is not None:
+            quality = min(max(int(round(quality / 5.0)) * 5, 10), 95)
+        return cls(width, fps, quality)
+
+    def degraded(self) -> "StreamProfile":
+        """Próximo degrau abaixo: qualidade, depois largura, depois FPS."""
+        quality = self.quality or 95
+        if quality > MIN_QUALITY:
+            return self._replace(quality=max(MIN_QUALITY, quality - 20))
+        if self.width is None:
+            return self._replace(width=320)
+        if self.width > WIDTHS[0]:
+            return self._replace(width=max(w for w in WIDTHS if w < self.width))
+        if (self.fps or 30) > 1:
+            return self._replace(fps=max(1, (self.fps or 30) // 2))
+        return self
+
+
+DEFAULT_PROFILE = StreamProfile(None, None, None)
+
+
+class StreamHubs:
+    """Um ``MjpegHub`` por perfil de saída de uma câmera.
+
+    Clientes com o mesmo perfil dividem uma única codificação. Hubs sem
+    clientes são encerrados quando é preciso abrir espaço para um perfil
+    novo (no máximo ``max_profiles`` threads de codificação por câmera).
+    """
+
+    def __init__(self, camera, *, factory=MjpegHub, max_profiles: int = 6, slow_send: float = 0.25):
+        self.camera = camera
+        self.factory = factory
+        self.max_profiles = max_profiles
+        self.slow_send = slow_send
+        self._hubs: dict = {}
+        self._lock = Lock()
+        self._running = False
+        self.default = self._create(DEFAULT_PROFILE)
+
+    def _create(self, profile: StreamProfile):
+        hub = self.factory(self.camera, **profile._asdict())
+        self._hubs[profile] = hub
+        if self._running:
+            hub.start()
+        return hub
+
+    def get(self, profile: StreamProfile = DEFAULT_PROFILE):
+        """Hub do perfil, criado e iniciado na primeira vez.
+
+        Levanta ``LookupError`` se o limite de perfis ativos foi atingido.
+        """
+        with self._lock:
+            return self._get(profile)
+
+    def _get(self, profile):
+        hub = self._hubs.get(profile)
+        if hub is not None:
+            return hub
+        if len(self._hubs) >= self.max_profiles:
+            self._reap()
+        if len(self._hubs) >= self.max_profiles:
+            raise LookupError("Limite de perfis de streaming atingido")
+        logging.info("Novo perfil de streaming %s", profile)
+        return self._create(profile)
+
+    def _acquire(self, profile):
+        # Registra o cliente sob o lock para o hub não ser encerrado por
+        # _reap entre a criação e a inscrição
+        with self._lock:
+            hub = self._get(profile)
+            hub._subscribe(1)
+            return hub
+
+    def _reap(self) -> None:
+        """Encerra hubs sem clientes (exceto o padrão); chamar com ``_lock``."""
+        for profile, hub in list(self._hubs.items()):
+            if profile != DEFAULT_PROFILE and not hub.subscribers:
+                # stop() aguarda a thread; não segura o event loop por isso
+                Thread(target=hub.stop, daemon=True).start()
+                del self._hubs[profile]
+
+    def profiles(self) -> dict:
+        """Clientes conectados por perfil."""
+        with self._lock:
+            return {p: h.subscribers for p, h in self._hubs.items()}
+
+    def start(self) -> None:
+        with self._lock:
+            self._running = True
+            for hub in self._hubs.values():
+                hub.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            for hub in self._hubs.values():
+                hub.stop()
+
+    async def aframes(self, profile: StreamProfile = DEFAULT_PROFILE, *, adaptive: bool = False):
+        """Gerador multipart de um cliente.
+
+        Com ``adaptive``, mede quanto tempo cada ``yield`` leva para voltar
+        (o servidor só pede o próximo chunk depois de escrever o anterior no
+        socket). Se a escrita passa de ``slow_send`` em média, o cliente
+        desce para :meth:`StreamProfile.degraded`; quando o envio volta a
+        ficar rápido, retorna ao perfil pedido.
+        """
+        current = profile
+        hub = self._acquire(current)
+        try:
+            seq, avg, fast = 0, 0.0, 0
+            while not hub._stop.is_set():
+                seq, chunk = await hub.await_next(seq)
+                if chunk is None:
+                    continue
+                t0 = time.monotonic()
+                yield chunk
+                if not adaptive:
+                    continue
+
+                avg = 0.8 * avg + 0.2 * (time.monotonic() - t0)
+                fast = fast + 1 if avg < self.slow_send / 4 else 0
+                target = current
+                if avg > self.slow_send:
+                    target = current.degraded()
+                elif fast >= 50 and current != profile:
+                    target = profile
+                if target == current:
+                    continue
+                try:
+                    new_hub = self._acquire(target)
+                except LookupError:
+                    continue
+                hub._subscribe(-1)
+                hub, current, seq, avg, fast = new_hub, target, 0, self.slow_send / 2, 0
+        finally:
+            hub._subscribe(-1)
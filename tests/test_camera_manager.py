@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import unittest
+from tempfile import NamedTemporaryFile
+from unittest.mock import patch, MagicMock
+
+# Provide fake external modules only if not installed
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules['cv2'] = MagicMock()
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.manager import CameraManager, load_camera_configs
+
+
+class TestLoadCameraConfigs(unittest.TestCase):
+    def test_fallback_to_single_env_camera(self):
+        env = {'CAM_HOST': '10.0.0.5', 'CAM_PORT': '8080'}
+        with patch.dict(os.environ, env, clear=True):
+            configs = load_camera_configs()
+        self.assertEqual(len(configs), 1)
+        self.assertEqual(configs[0]['id'], 'default')
+        self.assertEqual(configs[0]['host'], '10.0.0.5')
+        self.assertEqual(configs[0]['port'], 8080)
+
+    def test_loads_json_file(self):
+        cams = [{'id': 'quarto', 'host': 'a', 'port': 80, 'user': 'u', 'passwd': 'p'},
+                {'id': 'sala', 'host': 'b', 'port': 80, 'user': 'u', 'passwd': 'p'}]
+        with NamedTemporaryFile('w', suffix='.json', delete=False) as fh:
+            json.dump(cams, fh)
+        try:
+            with patch.dict(os.environ, {'CAMERAS_CONFIG': fh.name}):
+                self.assertEqual(load_camera_configs(), cams)
+        finally:
+            os.remove(fh.name)
+
+
+class TestCameraManager(unittest.TestCase):
+    @patch('src.camera.manager.MjpegHub')
+    @patch('src.camera.manager.CameraHandler')
+    def test_one_handler_per_camera(self, mock_handler, mock_hub):
+        mgr = CameraManager([
+            {'id': 'a', 'name': 'Quarto', 'host': 'h1', 'port': 80, 'user': 'u', 'passwd': 'p'},
+            {'id': 'b', 'host': 'h2', 'port': 80, 'user': 'u', 'passwd': 'p'},
+        ])
+        self.assertEqual(len(mgr), 2)
+        self.assertEqual(mgr.default.id, 'a')
+        self.assertEqual(mgr.get('a').name, 'Quarto')
+        self.assertIsNone(mgr.get('z'))
+        mock_handler.assert_any_call(name='b', host='h2', port=80, user='u', passwd='p')
+
+        mgr.start()
+        mgr.stop()
+        self.assertEqual(mock_handler.return_value.start.call_count, 2)
+        self.assertEqual(mock_handler.return_value.stop.call_count, 2)
+
+    @patch('src.camera.manager.CameraHandler')
+    def test_duplicate_ids_rejected(self, mock_handler):
+        with self.assertRaises(ValueError):
+            CameraManager([{'id': 'a', 'host': 'x', 'port': 1, 'user': 'u', 'passwd': 'p'}] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import sys
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Provide fake external modules only if not installed
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules['cv2'] = MagicMock()
+sys.modules.setdefault('onvif', MagicMock())
+try:
+    import firebase_admin  # noqa: F401
+except ImportError:
+    sys.modules['firebase_admin'] = MagicMock()
+
+from src.camera.handler import CameraHandler
+from src.camera.supervisor import Backoff
+from src.monitor.presence_monitor import PresenceMonitor
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def fake_onvif(mock_onvif):
+    media = MagicMock()
+    media.GetProfiles.return_value = [MagicMock(token='token')]
+    media.GetStreamUri.return_value = MagicMock(Uri='rtsp://cam/stream')
+    mock_onvif.return_value.create_media_service.return_value = media
+
+
+class TestBackoff(unittest.TestCase):
+    @patch('src.camera.supervisor.random.uniform', side_effect=lambda a, b: b)
+    def test_exponential_and_capped(self, _):
+        backoff = Backoff(base=1, maximum=5)
+        self.assertEqual([backoff.next() for _ in range(5)], [1, 2, 4, 5, 5])
+        backoff.reset()
+        self.assertEqual(backoff.next(), 1)
+
+    def test_jitter_bounds(self):
+        backoff = Backoff(base=2, maximum=2)
+        for _ in range(50):
+            self.assertTrue(1 <= backoff.next() <= 2)
+
+
+class TestCameraSupervisor(unittest.TestCase):
+    def make(self, **kwargs):
+        return CameraHandler('host', 80, 'u', 'p', backoff=Backoff(base=0.001, maximum=0.005), **kwargs)
+
+    @patch('src.camera.capture.cv2.VideoCapture')
+    @patch('src.camera.handler.ONVIFCamera')
+    def test_unreachable_camera_goes_offline_and_rediscovers(self, mock_onvif, mock_videocap):
+        fake_onvif(mock_onvif)
+        mock_videocap.return_value.isOpened.return_value = False
+
+        cam = self.make(offline_after=0.05, rediscover_after=2)
+        cam.start()  # não bloqueia mesmo sem câmera
+        try:
+            self.assertEqual(cam.state, 'connecting')
+            self.assertTrue(wait_for(lambda: cam.state == 'offline'))
+            self.assertTrue(wait_for(lambda: mock_onvif.call_count >= 2))
+            health = cam.health()
+            self.assertIn('Falha ao abrir stream', health['last_error'])
+            self.assertEqual([h['to'] for h in health['history']][:2], ['connecting', 'offline'])
+        finally:
+            cam.stop()
+        self.assertEqual(cam.state, 'stopped')
+
+    @patch('src.camera.capture.cv2.VideoCapture')
+    @patch('src.camera.handler.ONVIFCamera')
+    def test_read_failures_degrade_then_reconnect(self, mock_onvif, mock_videocap):
+        fake_onvif(mock_onvif)
+        frame = MagicMock()
+        reads = iter([(True, frame)] + [(False, None)] * 3)
+        cap = mock_videocap.return_value
+        cap.isOpened.return_value = True
+        cap.read.side_effect = lambda: next(reads, (True, frame))
+
+        cam = self.make(max_read_failures=3)
+        cam.start()
+        try:
+            self.assertTrue(wait_for(lambda: cap.release.called))
+            self.assertTrue(wait_for(lambda: cam.state == 'streaming'))
+            states = [h['to'] for h in cam.health()['history']]
+            self.assertIn('degraded', states)
+            self.assertGreaterEqual(mock_videocap.call_count, 2)
+            self.assertEqual(mock_onvif.call_count, 1)  # reabre pela URI em cache
+        finally:
+            cam.stop()
+
+
+class TestPresenceMonitorHealth(unittest.TestCase):
+    def test_only_offline_state_notifies(self):
+        dispatcher = MagicMock()
+        monitor = PresenceMonitor(MagicMock(), MagicMock(), dispatcher=dispatcher)
+        monitor.check_camera(None, {'state': 'degraded'})
+        dispatcher.submit.assert_not_called()
+        monitor.check_camera(None, {'state': 'offline'})
+        monitor.check_camera(None, {'state': 'offline'})
+        dispatcher.submit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Provide fake external modules only if not installed
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules['cv2'] = MagicMock()
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.capture import CaptureOptions, FFMPEG_OPTIONS_ENV, open_capture, select_profile
+
+
+def onvif_profile(token, width, height):
+    p = MagicMock(token=token)
+    p.VideoEncoderConfiguration.Resolution.Width = width
+    p.VideoEncoderConfiguration.Resolution.Height = height
+    return p
+
+
+class TestCaptureOptions(unittest.TestCase):
+    def test_ffmpeg_options(self):
+        opts = CaptureOptions(transport='tcp', threads=2, extra='probesize;32768')
+        self.assertEqual(
+            opts.ffmpeg_options(),
+            'rtsp_transport;tcp|fflags;nobuffer|flags;low_delay|max_delay;500000|threads;2|probesize;32768',
+        )
+        self.assertEqual(CaptureOptions(transport='udp', low_delay=False).ffmpeg_options(),
+                         'rtsp_transport;udp')
+
+    def test_from_env_with_overrides(self):
+        with patch.dict(os.environ, {'CAPTURE_TRANSPORT': 'udp', 'CAPTURE_PROFILE': 'sub'}):
+            opts = CaptureOptions.from_env(profile='auto')
+        self.assertEqual(opts.transport, 'udp')
+        self.assertEqual(opts.profile, 'auto')
+
+    @patch('src.camera.capture.cv2')
+    def test_open_capture_sets_env_only_during_open(self, mock_cv2):
+        seen = {}
+
+        def fake_open(*args):
+            seen['env'] = os.environ.get(FFMPEG_OPTIONS_ENV)
+            return MagicMock()
+
+        mock_cv2.VideoCapture.side_effect = fake_open
+        before = os.environ.get(FFMPEG_OPTIONS_ENV)
+        open_capture('rtsp://cam', CaptureOptions(transport='tcp', low_delay=False))
+        self.assertEqual(seen['env'], 'rtsp_transport;tcp')
+        self.assertEqual(os.environ.get(FFMPEG_OPTIONS_ENV), before)
+        args = mock_cv2.VideoCapture.call_args[0]
+        self.assertIn(mock_cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, args[2])
+
+    def test_select_profile(self):
+        main = onvif_profile('main', 1920, 1080)
+        sub = onvif_profile('sub', 640, 360)
+        tiny = onvif_profile('tiny', 320, 180)
+        profiles = [main, sub, tiny]
+        self.assertIs(select_profile(profiles, 'main'), main)
+        self.assertIs(select_profile(profiles, 'sub'), tiny)
+        self.assertIs(select_profile(profiles, 'auto', width=640), sub)
+        self.assertIs(select_profile(profiles, 'auto', width=4000), main)
+        self.assertIs(select_profile(profiles, '1'), sub)
+        with self.assertRaises(ValueError):
+            select_profile(profiles, 'best')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,11 @@ from unittest.mock import patch, MagicMock
 import importlib
 
 # Provide fake external modules if not installed
-sys.modules.setdefault('cv2', MagicMock())
-sys.modules.setdefault('onvif', MagicMock())
-sys.modules.setdefault('ultralytics', MagicMock())
+for _mod in ('cv2', 'onvif', 'ultralytics'):
+    try:
+        importlib.import_module(_mod)
+    except ImportError:
+        sys.modules[_mod] = MagicMock()
 
 from src.camera.handler import CameraHandler
 from src.processing.video_processor import VideoProcessor
@@ -31,6 +33,9 @@ class TestCameraHandler(unittest.TestCase):
         cam._thread.join(timeout=0.1)
         frame = cam.get_frame()
         self.assertEqual(frame, 'frame')
+        latest = cam.next_frame(0, timeout=0.1)
+        self.assertIs(latest.image, fake_frame)
+        self.assertGreater(latest.seq, 0)
         cam.stop()
 
 class TestVideoProcessor(unittest.TestCase):
@@ -0,0 +1,103 @@
+import asyncio
+import importlib
+import json
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+for _mod in ('cv2', 'onvif', 'ultralytics'):
+    try:
+        importlib.import_module(_mod)
+    except ImportError:
+        sys.modules[_mod] = MagicMock()
+try:
+    import firebase_admin  # noqa: F401
+except ImportError:
+    sys.modules['firebase_admin'] = MagicMock()
+
+from src.streaming.detections import DetectionBroadcaster, detection_message
+
+
+def result(*boxes):
+    return MagicMock(boxes=[MagicMock(xyxy=[b], conf=[0.876], id=None) for b in boxes])
+
+
+class TestDetectionMessage(unittest.TestCase):
+    def test_compact_message(self):
+        msg = detection_message('sala', 5, 100.0, (480, 640, 3), [result((1.4, 2, 30.6, 40))],
+                                inferred=False, last_seen=99.5, now=100.05)
+        self.assertEqual(msg['boxes'], [[1, 2, 31, 40, 0.876, None]])
+        self.assertEqual((msg['w'], msg['h'], msg['persons']), (640, 480, 1))
+        self.assertEqual(msg['latency_ms'], 50.0)
+        self.assertFalse(msg['inferred'])
+        json.dumps(msg)
+
+
+class TestDetectionBroadcaster(unittest.TestCase):
+    def test_camera_filter_and_slow_subscriber_drops_oldest(self):
+        async def scenario():
+            hub = DetectionBroadcaster(buffer=2)
+            all_cams = hub.subscribe()
+            sala = hub.subscribe('sala')
+            for seq in range(4):
+                hub.publish('sala', {'seq': seq})
+            hub.publish('quarto', {'seq': 9})
+
+            got = [json.loads(await sala.get(timeout=1))['seq'] for _ in range(2)]
+            self.assertEqual(got, [2, 3])
+            self.assertEqual(sala.dropped, 2)
+            self.assertIsNone(await sala.get(timeout=0.01))
+            self.assertEqual(json.loads(await all_cams.get(timeout=1))['seq'], 3)
+
+            hub.unsubscribe(sala)
+            hub.unsubscribe(all_cams)
+            self.assertFalse(hub.wants('sala'))
+            self.assertEqual(hub.publish('sala', {'seq': 10}), 0)
+
+        asyncio.run(scenario())
+
+    def test_wakes_subscriber_from_another_thread(self):
+        async def scenario():
+            hub = DetectionBroadcaster()
+            sub = hub.subscribe()
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, lambda: (time.sleep(0.05), hub.publish('a', {'ok': 1})))
+            self.assertEqual(json.loads(await sub.get(timeout=2)), {'ok': 1})
+
+        asyncio.run(scenario())
+
+    def test_subscriber_limit(self):
+        async def scenario():
+            hub = DetectionBroadcaster(max_subscribers=1)
+            hub.subscribe()
+            with self.assertRaises(LookupError):
+                hub.subscribe()
+
+        asyncio.run(scenario())
+
+
+@unittest.skipIf(importlib.util.find_spec('httpx') is None, 'httpx not installed')
+class TestDetectionsWebSocket(unittest.TestCase):
+    def test_pipeline_frames_reach_websocket_client(self):
+        from fastapi.testclient import TestClient
+        import src.main as main
+
+        client = TestClient(main.app)
+        cam_id = main.cameras.default.id
+        with client.websocket_connect(f'/api/detections?camera={cam_id}') as ws:
+            deadline = time.time() + 2
+            while not main.detections.wants(cam_id) and time.time() < deadline:
+                time.sleep(0.01)
+            main.detections.publish(cam_id, detection_message(
+                cam_id, 1, time.time(), (48, 64, 3), [result((1, 2, 3, 4))]))
+            msg = json.loads(ws.receive_text())
+        self.assertEqual((msg['camera'], msg['persons']), (cam_id, 1))
+
+        with self.assertRaises(Exception):
+            with client.websocket_connect('/api/detections?camera=nope') as ws:
+                ws.receive_text()
+
+
+if __name__ == '__main__':
+    unittest.main()
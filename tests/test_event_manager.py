@@ -0,0 +1,92 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+from src.events import EventManager, build_rules
+
+
+class FakeBox:
+    def __init__(self, xyxy, conf):
+        self.xyxy = [xyxy]
+        self.conf = [conf]
+
+
+class FakeResult:
+    def __init__(self, *boxes, shape=(100, 100, 3)):
+        self.boxes = list(boxes)
+        self.orig_shape = shape
+
+
+def person(cx=50, cy=50, conf=0.9):
+    return FakeBox((cx - 5, cy - 5, cx + 5, cy + 5), conf)
+
+
+class TestEventManager(unittest.TestCase):
+    def test_no_person_emits_absence_then_presence_once(self):
+        db = MagicMock()
+        manager = EventManager(db, {'no_person': {'seconds': 10}})
+        self.assertEqual(manager.process([FakeResult(person())], now=0), [])
+        self.assertEqual(manager.process([FakeResult()], now=5), [])
+        events = manager.process([FakeResult()], now=11)
+        self.assertEqual([e['type'] for e in events], ['absence'])
+        self.assertEqual(manager.process([FakeResult()], now=60), [])
+        events = manager.process([FakeResult(person())], now=61)
+        self.assertEqual([e['type'] for e in events], ['presence'])
+        self.assertEqual(db.save_event.call_count, 2)
+
+    def test_edge_zone_is_edge_triggered(self):
+        manager = EventManager(MagicMock(), {'edge_zone': {'margin': 0.1}})
+        self.assertEqual(manager.analyze([FakeResult(person(50, 50))], now=0), [])
+        self.assertEqual(len(manager.analyze([FakeResult(person(95, 50))], now=1)), 1)
+        self.assertEqual(manager.analyze([FakeResult(person(96, 50))], now=2), [])
+        manager.analyze([FakeResult(person(50, 50))], now=3)
+        self.assertEqual(len(manager.analyze([FakeResult(person(3, 50))], now=4)), 1)
+
+    def test_max_persons_uses_sliding_window(self):
+        manager = EventManager(MagicMock(), {'crowd': {'kind': 'max_persons', 'count': 1,
+                                                       'window': 4, 'min_frames': 2}})
+        two = [FakeResult(person(20), person(70))]
+        self.assertEqual(manager.analyze(two, now=0), [])
+        self.assertEqual(manager.analyze([FakeResult(person())], now=1), [])
+        events = manager.analyze(two, now=2)
+        self.assertEqual([(e['type'], e['rule']) for e in events], [('max_persons', 'crowd')])
+        self.assertEqual(manager.analyze(two, now=3), [])
+
+    def test_low_confidence_streak(self):
+        manager = EventManager(MagicMock(), {'low_confidence': {'threshold': 0.5, 'frames': 3}})
+        low = [FakeResult(person(conf=0.3))]
+        self.assertEqual(manager.analyze(low, now=0), [])
+        manager.analyze([FakeResult(person(conf=0.9))], now=1)
+        manager.analyze(low, now=2)
+        manager.analyze(low, now=3)
+        events = manager.analyze(low, now=4)
+        self.assertEqual(len(events), 1)
+        self.assertFalse(events[0]['notify'])
+
+    def test_notify_respects_rule_flag(self):
+        notify = MagicMock()
+        manager = EventManager(MagicMock(), {
+            'edge_zone': {'margin': 0.2},
+            'low_confidence': {'threshold': 0.5, 'frames': 1},
+        }, camera='sala', notify=notify)
+        manager.process([FakeResult(person(95, 50, conf=0.3))], now=0)
+        notify.assert_called_once()
+        self.assertEqual(notify.call_args[0][0]['camera'], 'sala')
+
+    def test_on_event_sees_every_event_with_timestamp(self):
+        hook = MagicMock()
+        manager = EventManager(MagicMock(), {
+            'low_confidence': {'threshold': 0.5, 'frames': 1},
+        }, on_event=hook)
+        manager.process([FakeResult(person(conf=0.3))], now=60)
+        event = hook.call_args[0][0]
+        self.assertEqual(event['type'], 'low_confidence')
+        self.assertEqual(event['timestamp'], datetime.datetime(1970, 1, 1, 0, 1))
+
+    def test_unknown_rule_kind(self):
+        with self.assertRaises(ValueError):
+            build_rules({'teleport': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
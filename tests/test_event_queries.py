@@ -0,0 +1,114 @@
+import datetime
+import importlib
+import unittest
+
+if importlib.util.find_spec('sqlalchemy') is None:
+    raise unittest.SkipTest('sqlalchemy not installed')
+
+from sqlalchemy import inspect
+
+from src.db import Database
+
+T0 = datetime.datetime(2024, 5, 1, 10, 0, 0)
+
+
+def at(minutes):
+    return T0 + datetime.timedelta(minutes=minutes)
+
+
+class TestEventQueries(unittest.TestCase):
+    def setUp(self):
+        self.db = Database('sqlite:///:memory:')
+        self.db.save_events([
+            {'type': 'person', 'camera': 'sala', 'confidence': 0.8, 'timestamp': at(0)},
+            {'type': 'absence', 'camera': 'sala', 'confidence': None, 'timestamp': at(10)},
+            {'type': 'absence', 'camera': 'sala', 'confidence': None, 'timestamp': at(15)},
+            {'type': 'presence', 'camera': 'sala', 'confidence': 0.9, 'timestamp': at(25)},
+            {'type': 'person', 'camera': 'sala', 'confidence': 0.6, 'timestamp': at(70)},
+            {'type': 'absence', 'camera': 'sala', 'confidence': None, 'timestamp': at(80)},
+        ])
+
+    def test_indexes_exist(self):
+        names = {ix['name'] for ix in inspect(self.db.engine).get_indexes('events')}
+        self.assertIn('ix_events_timestamp', names)
+        self.assertIn('ix_events_type_timestamp', names)
+        self.assertIn('ix_events_camera_timestamp', names)
+
+    def test_keyset_pagination_walks_all_events(self):
+        seen, cursor = [], None
+        while True:
+            page = self.db.query_events(limit=4, cursor=cursor)
+            seen += page['events']
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 6)
+        stamps = [e['timestamp'] for e in seen]
+        self.assertEqual(stamps, sorted(stamps, reverse=True))
+        self.assertEqual(len({e['id'] for e in seen}), 6)
+
+    def test_filters(self):
+        page = self.db.query_events(type='person', start=at(30))
+        self.assertEqual([e['confidence'] for e in page['events']], [0.6])
+        page = self.db.query_events(start=at(10), end=at(25))
+        self.assertEqual([e['type'] for e in page['events']], ['absence', 'absence'])
+
+    def test_camera_filter(self):
+        self.db.save_events([{'type': 'person', 'camera': 'quarto', 'confidence': 0.5,
+                              'timestamp': at(5)}])
+        page = self.db.query_events(camera='quarto')
+        self.assertEqual([(e['camera'], e['confidence']) for e in page['events']],
+                         [('quarto', 0.5)])
+        self.assertEqual(len(self.db.query_events(camera='sala')['events']), 6)
+        summary = self.db.summarize()
+        self.assertIn({'camera': 'quarto', 'type': 'person', 'count': 1}, summary['by_camera'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.db.query_events(cursor='not-a-cursor')
+
+    def test_summarize(self):
+        summary = self.db.summarize()
+        by_type = {row['type']: row for row in summary['by_type']}
+        self.assertEqual(by_type['person']['count'], 2)
+        self.assertAlmostEqual(by_type['person']['mean_confidence'], 0.7)
+        self.assertEqual(summary['per_hour'], [
+            {'hour': '2024-05-01T10:00:00', 'count': 4},
+            {'hour': '2024-05-01T11:00:00', 'count': 2},
+        ])
+
+    def test_absence_periods(self):
+        absences = self.db.absence_periods()
+        self.assertEqual(absences['count'], 2)
+        first, ongoing = absences['periods']
+        self.assertEqual(first['duration_s'], 15 * 60)
+        self.assertIsNone(ongoing['end'])
+
+    def test_absence_ends_only_with_presence_on_same_camera(self):
+        self.db.save_events([
+            {'type': 'presence', 'camera': 'quarto', 'confidence': 0.9, 'timestamp': at(12)},
+            {'type': 'absence', 'camera': 'quarto', 'confidence': None, 'timestamp': at(20)},
+        ])
+        periods = {(p['camera'], p['start']): p for p in self.db.absence_periods()['periods']}
+        self.assertEqual(periods[('sala', at(10).isoformat())]['duration_s'], 15 * 60)
+        self.assertIsNone(periods[('quarto', at(20).isoformat())]['end'])
+        self.assertEqual(self.db.absence_periods(camera='quarto')['count'], 1)
+
+    def test_adds_camera_column_to_old_table(self):
+        from tempfile import TemporaryDirectory
+        from sqlalchemy import create_engine, text
+        with TemporaryDirectory() as tmp:
+            url = f'sqlite:///{tmp}/old.db'
+            engine = create_engine(url)
+            with engine.begin() as conn:
+                conn.execute(text('CREATE TABLE events (id INTEGER PRIMARY KEY, type VARCHAR, '
+                                  'confidence FLOAT, timestamp DATETIME)'))
+            engine.dispose()
+            db = Database(url)
+            db.save_events([{'type': 'absence', 'camera': 'sala', 'timestamp': at(0)}])
+            self.assertEqual(db.query_events(camera='sala')['events'][0]['type'], 'absence')
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
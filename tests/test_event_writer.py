@@ -0,0 +1,135 @@
+import importlib
+import time
+import unittest
+from unittest.mock import MagicMock
+
+if importlib.util.find_spec('sqlalchemy') is None:
+    raise unittest.SkipTest('sqlalchemy not installed')
+
+from src.db import Database, EventWriter
+
+
+class TestEventWriter(unittest.TestCase):
+    def setUp(self):
+        self.db = Database('sqlite:///:memory:')
+
+    def test_save_event_is_buffered_until_flush(self):
+        writer = EventWriter(self.db, max_batch=100)
+        writer.save_event({'type': 'absence', 'confidence': 0.5})
+        self.assertEqual(writer.pending(), 1)
+        self.assertEqual(self.db.get_recent_events(), [])
+
+        self.assertEqual(writer.flush(), 1)
+        events = self.db.get_recent_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['type'], 'absence')
+
+    def test_buffers_until_database_is_set(self):
+        writer = EventWriter(None)
+        writer.save_event({'type': 'absence'})
+        self.assertEqual(writer.flush(), 0)
+        writer.db = self.db
+        self.assertEqual(writer.flush(), 1)
+
+    def test_full_buffer_without_database_does_not_spin(self):
+        writer = EventWriter(None, max_batch=2, flush_interval=0.05)
+        for i in range(5):
+            writer.save_event({'type': str(i)})
+        calls = []
+        flush = writer.flush
+        writer.flush = lambda: calls.append(1) or flush()
+        writer.start()
+        try:
+            time.sleep(0.2)
+            writer.db = self.db
+            deadline = time.time() + 2
+            while writer.written < 5 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            writer.stop()
+        self.assertEqual(writer.written, 5)
+        self.assertLess(len(calls), 20)
+
+    def test_background_flush_on_batch_size(self):
+        writer = EventWriter(self.db, max_batch=10, flush_interval=60)
+        writer.start()
+        try:
+            for i in range(25):
+                writer.save_event({'type': 'person', 'confidence': i / 25})
+            deadline = time.time() + 2
+            while writer.written < 20 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertGreaterEqual(writer.written, 20)
+        finally:
+            writer.stop()
+        self.assertEqual(writer.written, 25)
+        self.assertEqual(len(self.db.get_recent_events(limit=100)), 25)
+
+    def test_background_flush_on_interval(self):
+        writer = EventWriter(self.db, max_batch=1000, flush_interval=0.05)
+        writer.start()
+        try:
+            writer.save_event({'type': 'person', 'confidence': 0.9})
+            deadline = time.time() + 2
+            while writer.written < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(writer.written, 1)
+        finally:
+            writer.stop()
+
+    def test_failed_batch_is_kept_for_retry(self):
+        db = MagicMock()
+        db.save_events.side_effect = [RuntimeError('db down'), 2]
+        writer = EventWriter(db)
+        writer.save_event({'type': 'a'})
+        writer.save_event({'type': 'b'})
+
+        self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer.pending(), 2)
+        self.assertEqual(writer.failures, 1)
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(writer.pending(), 0)
+
+    def test_failing_database_backs_off_instead_of_spinning(self):
+        db = MagicMock()
+        db.save_events.side_effect = RuntimeError('db down')
+        writer = EventWriter(db, max_batch=2, flush_interval=0.05)
+        for i in range(5):
+            writer.save_event({'type': str(i)})
+        writer.start()
+        try:
+            time.sleep(0.4)
+        finally:
+            writer._stop.set()
+            with writer._cond:
+                writer._cond.notify()
+            writer._thread.join(timeout=1)
+        # retries at 0.05, 0.15 and 0.35 s (doubling), not thousands
+        self.assertLessEqual(db.save_events.call_count, 5)
+        self.assertEqual(writer.pending(), 5)
+
+    def test_requeue_on_full_buffer_counts_dropped(self):
+        db = MagicMock()
+        writer = EventWriter(db, max_pending=3)
+        for i in range(3):
+            writer.save_event({'type': str(i)})
+
+        def fail(batch):
+            writer.save_event({'type': 'new'})
+            raise RuntimeError('db down')
+        db.save_events.side_effect = fail
+        writer.flush()
+        self.assertEqual(writer.pending(), 3)
+        self.assertEqual(writer.dropped, 1)
+        self.assertEqual([e['type'] for e in writer._buffer], ['1', '2', 'new'])
+
+    def test_overflow_drops_oldest(self):
+        writer = EventWriter(MagicMock(), max_pending=3)
+        for i in range(5):
+            writer.save_event({'type': str(i)})
+        self.assertEqual(writer.pending(), 3)
+        self.assertEqual(writer.dropped, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.frames import FrameStore
+
+
+class TestFrameStore(unittest.TestCase):
+    def test_publish_is_read_only_and_shared(self):
+        store = FrameStore()
+        self.assertIsNone(store.latest())
+        img = np.zeros((4, 4, 3), np.uint8)
+        frame = store.publish(img, 12.5)
+        self.assertEqual((frame.seq, frame.timestamp), (1, 12.5))
+        self.assertIs(store.latest().image, img)
+        with self.assertRaises(ValueError):
+            frame.image[0, 0, 0] = 1
+        writable = frame.copy()
+        writable[0, 0, 0] = 1
+        self.assertEqual(store.publish(np.zeros(1)).seq, 2)
+
+    def test_wait_next_after_seq(self):
+        store = FrameStore()
+        store.publish(np.zeros(1))
+        self.assertIsNone(store.wait_next(1, timeout=0.01))
+
+        timer = threading.Timer(0.02, store.publish, args=(np.ones(1),))
+        timer.start()
+        frame = store.wait_next(1, timeout=1)
+        timer.join()
+        self.assertEqual(frame.seq, 2)
+        # already available: returns immediately with the newest frame
+        self.assertEqual(store.wait_next(0, timeout=0).seq, 2)
+
+    def test_close_wakes_waiters(self):
+        store = FrameStore()
+        timer = threading.Timer(0.02, store.close)
+        timer.start()
+        self.assertIsNone(store.wait_next(0, timeout=1))
+        timer.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
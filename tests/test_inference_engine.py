@@ -0,0 +1,156 @@
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from src.inference.engine import InferenceEngine, decode_yolo, letterbox
+
+
+def fake_head(boxes, nc=80, anchors=16):
+    """Build a raw YOLO head output (4 + nc, anchors) with the given boxes."""
+    out = np.zeros((4 + nc, anchors), dtype=np.float32)
+    for i, (cx, cy, w, h, cls, score) in enumerate(boxes):
+        out[:4, i] = (cx, cy, w, h)
+        out[4 + cls, i] = score
+    return out
+
+
+class TestDecode(unittest.TestCase):
+    def test_letterbox_keeps_ratio(self):
+        img, ratio, pad = letterbox(np.zeros((240, 320, 3), np.uint8), 640)
+        self.assertEqual(img.shape, (640, 640, 3))
+        self.assertEqual(ratio, 2.0)
+        self.assertEqual(pad, (0, 80))
+
+    def test_decode_filters_class_and_maps_back(self):
+        # person at (320, 320) in letterboxed space, plus a car and a weak person
+        out = fake_head([
+            (320, 320, 100, 200, 0, 0.9),
+            (100, 100, 50, 50, 2, 0.95),
+            (500, 500, 40, 40, 0, 0.1),
+        ])
+        det = decode_yolo(out, 2.0, (0, 80), (240, 320, 3), conf=0.4, classes=[0])
+        self.assertEqual(len(det.boxes), 1)
+        x1, y1, x2, y2 = map(float, det.boxes[0].xyxy[0])
+        self.assertAlmostEqual(x1, 135.0)
+        self.assertAlmostEqual(y1, 70.0)
+        self.assertAlmostEqual(x2, 185.0)
+        self.assertAlmostEqual(y2, 170.0)
+        self.assertAlmostEqual(det.boxes[0].conf[0].item(), 0.9, places=5)
+
+    def test_nms_suppresses_overlaps(self):
+        out = fake_head([
+            (320, 320, 100, 100, 0, 0.9),
+            (322, 321, 100, 100, 0, 0.8),
+        ])
+        det = decode_yolo(out, 1.0, (0, 0), (640, 640, 3), conf=0.4, iou=0.45, classes=[0])
+        self.assertEqual(len(det.boxes), 1)
+
+
+class TestInferenceEngine(unittest.TestCase):
+    def test_falls_back_to_torch_without_runtime(self):
+        with patch.dict(sys.modules, {'onnxruntime': None}), \
+             patch.object(InferenceEngine, '_load_torch') as load_torch:
+            engine = InferenceEngine(backend='onnx', warmup=0)
+            load_torch.side_effect = lambda: setattr(engine, '_predict', lambda frames: [])
+            engine.load()
+        self.assertEqual(engine.backend, 'torch')
+        load_torch.assert_called_once()
+
+    def test_falls_back_to_torch_when_export_fails(self):
+        engine = InferenceEngine(backend='onnx', warmup=0)
+        engine._load_onnx = MagicMock(side_effect=RuntimeError('export failed'))
+        with patch.object(InferenceEngine, '_load_torch') as load_torch:
+            load_torch.side_effect = lambda: setattr(engine, '_predict', lambda frames: [])
+            engine.load()
+        self.assertTrue(engine.loaded)
+        self.assertEqual(engine.backend, 'torch')
+
+    def test_failed_load_can_be_retried(self):
+        engine = InferenceEngine(backend='onnx', imgsz=32, warmup=1)
+        forward = MagicMock(side_effect=[RuntimeError('warm-up'),
+                                         np.stack([fake_head([])])])
+        engine._load_onnx = MagicMock(side_effect=lambda: setattr(engine, '_forward', forward))
+        with patch.object(InferenceEngine, '_load_torch', side_effect=ImportError('no torch')):
+            with self.assertRaises(RuntimeError):
+                engine.load()
+            self.assertFalse(engine.loaded)
+            self.assertEqual(engine.backend, 'onnx')
+            engine.load()
+        self.assertTrue(engine.loaded)
+
+    def test_loaded_only_after_warmup(self):
+        engine = InferenceEngine(backend='onnx', imgsz=32, warmup=2)
+        seen = []
+
+        def forward(blob):
+            seen.append(engine.loaded)
+            return np.stack([fake_head([])] * blob.shape[0])
+        engine._load_onnx = MagicMock(side_effect=lambda: setattr(engine, '_forward', forward))
+        engine.load()
+        self.assertEqual(seen, [False, False])
+        self.assertTrue(engine.loaded)
+
+    def test_concurrent_first_calls_load_once(self):
+        engine = InferenceEngine(backend='onnx', imgsz=32, warmup=0)
+        forward = MagicMock(side_effect=lambda blob: np.stack([fake_head([])] * blob.shape[0]))
+
+        def slow_load():
+            time.sleep(0.05)
+            engine._forward = forward
+        engine._load_onnx = MagicMock(side_effect=slow_load)
+
+        threads = [threading.Thread(target=engine.infer, args=(np.zeros((32, 32, 3), np.uint8),))
+                   for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine._load_onnx.assert_called_once()
+        self.assertEqual(forward.call_count, 3)
+
+    def test_raw_backend_batches_and_warms_up(self):
+        engine = InferenceEngine(backend='onnx', imgsz=64, warmup=2)
+        forward = MagicMock(side_effect=lambda blob: np.stack(
+            [fake_head([(32, 32, 10, 10, 0, 0.8)])] * blob.shape[0]))
+        engine._load_onnx = lambda: setattr(engine, '_forward', forward)
+
+        engine.load()
+        self.assertEqual(forward.call_count, 2)
+
+        frames = [np.zeros((64, 64, 3), np.uint8)] * 3
+        results = engine.infer_batch(frames)
+        self.assertEqual(forward.call_args[0][0].shape, (3, 3, 64, 64))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(results[0].boxes), 1)
+
+    def test_roi_boxes_are_reprojected_and_sizes_grouped(self):
+        engine = InferenceEngine(backend='onnx', imgsz=64, warmup=0)
+        # one person in the centre of whatever the model sees
+        forward = MagicMock(side_effect=lambda blob: np.stack(
+            [fake_head([(blob.shape[3] / 2, blob.shape[2] / 2, 8, 8, 0, 0.8)])] * blob.shape[0]))
+        engine._load_onnx = lambda: setattr(engine, '_forward', forward)
+
+        frame = np.zeros((200, 400, 3), np.uint8)
+        items = [
+            engine.preprocess(frame, roi=(100, 50, 200, 150)),
+            engine.preprocess(frame, roi=(0, 0, 400, 200), size=32),
+        ]
+        results = engine.infer_prepared(items)
+
+        self.assertEqual(forward.call_count, 2)  # 64 and 32 inputs run separately
+        x1, y1, x2, y2 = map(float, results[0].boxes[0].xyxy[0])
+        self.assertAlmostEqual((x1 + x2) / 2, 150.0, places=3)
+        self.assertAlmostEqual((y1 + y2) / 2, 100.0, places=3)
+        self.assertEqual(results[0].orig_shape, frame.shape)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            InferenceEngine(backend='tensorrt')
+
+
+if __name__ == '__main__':
+    unittest.main()
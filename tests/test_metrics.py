@@ -0,0 +1,48 @@
+import unittest
+
+from src.metrics.registry import Registry
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counter_with_labels(self):
+        reg = Registry()
+        c = reg.counter('frames_total', 'Frames', ('camera',))
+        c.labels('a').inc()
+        c.labels(camera='a').inc(2)
+        c.labels('b').inc()
+        self.assertIs(reg.counter('frames_total', 'Frames', ('camera',)), c)
+        text = reg.render()
+        self.assertIn('# TYPE frames_total counter', text)
+        self.assertIn('frames_total{camera="a"} 3', text)
+        self.assertIn('frames_total{camera="b"} 1', text)
+
+    def test_histogram_buckets_and_quantiles(self):
+        reg = Registry()
+        h = reg.histogram('op_seconds', 'Op', buckets=(0.01, 0.1, 1.0))
+        for _ in range(90):
+            h.observe(0.005)
+        for _ in range(10):
+            h.observe(0.5)
+        child = h._default
+        self.assertLessEqual(child.quantile(0.5), 0.01)
+        self.assertGreater(child.quantile(0.99), 0.1)
+
+        text = reg.render()
+        self.assertIn('op_seconds_bucket{le="0.01"} 90', text)
+        self.assertIn('op_seconds_bucket{le="1"} 100', text)
+        self.assertIn('op_seconds_bucket{le="+Inf"} 100', text)
+        self.assertIn('op_seconds_count 100', text)
+        self.assertIn('op_seconds_quantile{quantile="0.95"}', text)
+
+    def test_timer_and_callback_gauge(self):
+        reg = Registry()
+        h = reg.histogram('t_seconds', 'T', ('kind',))
+        with h.time('x'):
+            pass
+        self.assertEqual(h.labels('x').count, 1)
+        reg.gauge_callback('depth', 'Depth', ('queue',), lambda: {'infer': 3})
+        self.assertIn('depth{queue="infer"} 3', reg.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
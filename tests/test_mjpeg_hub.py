@@ -0,0 +1,80 @@
+import sys
+import asyncio
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Provide fake external modules only if not installed
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules['cv2'] = MagicMock()
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.frames import Frame
+from src.streaming.mjpeg_hub import MjpegHub
+
+
+class FakeCamera:
+    def __init__(self):
+        self.seq = 0
+        self.frame = MagicMock()
+
+    def next_frame(self, after_seq, timeout=1.0):
+        deadline = time.time() + timeout
+        while self.seq <= after_seq and time.time() < deadline:
+            time.sleep(0.001)
+        return Frame(self.frame, self.seq, 0.0) if self.seq > after_seq else None
+
+    def get_last_latency(self):
+        return 0.01
+
+
+class TestMjpegHub(unittest.TestCase):
+    @patch('src.streaming.mjpeg_hub.cv2')
+    def test_encodes_once_per_frame_for_all_subscribers(self, mock_cv2):
+        jpg = MagicMock()
+        jpg.tobytes.return_value = b'JPG'
+        mock_cv2.imencode.return_value = (True, jpg)
+
+        cam = FakeCamera()
+        hub = MjpegHub(cam, wait_timeout=0.05)
+        gens = [hub.frames() for _ in range(3)]
+        hub.start()
+        try:
+            cam.seq = 1
+            chunks = [next(g) for g in gens]
+            self.assertEqual(hub.subscribers, 3)
+            for c in chunks:
+                self.assertIn(b'JPG', c)
+            self.assertEqual(mock_cv2.imencode.call_count, 1)
+        finally:
+            hub.stop()
+            for g in gens:
+                g.close()
+        self.assertEqual(hub.subscribers, 0)
+
+    def test_wait_next_skips_stale_frames(self):
+        hub = MjpegHub(FakeCamera())
+        hub._publish(b'a')
+        hub._publish(b'b')
+        hub._publish(b'c')
+        seq, chunk = hub.wait_next(0, timeout=0)
+        self.assertEqual((seq, chunk), (3, b'c'))
+        self.assertEqual(hub.wait_next(3, timeout=0), (3, None))
+
+    def test_async_subscribers_wake_on_publish(self):
+        hub = MjpegHub(FakeCamera())
+
+        async def scenario():
+            waiter = asyncio.ensure_future(hub.await_next(0, timeout=2))
+            await asyncio.sleep(0.01)
+            hub._publish(b'x')
+            return await waiter
+
+        self.assertEqual(asyncio.run(scenario()), (1, b'x'))
+        self.assertEqual(hub._async_waiters, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+
+from src.processing.motion import MotionGate
+
+
+class TestMotionGate(unittest.TestCase):
+    def setUp(self):
+        self.still = np.full((480, 640, 3), 80, dtype=np.uint8)
+
+    def test_static_scene_is_skipped_until_max_interval(self):
+        gate = MotionGate(max_interval=10)
+        self.assertTrue(gate.should_infer(self.still, now=0))
+        self.assertFalse(gate.should_infer(self.still.copy(), now=1))
+        self.assertFalse(gate.should_infer(self.still.copy(), now=9))
+        self.assertTrue(gate.should_infer(self.still.copy(), now=10))
+        self.assertEqual(gate.stats(), {'inferred': 2, 'skipped': 2, 'skip_ratio': 0.5})
+
+    def test_motion_triggers_inference(self):
+        gate = MotionGate(max_interval=60)
+        gate.should_infer(self.still, now=0)
+        moved = self.still.copy()
+        moved[100:250, 200:350] = 220
+        self.assertTrue(gate.should_infer(moved, now=1))
+        # reference follows the last inferred frame
+        self.assertFalse(gate.should_infer(moved.copy(), now=2))
+
+    def test_sensor_noise_is_ignored(self):
+        gate = MotionGate(max_interval=60)
+        gate.should_infer(self.still, now=0)
+        rng = np.random.default_rng(0)
+        noisy = np.clip(self.still + rng.integers(-5, 6, self.still.shape), 0, 255).astype(np.uint8)
+        self.assertFalse(gate.should_infer(noisy, now=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.notifications import NotificationDispatcher, StubTransport
+from src.notifications.transport import FAILED, INVALID, RETRY, FcmTransport
+
+
+def make(transport, tokens, **kwargs):
+    registry = MagicMock()
+    registry.get_all.return_value = list(tokens)
+    return NotificationDispatcher(transport, registry, **kwargs)
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def test_submit_does_not_send_on_caller_thread(self):
+        transport = StubTransport()
+        dispatcher = make(transport, ['a'])
+        dispatcher.submit('absence', 'T', 'M')
+        self.assertEqual(transport.sent, [])
+        self.assertTrue(dispatcher.run_once())
+        self.assertEqual(transport.sent[0]['tokens'], ['a'])
+
+    def test_batches_of_max_size(self):
+        transport = StubTransport()
+        transport.max_batch = 2
+        dispatcher = make(transport, ['a', 'b', 'c', 'd', 'e'])
+        dispatcher.submit('absence', 'T', 'M')
+        dispatcher.run_once()
+        self.assertEqual([len(b['tokens']) for b in transport.sent], [2, 2, 1])
+        self.assertEqual(dispatcher.stats['sent'], 5)
+
+    def test_cooldown_is_per_token_and_event_type(self):
+        transport = StubTransport()
+        dispatcher = make(transport, ['a', 'b'], cooldown=60)
+        dispatcher.submit('absence', 'T', 'M')
+        dispatcher.submit('absence', 'T', 'M')
+        dispatcher.submit('camera_offline', 'T', 'M')
+        dispatcher.submit('absence', 'T', 'M', tokens=['c'])
+        while dispatcher.run_once():
+            pass
+        sent = [b['tokens'] for b in transport.sent]
+        self.assertEqual(sent, [['a', 'b'], ['a', 'b'], ['c']])
+        self.assertEqual(dispatcher.stats['suppressed'], 2)
+
+    @patch('src.notifications.dispatcher.random.uniform', return_value=1.0)
+    def test_retry_with_backoff_then_give_up(self, _):
+        transport = StubTransport({'b': [RETRY, RETRY, RETRY]})
+        dispatcher = make(transport, ['a', 'b'], max_retries=2, backoff=0.01)
+        dispatcher.submit('absence', 'T', 'M')
+        dispatcher.run_once()
+        self.assertTrue(dispatcher.run_once(timeout=1))
+        self.assertTrue(dispatcher.run_once(timeout=1))
+        self.assertFalse(dispatcher.run_once(timeout=0.05))
+        self.assertEqual([b['tokens'] for b in transport.sent], [['a', 'b'], ['b'], ['b']])
+        self.assertEqual(dispatcher.stats['retried'], 2)
+        self.assertEqual(dispatcher.stats['failed'], 1)
+
+    def test_transport_error_is_retried(self):
+        transport = MagicMock()
+        transport.max_batch = 500
+        transport.send.side_effect = [ConnectionError('down'), [None]]
+        dispatcher = make(transport, ['a'], backoff=0.01)
+        dispatcher.submit('absence', 'T', 'M')
+        dispatcher.run_once()
+        self.assertTrue(dispatcher.run_once(timeout=1))
+        self.assertEqual(dispatcher.stats['sent'], 1)
+
+    def test_invalid_tokens_reported(self):
+        on_invalid = MagicMock()
+        dispatcher = make(StubTransport({'dead': INVALID}), ['ok', 'dead'], on_invalid=on_invalid)
+        dispatcher.submit('absence', 'T', 'M')
+        dispatcher.run_once()
+        on_invalid.assert_called_once_with(['dead'])
+
+    def test_background_thread(self):
+        transport = StubTransport()
+        dispatcher = make(transport, ['a'])
+        dispatcher.start()
+        try:
+            dispatcher.submit('absence', 'T', 'M')
+            for _ in range(100):
+                if transport.sent:
+                    break
+                time.sleep(0.01)
+        finally:
+            dispatcher.stop()
+        self.assertEqual(len(transport.sent), 1)
+
+
+
+class TestFcmTransportClassify(unittest.TestCase):
+    def setUp(self):
+        class Unregistered(Exception):
+            pass
+
+        class Quota(Exception):
+            pass
+
+        self.messaging = MagicMock(UnregisteredError=Unregistered, SenderIdMismatchError=Unregistered,
+                                   QuotaExceededError=Quota)
+        self.transport = FcmTransport()
+        self.transport._module = self.messaging
+
+    def error(self, code):
+        exc = Exception(code)
+        exc.code = code
+        return exc
+
+    def test_only_token_errors_are_invalid(self):
+        classify = self.transport._classify
+        self.assertEqual(classify(self.messaging.UnregisteredError()), INVALID)
+        self.assertEqual(classify(self.error('NOT_FOUND')), INVALID)
+        self.assertEqual(classify(self.error('PERMISSION_DENIED')), FAILED)
+        self.assertEqual(classify(self.error('INVALID_ARGUMENT')), FAILED)
+        self.assertEqual(classify(self.error('UNAVAILABLE')), RETRY)
+
+
+if __name__ == '__main__':
+    unittest.main()
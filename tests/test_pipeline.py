@@ -0,0 +1,240 @@
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.frames import FrameStore
+from src.processing.motion import MotionGate
+from src.processing.pipeline import DetectionPipeline, DropOldestQueue, LatestSlots, Job
+from src.processing.tracker import Tracker
+
+
+class FakeCamera:
+    def __init__(self):
+        self.store = FrameStore()
+        self.control_ptz = MagicMock()
+
+    def next_frame(self, after_seq, timeout=1.0):
+        return self.store.wait_next(after_seq, timeout=0)
+
+    def get_latest(self):
+        return self.store.latest()
+
+
+class FakeEngine:
+    def __init__(self, boxes=()):
+        self.boxes = list(boxes)
+        self.calls = []
+
+    def preprocess(self, frame):
+        return ('prep', frame)
+
+    def infer_prepared(self, items):
+        self.calls.append(len(items))
+        return [MagicMock(boxes=self.boxes) for _ in items]
+
+
+def box(x1, y1, x2, y2, conf=0.9):
+    return MagicMock(xyxy=[(x1, y1, x2, y2)], conf=[conf])
+
+
+def slot(cam_id, cam):
+    return MagicMock(id=cam_id, camera=cam)
+
+
+class TestDropOldestQueue(unittest.TestCase):
+    def test_put_drops_oldest_when_full(self):
+        q = DropOldestQueue(2)
+        for i in range(4):
+            q.put(i)
+        self.assertEqual(q.dropped, 2)
+        self.assertEqual(q.get_batch(5, timeout=0), [2, 3])
+        self.assertEqual(q.get_batch(1, timeout=0), [])
+
+
+class TestLatestSlots(unittest.TestCase):
+    def test_fast_camera_does_not_evict_slow_camera(self):
+        q = LatestSlots()
+        q.put(Job('b', seq=1))
+        for i in range(5):
+            q.put(Job('a', seq=i))
+        self.assertEqual(q.dropped, 4)
+        batch = q.get_batch(4, timeout=0)
+        self.assertEqual([(j.cam_id, j.seq) for j in batch], [('b', 1), ('a', 4)])
+        self.assertEqual(len(q), 0)
+
+
+class TestDetectionPipeline(unittest.TestCase):
+    def run_stages(self, pipe):
+        for stage in pipe.stages:
+            stage.run_once()
+
+    def test_frames_from_all_cameras_share_one_batch(self):
+        cams = {'a': FakeCamera(), 'b': FakeCamera()}
+        monitors = {k: MagicMock() for k in cams}
+        engine = FakeEngine()
+        pipe = DetectionPipeline([slot(k, c) for k, c in cams.items()], engine, monitors, max_wait=0)
+        for cam in cams.values():
+            cam.store.publish(np.zeros((480, 640, 3), np.uint8))
+
+        for stage in pipe.stages[:2]:      # captures
+            stage.run_once()
+        pipe.stages[2].run_once()          # preprocess a
+        pipe.stages[2].run_once()          # preprocess b
+        pipe.stages[3].run_once()          # inference (both cameras)
+        pipe.stages[4].run_once()          # postprocess a
+        pipe.stages[4].run_once()          # postprocess b
+
+        self.assertEqual(engine.calls, [2])
+        for m in monitors.values():
+            m.handle_detections.assert_called_once()
+        self.assertEqual(pipe.snapshots.get('a').seq, 1)
+        stats = pipe.stats()
+        self.assertEqual(stats['stages']['inference']['processed'], 2)
+        self.assertIsNotNone(stats['end_to_end_ms']['mean'])
+
+    def test_ptz_follows_first_detection_outside_dead_zone(self):
+        cam = FakeCamera()
+        engine = FakeEngine([box(500, 200, 600, 280), box(0, 0, 10, 10)])
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': MagicMock()})
+        cam.store.publish(np.zeros((480, 640, 3), np.uint8))
+        self.run_stages(pipe)
+        cam.control_ptz.assert_called_once()
+        err_x, err_y = cam.control_ptz.call_args[0]
+        self.assertAlmostEqual(err_x, (550 - 320) / 640)
+        self.assertAlmostEqual(err_y, 0.0)
+
+    def test_gate_skips_inference_and_reuses_results(self):
+        cam = FakeCamera()
+        engine = FakeEngine()
+        monitor = MagicMock()
+        gate = MagicMock()
+        gate.check.side_effect = [True, False]
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': monitor}, gates={'a': gate})
+
+        cam.store.publish(np.zeros((48, 64, 3), np.uint8))
+        self.run_stages(pipe)
+        cam.store.publish(np.zeros((48, 64, 3), np.uint8))
+        self.run_stages(pipe)
+
+        self.assertEqual(engine.calls, [1])
+        self.assertEqual(monitor.handle_detections.call_count, 2)
+
+    def test_gate_change_between_keyframes_reaches_next_inference(self):
+        cam = FakeCamera()
+        engine = FakeEngine([box(500, 200, 600, 280)])
+        gate = MotionGate(max_interval=60)
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': MagicMock()}, gates={'a': gate},
+                                 trackers={'a': Tracker(min_hits=1)}, detect_every=3)
+        still = np.full((480, 640, 3), 80, np.uint8)
+        moved = still.copy()
+        moved[100:250, 200:350] = 220
+        for frame in (still, still, moved, moved, moved):
+            cam.store.publish(frame.copy())
+            self.run_stages(pipe)
+
+        # the change is seen on frames 3 and 4 (tracked) but only becomes the
+        # gate's reference when frame 5 is actually inferred
+        self.assertEqual(engine.calls, [1, 1])
+        self.assertEqual(gate.stats()['inferred'], 2)
+
+    def test_tracker_runs_detection_every_nth_frame(self):
+        cam = FakeCamera()
+        engine = FakeEngine([box(500, 200, 600, 280)])
+        monitor = MagicMock()
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': monitor},
+                                 trackers={'a': Tracker(min_hits=1)}, detect_every=3)
+        for _ in range(6):
+            cam.store.publish(np.zeros((480, 640, 3), np.uint8))
+            self.run_stages(pipe)
+
+        self.assertEqual(engine.calls, [1, 1])
+        self.assertEqual(monitor.handle_detections.call_count, 6)
+        # Frames inferidos e previstos saem com o mesmo ID de track
+        for call in monitor.handle_detections.call_args_list:
+            self.assertEqual(int(call[0][0][0].boxes[0].id[0]), 1)
+        self.assertEqual(cam.control_ptz.call_count, 6)
+
+    def test_frames_without_inference_wait_behind_inferred_frame(self):
+        cam = FakeCamera()
+        engine = FakeEngine([box(500, 200, 600, 280)])
+        broadcaster = MagicMock()
+        broadcaster.wants.return_value = True
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': MagicMock()}, broadcaster=broadcaster,
+                                 trackers={'a': Tracker(min_hits=1)}, detect_every=3)
+        capture, preprocess, inference, postprocess = pipe.stages[:4]
+        for _ in range(3):
+            # slow model: the tracked frames 2 and 3 are ready before frame 1
+            cam.store.publish(np.zeros((480, 640, 3), np.uint8))
+            capture.run_once()
+            preprocess.run_once()
+            postprocess.run_once()
+        inference.run_once()
+        while postprocess.run_once():
+            pass
+
+        seqs = [call[0][1]['seq'] for call in broadcaster.publish.call_args_list]
+        self.assertEqual(seqs, [1, 2, 3])
+
+    def test_late_frame_is_not_published_after_newer_one(self):
+        cam = FakeCamera()
+        monitor = MagicMock()
+        pipe = DetectionPipeline([slot('a', cam)], FakeEngine(), {'a': monitor})
+        pipe._postprocess([Job('a', np.zeros((48, 64, 3), np.uint8), 5, 10.0)])
+        pipe._postprocess([Job('a', np.zeros((48, 64, 3), np.uint8), 4, 9.0)])
+        self.assertEqual(monitor.handle_detections.call_count, 1)
+        self.assertEqual(pipe.snapshots.get('a').seq, 5)
+
+    def test_ptz_follows_tracked_target_not_first_box(self):
+        cam = FakeCamera()
+        engine = FakeEngine([box(500, 200, 600, 280, 0.9)])
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': MagicMock()},
+                                 trackers={'a': Tracker(min_hits=1)})
+        cam.store.publish(np.zeros((480, 640, 3), np.uint8))
+        self.run_stages(pipe)
+        engine.boxes = [box(0, 200, 40, 280, 0.95), box(500, 200, 600, 280, 0.9)]
+        cam.store.publish(np.zeros((480, 640, 3), np.uint8))
+        self.run_stages(pipe)
+
+        err_x, _ = cam.control_ptz.call_args[0]
+        self.assertGreater(err_x, 0.3)
+
+    def test_detections_published_only_with_subscribers(self):
+        cam = FakeCamera()
+        broadcaster = MagicMock()
+        broadcaster.wants.side_effect = [False, True]
+        pipe = DetectionPipeline([slot('a', cam)], FakeEngine([box(10, 20, 30, 40)]),
+                                 {'a': MagicMock(last_person_ts=5.0)}, broadcaster=broadcaster)
+        for _ in range(2):
+            cam.store.publish(np.zeros((48, 64, 3), np.uint8))
+            self.run_stages(pipe)
+
+        broadcaster.publish.assert_called_once()
+        cam_id, msg = broadcaster.publish.call_args[0]
+        self.assertEqual((cam_id, msg['seq'], msg['persons'], msg['last_seen']), ('a', 2, 1, 5.0))
+        self.assertEqual(msg['boxes'][0][:4], [10, 20, 30, 40])
+
+    def test_frames_dropped_while_model_loads(self):
+        cam = FakeCamera()
+        engine = FakeEngine()
+        engine.loaded = False
+        monitor = MagicMock()
+        pipe = DetectionPipeline([slot('a', cam)], engine, {'a': monitor})
+        cam.store.publish(np.zeros((48, 64, 3), np.uint8))
+        self.run_stages(pipe)
+        self.assertEqual(engine.calls, [])
+        monitor.handle_detections.assert_not_called()
+
+    def test_camera_without_frames_reports_disconnection(self):
+        monitor = MagicMock()
+        pipe = DetectionPipeline([slot('a', FakeCamera())], FakeEngine(), {'a': monitor})
+        self.run_stages(pipe)
+        monitor.check_camera.assert_called_once_with(None)
+        monitor.handle_detections.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,22 +4,47 @@ from unittest.mock import MagicMock, patch
 from src.monitor.presence_monitor import PresenceMonitor
 
 
+class FakeResult:
+    def __init__(self, *boxes):
+        self.boxes = list(boxes)
+
+
 class TestPresenceMonitor(unittest.TestCase):
-    @patch('src.monitor.presence_monitor.time')
-    def test_absence_and_camera_notifications(self, mock_time):
+    def test_camera_offline_notification(self):
         notifier = MagicMock()
         registry = MagicMock()
         registry.get_all.return_value = ['tok']
-        mock_time.time.side_effect = [0, 31, 31, 32]
 
-        monitor = PresenceMonitor(notifier, registry, absence_timeout=30)
-        monitor.handle_detections([])
+        monitor = PresenceMonitor(notifier, registry)
         monitor.check_camera('frame')
-        monitor.handle_detections([])
+        notifier.notify.assert_not_called()
+        monitor.check_camera(None)
+        monitor.check_camera(None)
         notifier.notify.assert_called_once()
 
-        monitor.check_camera(None)
-        self.assertEqual(notifier.notify.call_count, 2)
+    def test_offline_push_is_per_camera(self):
+        dispatcher = MagicMock()
+        for cam in ('sala', 'quarto'):
+            PresenceMonitor(MagicMock(), MagicMock(), camera=cam, dispatcher=dispatcher).check_camera(None)
+        keys = [c[0][0] for c in dispatcher.submit.call_args_list]
+        self.assertEqual(keys, ['camera_offline:sala', 'camera_offline:quarto'])
+        args, kwargs = dispatcher.submit.call_args
+        self.assertEqual(args[1], 'Camera desconectada (quarto)')
+        self.assertEqual(kwargs['camera'], 'quarto')
+
+    @patch('src.monitor.presence_monitor.time')
+    def test_absence_is_left_to_event_rules(self, mock_time):
+        dispatcher = MagicMock()
+        mock_time.time.return_value = 100
+
+        monitor = PresenceMonitor(MagicMock(), MagicMock(), dispatcher=dispatcher)
+        self.assertIsNone(monitor.last_person_ts)
+        monitor.handle_detections([FakeResult(object())])
+        self.assertEqual(monitor.last_person_ts, 100)
+        mock_time.time.return_value = 1000
+        monitor.handle_detections([FakeResult()])
+        self.assertEqual(monitor.last_person_ts, 100)
+        dispatcher.submit.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,70 @@
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Provide fake external modules only if not installed
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules['cv2'] = MagicMock()
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.ptz import PTZController
+
+
+def wait_until(cond, timeout=1.0):
+    deadline = time.time() + timeout
+    while not cond() and time.time() < deadline:
+        time.sleep(0.005)
+    return cond()
+
+
+class TestPTZController(unittest.TestCase):
+    def setUp(self):
+        self.onvif = MagicMock()
+        self.onvif.create_media_service.return_value.GetProfiles.return_value = [MagicMock(token='tk')]
+        self.ptz = self.onvif.create_ptz_service.return_value
+
+    def test_submit_does_not_block_and_coalesces(self):
+        ctrl = PTZController(lambda: self.onvif, min_interval=0.1, move_duration=0.05)
+        ctrl.start()
+        try:
+            t0 = time.time()
+            for i in range(5):
+                ctrl.submit(0.1 * i, 0.0)
+            self.assertLess(time.time() - t0, 0.05)
+            self.assertTrue(wait_until(lambda: self.ptz.Stop.called))
+        finally:
+            ctrl.stop()
+
+        # first submit may be sent immediately; the rest collapse into the latest
+        self.assertLessEqual(self.ptz.ContinuousMove.call_count, 2)
+        last = self.ptz.ContinuousMove.call_args[0][0]
+        self.assertAlmostEqual(last['Velocity']['PanTilt']['x'], -0.4)
+        self.assertEqual(last['ProfileToken'], 'tk')
+
+    def test_services_are_cached(self):
+        ctrl = PTZController(lambda: self.onvif, min_interval=0.0, move_duration=0.01)
+        ctrl.start()
+        try:
+            for n in range(1, 4):
+                ctrl.submit(0.5, 0.5)
+                self.assertTrue(wait_until(lambda: ctrl.sent >= n))
+            self.assertTrue(wait_until(lambda: self.ptz.Stop.called))
+        finally:
+            ctrl.stop()
+        self.onvif.create_ptz_service.assert_called_once()
+        self.onvif.create_media_service.return_value.GetProfiles.assert_called_once()
+
+    def test_no_camera_is_reported_not_raised(self):
+        ctrl = PTZController(lambda: None, min_interval=0.0)
+        ctrl.start()
+        ctrl.submit(1.0, 1.0)
+        time.sleep(0.05)
+        ctrl.stop()
+        self.assertEqual(ctrl.sent, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
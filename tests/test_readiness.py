@@ -0,0 +1,95 @@
+import importlib
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+for _mod in ('cv2', 'onvif', 'ultralytics'):
+    try:
+        importlib.import_module(_mod)
+    except ImportError:
+        sys.modules[_mod] = MagicMock()
+try:
+    import firebase_admin  # noqa: F401
+except ImportError:
+    sys.modules['firebase_admin'] = MagicMock()
+
+from src.readiness import Readiness, FAILED, READY
+
+
+class TestReadiness(unittest.TestCase):
+    def test_required_subsystems_decide_readiness(self):
+        r = Readiness()
+        r.register('model')
+        r.register('firebase', required=False)
+        self.assertFalse(r.ready())
+
+        r.run('firebase', MagicMock(side_effect=RuntimeError('sem credencial')), required=False)
+        r.run('model', lambda: time.sleep(0.01))
+        report = r.report()
+        self.assertTrue(report['ready'])
+        self.assertEqual(report['subsystems']['firebase']['state'], FAILED)
+        self.assertEqual(report['subsystems']['firebase']['error'], 'sem credencial')
+        self.assertGreaterEqual(report['subsystems']['model']['seconds'], 0.01)
+
+    def test_retry_with_backoff_until_success(self):
+        r = Readiness()
+        fn = MagicMock(side_effect=[RuntimeError('recusado'), RuntimeError('recusado'), None])
+        r.run('database', fn, background=True, retry=True, backoff=0.01).join(timeout=1)
+        self.assertEqual(fn.call_count, 3)
+        self.assertTrue(r.ready())
+
+    def test_stop_interrupts_retries(self):
+        r = Readiness()
+        thread = r.run('database', MagicMock(side_effect=RuntimeError('x')), background=True,
+                       retry=True, backoff=10)
+        r.stop()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(r.report()['subsystems']['database']['state'], FAILED)
+
+    def test_background_run(self):
+        r = Readiness()
+        thread = r.run('model', lambda: time.sleep(0.05), background=True)
+        self.assertFalse(r.ready())
+        thread.join()
+        self.assertTrue(r.ready())
+        self.assertIn('model', r.seconds())
+
+
+@unittest.skipIf(importlib.util.find_spec('httpx') is None, 'httpx not installed')
+class TestHealthEndpoints(unittest.TestCase):
+    def setUp(self):
+        from fastapi.testclient import TestClient
+        import src.main as main
+        self.main = main
+        self.client = TestClient(main.app)
+        self._saved = main.readiness, main.database
+        main.readiness = Readiness()
+
+    def tearDown(self):
+        self.main.readiness, self.main.database = self._saved
+
+    def test_import_does_not_load_model(self):
+        self.assertFalse(self.main.engine.loaded)
+        self.assertGreater(self.main.IMPORT_SECONDS, 0)
+
+    def test_health_and_ready(self):
+        self.assertEqual(self.client.get('/api/health').json()['status'], 'ok')
+        self.main.readiness.register('model')
+        self.main.database = None
+        resp = self.client.get('/api/ready')
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp.json()['subsystems']['database']['state'], 'pending')
+        self.assertEqual(self.client.get('/api/events').status_code, 503)
+
+        self.main.readiness.run('database', lambda: None)
+        self.main.database = MagicMock()
+        self.main.readiness.set('model', READY, seconds=1.5)
+        resp = self.client.get('/api/ready')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(self.main.cameras.default.id, resp.json()['cameras'])
+
+
+if __name__ == '__main__':
+    unittest.main()
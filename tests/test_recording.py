@@ -0,0 +1,133 @@
+import importlib
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+try:
+    import cv2  # noqa: F401
+except ImportError:
+    sys.modules['cv2'] = MagicMock()
+
+if importlib.util.find_spec('sqlalchemy') is None:
+    raise unittest.SkipTest('sqlalchemy not installed')
+
+from src.db import Database
+from src.recording import Clip, ClipRecorder, ClipWriter, FrameRing
+
+
+class TestFrameRing(unittest.TestCase):
+    def test_budget_and_age_evict_oldest(self):
+        ring = FrameRing(max_bytes=10, max_age=5)
+        for ts in range(4):
+            ring.append(ts, b'abcd')
+        self.assertEqual(len(ring), 2)
+        self.assertEqual(ring.nbytes, 8)
+        ring = FrameRing(max_bytes=1000, max_age=5)
+        for ts in range(10):
+            ring.append(ts, b'x')
+        self.assertEqual([ts for ts, _ in ring.between(0, 100)], [4, 5, 6, 7, 8, 9])
+
+
+class TestClipRecorder(unittest.TestCase):
+    def setUp(self):
+        self.writer = MagicMock()
+        self.rec = ClipRecorder(MagicMock(), self.writer, camera_id='sala', pre_seconds=2,
+                                post_seconds=2, max_clip=5)
+        self.rec._encode = lambda image: b'jpg%d' % image
+
+    def feed(self, *timestamps):
+        for ts in timestamps:
+            self.rec.add_frame(ts, ts)
+
+    def test_clip_spans_before_and_after_event(self):
+        self.feed(0, 1, 2, 3, 4)
+        self.rec.trigger('absence', at=4)
+        self.feed(5, 6)
+        self.writer.submit.assert_not_called()
+        self.feed(7)
+        clip = self.writer.submit.call_args[0][0]
+        self.assertEqual([ts for ts, _ in clip.frames], [2, 3, 4, 5, 6])
+        self.assertEqual(clip.events, [{'type': 'absence', 'at': 4}])
+        self.assertFalse(self.rec.recording)
+
+    def test_events_during_clip_extend_it_up_to_max(self):
+        self.feed(0)
+        self.rec.trigger('absence', at=0)
+        self.rec.trigger('edge_zone', at=1)
+        self.rec.trigger('edge_zone', at=2.5)
+        self.feed(1, 2, 3)
+        self.writer.submit.assert_not_called()
+        self.feed(4)
+        clip = self.writer.submit.call_args[0][0]
+        self.assertEqual(clip.end, 3)
+        self.assertEqual(len(clip.events), 3)
+
+    def test_event_after_clip_end_starts_new_clip(self):
+        self.feed(0)
+        self.rec.trigger('absence', at=0)
+        self.rec.trigger('presence', at=10)
+        first = self.writer.submit.call_args[0][0]
+        self.assertEqual([e['type'] for e in first.events], ['absence'])
+        self.assertTrue(self.rec.recording)
+
+    def test_encodes_downscaled_jpeg(self):
+        rec = ClipRecorder(MagicMock(), MagicMock(), camera_id='sala', width=32)
+        data = rec._encode(np.zeros((48, 64, 3), np.uint8))
+        self.assertTrue(data.startswith(b'\xff\xd8'))
+
+
+class TestClipWriter(unittest.TestCase):
+    def test_writes_file_and_indexes_each_event(self):
+        db = Database('sqlite:///:memory:')
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = ClipWriter(tmp, db)
+            writer.submit(Clip('sala', 0, 10, [{'type': 'absence', 'at': 3},
+                                               {'type': 'edge_zone', 'at': 4}],
+                               [(1, b'ab'), (2, b'cd')]))
+            self.assertEqual(writer.drain(), 1)
+
+            clips = db.query_clips(camera='sala')
+            self.assertEqual([c['event_type'] for c in clips], ['edge_zone', 'absence'])
+            self.assertEqual(clips[0]['frames'], 2)
+            path = db.clip_path(clips[0]['id'])
+            self.assertTrue(path.startswith(tmp))
+            with open(path, 'rb') as fh:
+                self.assertEqual(fh.read(), b'abcd')
+            self.assertEqual(db.query_clips(type='absence', camera='quarto'), [])
+            self.assertEqual(writer.stats()['written'], 1)
+
+    def test_clips_with_same_name_do_not_overwrite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = ClipWriter(tmp)
+            first = writer.write(Clip('sala', 0, 1, [{'type': 'absence', 'at': 3}], [(1, b'ab')]))
+            second = writer.write(Clip('sala', 0, 1, [{'type': 'absence', 'at': 3}], [(1, b'cd')]))
+            self.assertNotEqual(first, second)
+            with open(first, 'rb') as fh:
+                self.assertEqual(fh.read(), b'ab')
+            with open(second, 'rb') as fh:
+                self.assertEqual(fh.read(), b'cd')
+
+    def test_clips_written_before_database_are_indexed_later(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = ClipWriter(tmp)
+            path = writer.write(Clip('sala', 0, 1, [{'type': 'absence', 'at': 3}], [(1, b'ab')]))
+            self.assertEqual(writer.stats()['unindexed'], 1)
+
+            writer.db = Database('sqlite:///:memory:')
+            self.assertEqual(writer.index_pending(), 1)
+            clips = writer.db.query_clips(camera='sala')
+            self.assertEqual(writer.db.clip_path(clips[0]['id']), path)
+            self.assertEqual(writer.stats()['unindexed'], 0)
+
+    def test_queue_drops_oldest(self):
+        writer = ClipWriter('unused', queue_size=1)
+        writer.submit(Clip('a', 0, 1, []))
+        writer.submit(Clip('b', 0, 1, []))
+        self.assertEqual((writer.pending(), writer.dropped), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
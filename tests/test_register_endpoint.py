@@ -4,9 +4,11 @@ from unittest.mock import patch, MagicMock
 import importlib
 
 # provide fake external modules
-sys.modules.setdefault('cv2', MagicMock())
-sys.modules.setdefault('onvif', MagicMock())
-sys.modules.setdefault('ultralytics', MagicMock())
+for _mod in ('cv2', 'onvif', 'ultralytics'):
+    try:
+        importlib.import_module(_mod)
+    except ImportError:
+        sys.modules[_mod] = MagicMock()
 
 if importlib.util.find_spec('httpx') is None:
     raise unittest.SkipTest('httpx not installed')
@@ -21,13 +23,19 @@ class TestRegisterEndpoint(unittest.TestCase):
         with patch.object(main, 'token_registry') as mock_reg, \
              patch.object(main.camera, 'start'), \
              patch.object(main.camera, 'stop'), \
-             patch('src.main.Thread') as mock_thread:
-            mock_thread.return_value.start.return_value = None
-            mock_thread.return_value.join.return_value = None
+             patch.object(main.pipeline, 'start'), \
+             patch.object(main.pipeline, 'stop'):
             client = TestClient(main.app)
             resp = client.post('/api/register-token', json={'token': 'abc'})
             self.assertEqual(resp.status_code, 200)
-            mock_reg.add.assert_called_once_with('abc')
+            mock_reg.add.assert_called_once_with('abc', cameras=None)
+
+    def test_register_token_with_unknown_camera(self):
+        with patch.object(main, 'token_registry') as mock_reg:
+            client = TestClient(main.app)
+            resp = client.post('/api/register-token', json={'token': 'abc', 'cameras': ['nope']})
+            self.assertEqual(resp.status_code, 400)
+            mock_reg.add.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.processing.roi import RoiSelector
+
+
+def result(*boxes):
+    return MagicMock(boxes=[MagicMock(xyxy=[xyxy], conf=[conf]) for xyxy, conf in boxes])
+
+
+class TestRoiSelector(unittest.TestCase):
+    def test_fixed_roi_in_pixels(self):
+        roi = RoiSelector([0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(roi.select((480, 640, 3)), (160, 240, 480, 480))
+        self.assertIsNone(RoiSelector().select((480, 640, 3)))
+
+    def test_invalid_roi(self):
+        with self.assertRaises(ValueError):
+            RoiSelector([0.5, 0.5, 0.2, 0.9])
+        with self.assertRaises(ValueError):
+            RoiSelector(mode='zoom')
+
+    def test_track_mode_crops_around_best_box(self):
+        roi = RoiSelector(mode='track', margin=1.0, min_size=0.1, full_every=3)
+        shape = (480, 640, 3)
+        self.assertIsNone(roi.select(shape))
+        roi.update([result(((100, 100, 140, 180), 0.5), ((300, 200, 340, 280), 0.9))])
+
+        self.assertEqual(roi.select(shape), (280, 160, 360, 320))
+        roi.select(shape)
+        roi.select(shape)
+        self.assertIsNone(roi.select(shape))  # periodic full frame
+
+    def test_track_mode_forgets_lost_target(self):
+        roi = RoiSelector(mode='track', lost_after=2)
+        roi.update([result(((300, 200, 340, 280), 0.9))])
+        roi.update([result()])
+        self.assertIsNotNone(roi.select((480, 640, 3)))
+        roi.update([result()])
+        self.assertIsNone(roi.select((480, 640, 3)))
+
+    def test_from_config(self):
+        roi = RoiSelector.from_config({'roi': [0, 0, 0.5, 0.5], 'mode': 'track', 'imgsz': 320})
+        self.assertEqual((roi.roi, roi.mode, roi.imgsz), ((0, 0, 0.5, 0.5), 'track', 320))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import importlib
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+for _mod in ('cv2', 'onvif', 'ultralytics'):
+    try:
+        importlib.import_module(_mod)
+    except ImportError:
+        sys.modules[_mod] = MagicMock()
+try:
+    import firebase_admin  # noqa: F401
+except ImportError:
+    sys.modules['firebase_admin'] = MagicMock()
+
+if importlib.util.find_spec('httpx') is None:
+    raise unittest.SkipTest('httpx not installed')
+
+from fastapi.testclient import TestClient
+
+import src.main as main
+from src.processing.snapshot import BOOT_ID, SnapshotStore
+
+
+def detection(x1, y1, x2, y2, conf=0.9):
+    return MagicMock(boxes=[MagicMock(xyxy=[(x1, y1, x2, y2)], conf=[conf])])
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def test_jpeg_is_encoded_once_per_result(self):
+        store = SnapshotStore()
+        frame = np.zeros((48, 64, 3), np.uint8)
+        frame.setflags(write=False)
+        snap = store.publish('a', frame, [detection(5, 5, 20, 20)], time.time(), 7)
+        self.assertFalse(snap.encoded)
+        with patch('src.processing.snapshot.cv2.imencode',
+                   return_value=(True, np.frombuffer(b'jpg', np.uint8))) as encode:
+            self.assertEqual(snap.jpeg(), b'jpg')
+            self.assertEqual(snap.jpeg(), b'jpg')
+        encode.assert_called_once()
+        # overlay drawn on a copy: the shared frame stays untouched
+        self.assertEqual(frame.sum(), 0)
+        self.assertIs(store.get('a'), snap)
+        self.assertEqual(snap.etag, f'"{BOOT_ID}-a-7"')
+
+
+class TestSnapshotEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(main.app)
+        self.cam_id = main.cameras.default.id
+        self._saved = main.pipeline.snapshots
+        main.pipeline.snapshots = SnapshotStore()
+
+    def tearDown(self):
+        main.pipeline.snapshots = self._saved
+
+    def publish(self, seq, age=0.0):
+        frame = np.zeros((48, 64, 3), np.uint8)
+        return main.pipeline.snapshots.publish(self.cam_id, frame, [], time.time() - age, seq)
+
+    def test_no_result_yet(self):
+        self.assertEqual(self.client.get('/api/snapshot').status_code, 503)
+
+    def test_etag_and_not_modified(self):
+        self.publish(1)
+        resp = self.client.get('/api/snapshot')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers['content-type'], 'image/jpeg')
+        etag = resp.headers['etag']
+
+        resp = self.client.get('/api/snapshot', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+        self.publish(2)
+        resp = self.client.get(f'/api/cameras/{self.cam_id}/snapshot', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers['etag'], etag)
+
+    def test_max_age(self):
+        self.publish(1, age=10)
+        self.assertEqual(self.client.get('/api/snapshot?max_age=5').status_code, 503)
+        self.assertEqual(self.client.get('/api/snapshot?max_age=30').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
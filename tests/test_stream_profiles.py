@@ -0,0 +1,119 @@
+import sys
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Provide fake external modules only if not installed
+try:
+    import cv2
+except ImportError:
+    cv2 = sys.modules['cv2'] = MagicMock()
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.frames import Frame
+from src.streaming import MjpegHub, StreamHubs, StreamProfile
+
+
+class FakeHub:
+    def __init__(self, camera, **profile):
+        self.profile = profile
+        self.subscribers = 0
+        self.started = self.stopped = False
+        self._stop = MagicMock()
+        self._stop.is_set.return_value = False
+        self._seq = 0
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+    def _subscribe(self, delta):
+        self.subscribers += delta
+
+    async def await_next(self, seq, timeout=1.0):
+        self._seq += 1
+        return self._seq, b'chunk'
+
+
+class TestStreamProfile(unittest.TestCase):
+    def test_parse_quantizes_similar_requests(self):
+        self.assertEqual(StreamProfile.parse(300, 4.6, 58), StreamProfile.parse(320, 5, 60))
+        self.assertEqual(StreamProfile.parse(5000, 100, 200), StreamProfile(None, 30, 95))
+        self.assertEqual(StreamProfile.parse(), StreamProfile(None, None, None))
+
+    def test_degraded_ladder(self):
+        p = StreamProfile.parse(640, 10, 70)
+        self.assertEqual(p.degraded(), StreamProfile(640, 10, 50))
+        self.assertEqual(StreamProfile(640, 10, 30).degraded(), StreamProfile(480, 10, 30))
+        self.assertEqual(StreamProfile(160, 10, 30).degraded(), StreamProfile(160, 5, 30))
+        self.assertEqual(StreamProfile(160, 1, 30).degraded(), StreamProfile(160, 1, 30))
+
+
+class TestStreamHubs(unittest.TestCase):
+    def test_same_profile_shares_one_hub(self):
+        hubs = StreamHubs(MagicMock(), factory=FakeHub)
+        hubs.start()
+        p = StreamProfile.parse(320, 5, 60)
+        a, b = hubs.get(p), hubs.get(StreamProfile.parse(310, 5, 61))
+        self.assertIs(a, b)
+        self.assertTrue(a.started)
+        self.assertEqual(a.profile, {'width': 320, 'fps': 5, 'quality': 60})
+        self.assertIsNot(hubs.get(StreamProfile.parse(640)), a)
+
+    def test_idle_profiles_are_reaped_at_the_limit(self):
+        hubs = StreamHubs(MagicMock(), factory=FakeHub, max_profiles=3)
+        idle = hubs.get(StreamProfile.parse(320))
+        busy = hubs._acquire(StreamProfile.parse(160))
+        hubs._acquire(StreamProfile.parse(640))
+        time.sleep(0.05)
+        self.assertTrue(idle.stopped)
+        self.assertFalse(busy.stopped)
+        self.assertFalse(hubs.default.stopped)
+        with self.assertRaises(LookupError):
+            hubs.get(StreamProfile.parse(960))
+
+    def test_adaptive_client_steps_down_when_writes_are_slow(self):
+        hubs = StreamHubs(MagicMock(), factory=FakeHub, slow_send=0.01)
+        requested = StreamProfile.parse(640, 10, 90)
+
+        async def consume():
+            gen = hubs.aframes(requested, adaptive=True)
+            for _ in range(6):
+                await gen.__anext__()
+                time.sleep(0.03)  # slow socket write
+            counts = hubs.profiles()
+            await gen.aclose()
+            return counts
+
+        counts = asyncio.run(consume())
+        self.assertEqual(counts[requested], 0)
+        self.assertEqual(sum(counts.values()), 1)
+        self.assertTrue(all(n == 0 for n in hubs.profiles().values()))
+
+
+class TestMjpegHubProfile(unittest.TestCase):
+    def test_resize_and_quality(self):
+        if isinstance(cv2, MagicMock):
+            self.skipTest('opencv not installed')
+        import numpy as np
+
+        cam = MagicMock()
+        cam.get_last_latency.return_value = 0.0
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        image.flags.writeable = False
+        frame = Frame(image, 1, 0.0)
+
+        full = MjpegHub(cam, overlay=False)._encode(frame)
+        small = MjpegHub(cam, overlay=True, width=320, quality=50)._encode(frame)
+        self.assertLess(len(small), len(full) / 2)
+        jpg = small.split(b'\r\n\r\n', 1)[1][:-2]
+        decoded = cv2.imdecode(np.frombuffer(jpg, np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape[:2], (240, 320))
+
+
+if __name__ == '__main__':
+    unittest.main()
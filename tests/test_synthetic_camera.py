@@ -0,0 +1,51 @@
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault('onvif', MagicMock())
+
+from src.camera.synthetic import SyntheticCamera
+
+
+class TestSyntheticCamera(unittest.TestCase):
+    def test_deterministic_moving_frames(self):
+        a = SyntheticCamera(width=160, height=120, seed=3)
+        b = SyntheticCamera(width=160, height=120, seed=3)
+        self.assertTrue((a.render(5) == b.render(5)).all())
+        self.assertFalse((a.render(0) == a.render(10)).all())
+
+    def test_streams_frames_like_camera_handler(self):
+        cam = SyntheticCamera(width=160, height=120, fps=200)
+        cam.start()
+        try:
+            first = cam.next_frame(0, timeout=1)
+            second = cam.next_frame(first.seq, timeout=1)
+        finally:
+            cam.stop()
+        self.assertEqual(first.shape, (120, 160, 3))
+        self.assertGreater(second.seq, first.seq)
+        self.assertIsNotNone(cam.get_last_latency())
+        self.assertEqual(cam.get_frame().shape, (120, 160, 3))
+
+
+class TestBenchmarkRun(unittest.TestCase):
+    def test_offline_report(self):
+        import json
+        import os
+        from tempfile import TemporaryDirectory
+        from benchmarks.run import main
+
+        with TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'bench.json')
+            main(['--seconds', '0.2', '--width', '160', '--height', '120',
+                  '--cameras', '1', '--clients', '2', '--out', out])
+            with open(out) as fh:
+                report = json.load(fh)
+        self.assertEqual(report['meta']['detector'], 'null')
+        self.assertIn('batch_1', report['inference'])
+        self.assertIn('cameras_1_motion', report['pipeline'])
+        self.assertGreater(report['mjpeg']['clients_2']['encoded_fps'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,24 +1,75 @@
 import os
 import unittest
 from tempfile import NamedTemporaryFile
+from threading import Thread
 
 from src.notifications.token_registry import TokenRegistry
 
 
 class TestTokenRegistry(unittest.TestCase):
-    def test_add_and_persist(self):
+    def setUp(self):
         with NamedTemporaryFile(delete=False) as tmp:
-            path = tmp.name
-        try:
-            reg = TokenRegistry(path)
-            reg.add("abc")
-            reg.add("abc")
-            reg.add("def")
-
-            reg2 = TokenRegistry(path)
-            self.assertEqual(set(reg2.get_all()), {"abc", "def"})
-        finally:
-            os.remove(path)
+            self.path = tmp.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_add_and_persist(self):
+        reg = TokenRegistry(self.path)
+        reg.add("abc")
+        reg.add("abc")
+        reg.add("def")
+
+        reg2 = TokenRegistry(self.path)
+        self.assertEqual(set(reg2.get_all()), {"abc", "def"})
+
+    def test_reads_legacy_plain_file(self):
+        with open(self.path, "w") as fh:
+            fh.write("abc\ndef\n")
+        reg = TokenRegistry(self.path)
+        self.assertEqual(set(reg.get_all()), {"abc", "def"})
+
+    def test_add_appends_instead_of_rewriting(self):
+        reg = TokenRegistry(self.path)
+        reg.add("abc")
+        reg.add("abc")  # refreshed recently: no new journal line
+        reg.add("def")
+        with open(self.path) as fh:
+            self.assertEqual(len(fh.readlines()), 2)
+
+    def test_remove_and_metadata(self):
+        reg = TokenRegistry(self.path)
+        reg.add("abc", cameras=["sala"])
+        reg.add("def")
+        self.assertEqual(reg.get("abc")["cameras"], ["sala"])
+        self.assertIsNotNone(reg.get("abc")["last_seen"])
+        self.assertEqual(set(reg.get_all("sala")), {"abc", "def"})
+        self.assertEqual(reg.get_all("quarto"), ["def"])
+
+        self.assertEqual(reg.remove_many(["abc", "missing"]), 1)
+        self.assertEqual(TokenRegistry(self.path).get_all(), ["def"])
+
+    def test_compaction(self):
+        reg = TokenRegistry(self.path, compact_min=10)
+        for i in range(30):
+            reg.add(f"t{i}")
+            reg.remove(f"t{i}")
+        reg.add("keep", cameras=["sala"])
+        with open(self.path) as fh:
+            self.assertLessEqual(len(fh.readlines()), 11)
+        reloaded = TokenRegistry(self.path)
+        self.assertEqual(reloaded.get_all(), ["keep"])
+        self.assertEqual(reloaded.get("keep")["cameras"], ["sala"])
+
+    def test_concurrent_adds(self):
+        reg = TokenRegistry(self.path, compact_min=20)
+        threads = [Thread(target=lambda n=n: [reg.add(f"{n}-{i}") for i in range(50)]) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(reg), 200)
+        self.assertEqual(len(TokenRegistry(self.path)), 200)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.processing.tracker import Tracker, iou
+
+
+def result(*boxes, conf=0.9):
+    return [MagicMock(boxes=[MagicMock(xyxy=[b], conf=[conf]) for b in boxes])]
+
+
+class TestTracker(unittest.TestCase):
+    def test_iou(self):
+        self.assertAlmostEqual(iou((0, 0, 10, 10), (5, 0, 15, 10)), 1 / 3)
+        self.assertEqual(iou((0, 0, 10, 10), (20, 20, 30, 30)), 0.0)
+
+    def test_ids_are_stable_while_people_move(self):
+        tracker = Tracker(min_hits=1)
+        ids = []
+        for i in range(5):
+            tracker.update(result((100 + 5 * i, 100, 150 + 5 * i, 200),
+                                  (400 - 5 * i, 100, 450 - 5 * i, 200)), ts=i * 0.1)
+            pred = tracker.predict(ts=i * 0.1)
+            ids.append(sorted(int(b.id[0]) for b in pred.boxes))
+        self.assertEqual(ids, [[1, 2]] * 5)
+
+    def test_update_returns_detections_with_track_ids(self):
+        tracker = Tracker()
+        first = tracker.update(result((0, 0, 10, 10), (50, 0, 60, 10)), ts=0.0, shape=(100, 100, 3))
+        self.assertEqual([int(b.id[0]) for b in first.boxes], [1, 2])
+        second = tracker.update(result((52, 0, 62, 10)), ts=0.1)
+        self.assertEqual([int(b.id[0]) for b in second.boxes], [2])
+        self.assertEqual(first.orig_shape, (100, 100, 3))
+
+    def test_predict_extrapolates_motion(self):
+        tracker = Tracker(min_hits=1)
+        for i in range(10):
+            tracker.update(result((100 + 10 * i, 100, 150 + 10 * i, 200)), ts=i * 0.1)
+        x1, _, x2, _ = map(float, tracker.predict(ts=1.1).boxes[0].xyxy[0])
+        # última medida em x1=190, deslocando ~100 px/s
+        self.assertGreater(x1, 195)
+        self.assertLess(x1, 215)
+
+    def test_unconfirmed_and_stale_tracks_are_hidden(self):
+        tracker = Tracker(min_hits=2, max_age=0.5)
+        tracker.update(result((0, 0, 10, 10)), ts=0.0)
+        self.assertEqual(len(tracker.predict(ts=0.1)), 0)
+        tracker.update(result((1, 0, 11, 10)), ts=0.2)
+        self.assertEqual(len(tracker.predict(ts=0.3)), 1)
+        self.assertEqual(len(tracker.predict(ts=1.0)), 0)
+        self.assertEqual(tracker.stats()['tracks'], 0)
+
+    def test_target_sticks_to_same_track(self):
+        tracker = Tracker(min_hits=1)
+        tracker.update(result((0, 0, 50, 100), conf=0.6), ts=0.0)
+        first = tracker.target().id
+        # pessoa mais confiante aparece: o alvo continua o mesmo
+        tracker.update(result((0, 0, 50, 100), (300, 0, 350, 100)), ts=0.1)
+        self.assertEqual(tracker.target().id, first)
+        tracker.update(result((300, 0, 350, 100)), ts=2.0)
+        self.assertNotEqual(tracker.target().id, first)
+
+    def test_late_update_does_not_rewind(self):
+        tracker = Tracker(min_hits=1)
+        tracker.update(result((0, 0, 10, 10)), ts=1.0)
+        tracker.predict(ts=1.2)
+        tracker.update(result((2, 0, 12, 10)), ts=1.1)
+        self.assertEqual(tracker.stats()['confirmed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()